@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',   
     'rest_framework_simplejwt',
     'core',
@@ -47,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'inventory.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -91,6 +93,46 @@ DATABASES = {
 
 TIME_ZONE = 'UTC'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_CACHE_URL', 'redis://localhost:6379/1'),
+        'OPTIONS': {
+            'socket_connect_timeout': 0.5,
+            'socket_timeout': 0.5,
+        },
+    }
+}
+
+# Request metrics: Redis location and hash key of the shared series, the Server-Timing
+# header, an optional bearer token required by /metrics, and the limits above
+# which a request is logged as too chatty (total queries, repeats of one query).
+METRICS_REDIS_URL = os.environ.get('METRICS_REDIS_URL', os.environ.get('REDIS_CACHE_URL', 'redis://localhost:6379/1'))
+METRICS_KEY = os.environ.get('METRICS_KEY', 'metrics')
+METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', '1') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_QUERY_BUDGET = int(os.environ.get('METRICS_QUERY_BUDGET', 30))
+METRICS_REPEATED_QUERY_LIMIT = int(os.environ.get('METRICS_REPEATED_QUERY_LIMIT', 5))
+
+# Runs per Celery task kept for the task_stats command.
+TASK_TELEMETRY_RECENT_RUNS = int(os.environ.get('TASK_TELEMETRY_RECENT_RUNS', 1000))
+
+# Seconds a cached auto-parts page or part is kept. Writes invalidate it earlier.
+AUTO_PART_CACHE_TIMEOUT = int(os.environ.get('AUTO_PART_CACHE_TIMEOUT', 300))
+
+# Rows fetched per server-side cursor round trip and written per chunk by the catalogue export.
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+
+# Default and maximum number of change feed entries per request.
+CHANGE_FEED_PAGE_SIZE = int(os.environ.get('CHANGE_FEED_PAGE_SIZE', 500))
+CHANGE_FEED_MAX_PAGE_SIZE = int(os.environ.get('CHANGE_FEED_MAX_PAGE_SIZE', 5000))
+
+# Maximum number of items of a bulk write request and rows per bulk statement.
+AUTO_PART_BULK_MAX_ITEMS = int(os.environ.get('AUTO_PART_BULK_MAX_ITEMS', 10000))
+AUTO_PART_BULK_BATCH_SIZE = int(os.environ.get('AUTO_PART_BULK_BATCH_SIZE', 1000))
+# Maximum number of distinct parts in one cart reservation.
+STOCK_RESERVATION_MAX_ITEMS = int(os.environ.get('STOCK_RESERVATION_MAX_ITEMS', 100))
+
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 
@@ -100,11 +142,74 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_ENABLE_UTC = True
 
+# Tasks are routed to three queues, each consumed by its own worker pool (see
+# docker-compose.yml): imports (long, memory hungry CSV imports), maintenance
+# (scheduled jobs) and default (short tasks). Workers reserve one message per
+# process unless told otherwise, so a long import never holds others back.
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    'inventory.tasks.import_auto_parts_from_csv': {'queue': 'imports'},
+    'inventory.tasks.import_auto_parts_from_csv_parallel': {'queue': 'imports'},
+    'inventory.tasks.import_csv_chunk': {'queue': 'imports'},
+    'inventory.tasks.replenish_stock': {'queue': 'maintenance'},
+    'inventory.tasks.create_stock_movement_partitions': {'queue': 'maintenance'},
+    'inventory.tasks.purge_revoked_tokens': {'queue': 'maintenance'},
+    'inventory.tasks.purge_upload_sessions': {'queue': 'maintenance'},
+}
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.environ.get('CELERY_WORKER_PREFETCH_MULTIPLIER', 1))
+
+# Soft time limits per queue, in seconds; the hard limit kills the process
+# TASK_TIME_LIMIT_GRACE seconds later. Tasks acknowledged late are redelivered
+# by Redis after its visibility timeout (one hour), so their limits stay below it.
+IMPORT_TASK_TIME_LIMIT = int(os.environ.get('IMPORT_TASK_TIME_LIMIT', 4 * 3600))
+MAINTENANCE_TASK_TIME_LIMIT = int(os.environ.get('MAINTENANCE_TASK_TIME_LIMIT', 1800))
+DEFAULT_TASK_TIME_LIMIT = int(os.environ.get('DEFAULT_TASK_TIME_LIMIT', 60))
+TASK_TIME_LIMIT_GRACE = int(os.environ.get('TASK_TIME_LIMIT_GRACE', 60))
+MAINTENANCE_TASK_MAX_RETRIES = int(os.environ.get('MAINTENANCE_TASK_MAX_RETRIES', 3))
+
+# Uploaded CSV files are spooled to MEDIA_ROOT and the worker inserts them in
+# batches of this many rows.
+CSV_IMPORT_BATCH_SIZE = int(os.environ.get('CSV_IMPORT_BATCH_SIZE', 1000))
+# The COPY import engine streams this many rows per COPY statement and commit.
+CSV_COPY_BATCH_SIZE = int(os.environ.get('CSV_COPY_BATCH_SIZE', 50000))
+# Resumable uploads: maximum size of one part, and seconds an unfinished
+# upload is kept after its last part before purge_upload_sessions deletes it.
+UPLOAD_PART_MAX_SIZE = int(os.environ.get('UPLOAD_PART_MAX_SIZE', 64 * 1024 * 1024))
+UPLOAD_SESSION_TTL = int(os.environ.get('UPLOAD_SESSION_TTL', 24 * 3600))
+# Uploads up to this many bytes (as received) are validated in the request,
+# larger ones by the import task before any row is written. The validation
+# summary lists the first CSV_VALIDATION_SAMPLE_SIZE rejected rows.
+CSV_SYNC_VALIDATION_MAX_SIZE = int(os.environ.get('CSV_SYNC_VALIDATION_MAX_SIZE', 5 * 1024 * 1024))
+CSV_VALIDATION_SAMPLE_SIZE = int(os.environ.get('CSV_VALIDATION_SAMPLE_SIZE', 20))
+# Parallel imports split the file in chunks of this many rows, one Celery task each.
+CSV_IMPORT_CHUNK_SIZE = int(os.environ.get('CSV_IMPORT_CHUNK_SIZE', 50000))
+
+# Stock replenishment defaults for parts without their own reorder point and
+# target, and the number of parts (by primary key) updated per transaction.
+REPLENISH_REORDER_POINT = int(os.environ.get('REPLENISH_REORDER_POINT', 10))
+REPLENISH_REORDER_TARGET = int(os.environ.get('REPLENISH_REORDER_TARGET', 10))
+REPLENISH_CHUNK_SIZE = int(os.environ.get('REPLENISH_CHUNK_SIZE', 5000))
+
+# Months of stock movement partitions kept created ahead of time.
+STOCK_MOVEMENT_PARTITIONS_AHEAD = int(os.environ.get('STOCK_MOVEMENT_PARTITIONS_AHEAD', 3))
+
 CELERY_BEAT_SCHEDULE = {
     'replenish-stock-daily': {
         'task': 'inventory.tasks.replenish_stock',
         'schedule': crontab(hour=1, minute=0),
     },
+    'create-stock-movement-partitions-daily': {
+        'task': 'inventory.tasks.create_stock_movement_partitions',
+        'schedule': crontab(hour=0, minute=30),
+    },
+    'purge-revoked-tokens-daily': {
+        'task': 'inventory.tasks.purge_revoked_tokens',
+        'schedule': crontab(hour=0, minute=45),
+    },
+    'purge-upload-sessions-hourly': {
+        'task': 'inventory.tasks.purge_upload_sessions',
+        'schedule': crontab(minute=15),
+    },
 }
 
 # Password validation
@@ -143,6 +248,9 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+MEDIA_URL = 'media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', '/vol/web/media')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -153,7 +261,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'inventory.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -165,4 +273,12 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_LIFETIME': timedelta(days=30),
     'SLIDING_TOKEN_REFRESH_LIFETIME_LATE_USER': timedelta(days=1),
     'SLIDING_TOKEN_LIFETIME_LATE_USER': timedelta(days=30),
+    'TOKEN_OBTAIN_SERIALIZER': 'inventory.serializers.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'inventory.serializers.TokenRefreshSerializer',
+    'TOKEN_USER_CLASS': 'inventory.authentication.CachedTokenUser',
 }
+
+# Seconds the JWT deny list is cached (revocations also clear it at once) and
+# a user row loaded for a token is cached.
+AUTH_DENY_LIST_CACHE_TIMEOUT = int(os.environ.get('AUTH_DENY_LIST_CACHE_TIMEOUT', 300))
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get('AUTH_USER_CACHE_TIMEOUT', 60))
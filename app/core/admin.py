@@ -2,3 +2,4 @@ from django.contrib import admin
 from core import models
 
 admin.site.register(models.AutoPart)
+admin.site.register(models.ImportJob)
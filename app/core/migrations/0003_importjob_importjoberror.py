@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_autopart_sku'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('running', 'Em execução'), ('succeeded', 'Concluída'), ('failed', 'Falhou')], default='pending', max_length=16)),
+                ('upsert', models.BooleanField(default=False)),
+                ('engine', models.CharField(default='orm', max_length=16)),
+                ('parallel', models.BooleanField(default=False)),
+                ('rows_processed', models.PositiveBigIntegerField(default=0)),
+                ('rows_created', models.PositiveBigIntegerField(default=0)),
+                ('rows_updated', models.PositiveBigIntegerField(default=0)),
+                ('error_count', models.PositiveBigIntegerField(default=0)),
+                ('rows_per_second', models.FloatField(blank=True, null=True)),
+                ('peak_memory_kb', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImportJobError',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line', models.PositiveBigIntegerField()),
+                ('message', models.TextField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='errors', to='core.importjob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'line'], name='core_import_job_id_c8bf0e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_importjob_importjoberror'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='autopart',
+            index=models.Index(fields=['price', 'id'], name='autopart_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='autopart',
+            index=models.Index(fields=['name', 'id'], name='autopart_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:26
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_autopart_autopart_price_id_idx_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='autopart',
+            index=models.Index(fields=['stock_quantity'], name='autopart_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='autopart',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('name', 'description', config='portuguese'), name='autopart_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='autopart',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='autopart_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        # Finer statistics on the search document let the planner estimate rare
+        # terms correctly and pick the GIN index over an id-ordered scan.
+        migrations.RunSQL(
+            'ALTER INDEX autopart_search_idx ALTER COLUMN 1 SET STATISTICS 1000',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:31
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_autopart_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='autopart',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_default=django.db.models.functions.datetime.Now(), db_index=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_autopart_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='autopart',
+            name='reorder_point',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='autopart',
+            name='reorder_target',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
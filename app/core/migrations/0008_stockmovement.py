@@ -0,0 +1,103 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:48
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+# Monthly partitions are created ahead of time by
+# core_create_stockmovement_partition(), called here and by the
+# create_stock_movement_partitions task; rows outside them land in the
+# default partition. The primary key has to include the partition key.
+CREATE_LEDGER = """
+CREATE TABLE core_stockmovement (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    part_id bigint NOT NULL,
+    quantity integer NOT NULL,
+    balance integer NOT NULL,
+    reason varchar(32) NOT NULL,
+    created_at timestamp with time zone NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX core_stockmovement_part_idx ON core_stockmovement (part_id, created_at, id);
+
+CREATE TABLE core_stockmovement_default PARTITION OF core_stockmovement DEFAULT;
+
+CREATE FUNCTION core_create_stockmovement_partition(month date) RETURNS void AS $$
+DECLARE
+    first_day date := date_trunc('month', month);
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF core_stockmovement FOR VALUES FROM (%L) TO (%L)',
+        'core_stockmovement_' || to_char(first_day, 'YYYY_MM'), first_day, first_day + interval '1 month'
+    );
+END
+$$ LANGUAGE plpgsql;
+
+SELECT core_create_stockmovement_partition((now() + make_interval(months => ahead))::date)
+FROM generate_series(0, 2) AS ahead;
+
+CREATE FUNCTION core_autopart_stock_movement() RETURNS trigger AS $$
+DECLARE
+    movement_reason varchar := coalesce(nullif(current_setting('inventory.stock_reason', true), ''), 'manual');
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO core_stockmovement (part_id, quantity, balance, reason)
+        SELECT id, stock_quantity, stock_quantity, movement_reason FROM new_rows WHERE stock_quantity <> 0;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO core_stockmovement (part_id, quantity, balance, reason)
+        SELECT new_rows.id, new_rows.stock_quantity - old_rows.stock_quantity, new_rows.stock_quantity, movement_reason
+        FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+        WHERE new_rows.stock_quantity <> old_rows.stock_quantity;
+    ELSE
+        INSERT INTO core_stockmovement (part_id, quantity, balance, reason)
+        SELECT id, -stock_quantity, 0, movement_reason FROM old_rows WHERE stock_quantity <> 0;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_autopart_stock_insert AFTER INSERT ON core_autopart
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_autopart_stock_movement();
+CREATE TRIGGER core_autopart_stock_update AFTER UPDATE ON core_autopart
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_autopart_stock_movement();
+CREATE TRIGGER core_autopart_stock_delete AFTER DELETE ON core_autopart
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_autopart_stock_movement();
+"""
+
+DROP_LEDGER = """
+DROP TRIGGER core_autopart_stock_delete ON core_autopart;
+DROP TRIGGER core_autopart_stock_update ON core_autopart;
+DROP TRIGGER core_autopart_stock_insert ON core_autopart;
+DROP FUNCTION core_autopart_stock_movement();
+DROP FUNCTION core_create_stockmovement_partition(date);
+DROP TABLE core_stockmovement;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_autopart_reorder_levels'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_LEDGER, reverse_sql=DROP_LEDGER),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('quantity', models.IntegerField()),
+                ('balance', models.IntegerField()),
+                ('reason', models.CharField(choices=[('api', 'API'), ('bulk', 'Lote via API'), ('import', 'Importação CSV'), ('replenish', 'Reabastecimento'), ('reservation', 'Reserva'), ('release', 'Devolução'), ('manual', 'Manual')], max_length=32)),
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+            ],
+            options={
+                'db_table': 'core_stockmovement',
+                'managed': False,
+            },
+        ),
+    ]
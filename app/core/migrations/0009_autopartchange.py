@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:55
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+# Existing parts are seeded into the feed so that a first sync from an
+# empty cursor sees the whole catalogue.
+CREATE_CHANGE_FEED = """
+CREATE TABLE core_autopartchange (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    part_id bigint NOT NULL,
+    txid bigint NOT NULL DEFAULT (pg_current_xact_id()::text::bigint),
+    created_at timestamp with time zone NOT NULL DEFAULT now()
+);
+
+CREATE INDEX core_autopartchange_txid_idx ON core_autopartchange (txid, id);
+
+INSERT INTO core_autopartchange (part_id) SELECT id FROM core_autopart ORDER BY id;
+
+CREATE FUNCTION core_autopart_change_log() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO core_autopartchange (part_id) SELECT id FROM old_rows;
+    ELSE
+        INSERT INTO core_autopartchange (part_id) SELECT id FROM new_rows;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_autopart_change_insert AFTER INSERT ON core_autopart
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_autopart_change_log();
+CREATE TRIGGER core_autopart_change_update AFTER UPDATE ON core_autopart
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_autopart_change_log();
+CREATE TRIGGER core_autopart_change_delete AFTER DELETE ON core_autopart
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_autopart_change_log();
+"""
+
+DROP_CHANGE_FEED = """
+DROP TRIGGER core_autopart_change_delete ON core_autopart;
+DROP TRIGGER core_autopart_change_update ON core_autopart;
+DROP TRIGGER core_autopart_change_insert ON core_autopart;
+DROP FUNCTION core_autopart_change_log();
+DROP TABLE core_autopartchange;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_stockmovement'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_CHANGE_FEED, reverse_sql=DROP_CHANGE_FEED),
+        migrations.CreateModel(
+            name='AutoPartChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('part_id', models.BigIntegerField()),
+                ('txid', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+            ],
+            options={
+                'db_table': 'core_autopartchange',
+                'managed': False,
+            },
+        ),
+    ]
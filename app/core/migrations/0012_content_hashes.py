@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:35
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='autopart',
+            name='content_hash',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.MD5(django.db.models.functions.text.Concat('name', models.Value('\x1f'), 'description', models.Value('\x1f'), 'price', models.Value('\x1f'), 'stock_quantity', models.Value('\x1f'), 'sku', output_field=models.TextField())), output_field=models.CharField(max_length=32)),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='rows_unchanged',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_content_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='validation',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='importjoberror',
+            name='code',
+            field=models.CharField(blank=True, choices=[('missing_value', 'Valor ausente'), ('invalid_price', 'Preço inválido'), ('negative_price', 'Preço negativo'), ('price_precision', 'Preço com mais de duas casas decimais'), ('price_too_large', 'Preço acima do máximo'), ('invalid_quantity', 'Quantidade inválida'), ('negative_quantity', 'Quantidade negativa'), ('quantity_too_large', 'Quantidade acima do máximo'), ('too_long', 'Texto longo demais'), ('missing_sku', 'Código ausente')], max_length=32),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:58
+
+from django.db import migrations
+
+
+# A month whose rows already landed in the default partition (the task did not
+# run in time) cannot be created with CREATE TABLE ... PARTITION OF: the check
+# of the default partition fails. Such a month is created as a plain table, its
+# rows are moved out of the default partition and it is then attached.
+PARTITION_FROM_DEFAULT = """
+CREATE OR REPLACE FUNCTION core_create_stockmovement_partition(month date) RETURNS void AS $$
+DECLARE
+    first_day date := date_trunc('month', month);
+    next_month date := first_day + interval '1 month';
+    partition_name text := 'core_stockmovement_' || to_char(first_day, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM core_stockmovement_default WHERE created_at >= first_day AND created_at < next_month
+    ) THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF core_stockmovement FOR VALUES FROM (%L) TO (%L)',
+            partition_name, first_day, next_month
+        );
+        RETURN;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE core_stockmovement INCLUDING DEFAULTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM core_stockmovement_default WHERE created_at >= %L AND created_at < %L '
+        'RETURNING *) INSERT INTO %I SELECT * FROM moved',
+        first_day, next_month, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE core_stockmovement ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, first_day, next_month
+    );
+END
+$$ LANGUAGE plpgsql;
+"""
+
+PARTITION_OF = """
+CREATE OR REPLACE FUNCTION core_create_stockmovement_partition(month date) RETURNS void AS $$
+DECLARE
+    first_day date := date_trunc('month', month);
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF core_stockmovement FOR VALUES FROM (%L) TO (%L)',
+        'core_stockmovement_' || to_char(first_day, 'YYYY_MM'), first_day, first_day + interval '1 month'
+    );
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_import_validation'),
+    ]
+
+    operations = [
+        migrations.RunSQL(PARTITION_FROM_DEFAULT, reverse_sql=PARTITION_OF),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_stockmovement_partition_from_default'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='importjoberror',
+            name='code',
+            field=models.CharField(blank=True, choices=[('missing_value', 'Valor ausente'), ('invalid_price', 'Preço inválido'), ('negative_price', 'Preço negativo'), ('price_precision', 'Preço com mais de duas casas decimais'), ('price_too_large', 'Preço acima do máximo'), ('invalid_quantity', 'Quantidade inválida'), ('negative_quantity', 'Quantidade negativa'), ('quantity_too_large', 'Quantidade acima do máximo'), ('too_long', 'Texto longo demais'), ('missing_sku', 'Código ausente'), ('duplicate_sku', 'Código já cadastrado')], max_length=32),
+        ),
+    ]
@@ -1,4 +1,15 @@
+import uuid
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models.functions import MD5, Concat, Now
+from django.utils import timezone
+
+
+# Columns hashed into AutoPart.content_hash, in order, joined by the separator.
+CONTENT_HASH_FIELDS = ['name', 'description', 'price', 'stock_quantity', 'sku']
+CONTENT_HASH_SEPARATOR = '\x1f'
 
 
 class AutoPart(models.Model):
@@ -7,6 +18,188 @@ class AutoPart(models.Model):
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock_quantity = models.PositiveIntegerField()
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now(), db_index=True)
+    # Replenishment raises stock below reorder_point up to reorder_target.
+    # Empty values fall back to the REPLENISH_* settings.
+    reorder_point = models.PositiveIntegerField(null=True, blank=True)
+    reorder_target = models.PositiveIntegerField(null=True, blank=True)
+    # Kept by PostgreSQL whoever writes the row; imports compare it with
+    # inventory.imports.row_hash() to skip rows that did not change.
+    content_hash = models.GeneratedField(
+        expression=MD5(Concat(
+            *[part for field in CONTENT_HASH_FIELDS for part in (models.Value(CONTENT_HASH_SEPARATOR), field)][1:],
+            output_field=models.TextField(),
+        )),
+        output_field=models.CharField(max_length=32),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['price', 'id'], name='autopart_price_id_idx'),
+            models.Index(fields=['name', 'id'], name='autopart_name_id_idx'),
+            models.Index(fields=['stock_quantity'], name='autopart_stock_idx'),
+            GinIndex(
+                SearchVector('name', 'description', config='portuguese'),
+                name='autopart_search_idx',
+            ),
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='autopart_name_trgm_idx'),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class ImportJob(models.Model):
+    """Model representing a CSV import of auto parts and its progress."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pendente'
+        RUNNING = 'running', 'Em execução'
+        SUCCEEDED = 'succeeded', 'Concluída'
+        FAILED = 'failed', 'Falhou'
+
+    file_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    upsert = models.BooleanField(default=False)
+    engine = models.CharField(max_length=16, default='orm')
+    parallel = models.BooleanField(default=False)
+    rows_processed = models.PositiveBigIntegerField(default=0)
+    rows_created = models.PositiveBigIntegerField(default=0)
+    rows_updated = models.PositiveBigIntegerField(default=0)
+    rows_unchanged = models.PositiveBigIntegerField(default=0)
+    error_count = models.PositiveBigIntegerField(default=0)
+    rows_per_second = models.FloatField(null=True, blank=True)
+    peak_memory_kb = models.PositiveBigIntegerField(null=True, blank=True)
+    message = models.TextField(blank=True)
+    # SHA-256 of the uploaded file as received, to recognize a resent file.
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    # Error summary of the validation pass (inventory.validation), made at upload for small files.
+    validation = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'Importação {self.pk} ({self.status})'
+
+
+class ImportJobError(models.Model):
+    """Model representing a CSV row rejected by an import job."""
+
+    class Code(models.TextChoices):
+        MISSING_VALUE = 'missing_value', 'Valor ausente'
+        INVALID_PRICE = 'invalid_price', 'Preço inválido'
+        NEGATIVE_PRICE = 'negative_price', 'Preço negativo'
+        PRICE_PRECISION = 'price_precision', 'Preço com mais de duas casas decimais'
+        PRICE_TOO_LARGE = 'price_too_large', 'Preço acima do máximo'
+        INVALID_QUANTITY = 'invalid_quantity', 'Quantidade inválida'
+        NEGATIVE_QUANTITY = 'negative_quantity', 'Quantidade negativa'
+        QUANTITY_TOO_LARGE = 'quantity_too_large', 'Quantidade acima do máximo'
+        TOO_LONG = 'too_long', 'Texto longo demais'
+        MISSING_SKU = 'missing_sku', 'Código ausente'
+        DUPLICATE_SKU = 'duplicate_sku', 'Código já cadastrado'
+
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='errors')
+    line = models.PositiveBigIntegerField()
+    code = models.CharField(max_length=32, choices=Code.choices, blank=True)
+    message = models.TextField()
+
+    class Meta:
+        indexes = [models.Index(fields=['job', 'line'])]
+
+
+class UploadSession(models.Model):
+    """Model representing a resumable upload of an import file, received in parts.
+
+    `offset` is the number of bytes stored so far; the next part must start
+    there. `size`, when known, is the size of the complete file.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    name = models.CharField(max_length=255)
+    file_name = models.CharField(max_length=255)
+    compression = models.CharField(max_length=8, blank=True)
+    size = models.PositiveBigIntegerField(null=True, blank=True)
+    offset = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f'Envio de {self.name} ({self.offset} bytes)'
+
+
+class StockMovement(models.Model):
+    """Append-only ledger entry of a stock change of an auto part.
+
+    Rows are written by statement-level triggers on the auto parts table, in
+    one INSERT per statement, so every write path is recorded. The table is
+    partitioned by month on created_at and created by migration 0008.
+    """
+
+    class Reason(models.TextChoices):
+        API = 'api', 'API'
+        BULK = 'bulk', 'Lote via API'
+        IMPORT = 'import', 'Importação CSV'
+        REPLENISH = 'replenish', 'Reabastecimento'
+        RESERVATION = 'reservation', 'Reserva'
+        RELEASE = 'release', 'Devolução'
+        MANUAL = 'manual', 'Manual'
+
+    id = models.BigAutoField(primary_key=True)
+    part = models.ForeignKey(
+        AutoPart, on_delete=models.DO_NOTHING, db_constraint=False, related_name='movements'
+    )
+    quantity = models.IntegerField()
+    balance = models.IntegerField()
+    reason = models.CharField(max_length=32, choices=Reason.choices)
+    created_at = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        managed = False
+        db_table = 'core_stockmovement'
+
+
+class AutoPartChange(models.Model):
+    """Change feed entry: the part with this id was created, updated or deleted.
+
+    Written by statement-level triggers on the auto parts table (migration
+    0009). `txid` is the writing transaction's id; readers only consume
+    entries of transactions older than every running one, so the feed never
+    skips a change that commits late.
+    """
+    id = models.BigAutoField(primary_key=True)
+    part_id = models.BigIntegerField()
+    txid = models.BigIntegerField()
+    created_at = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        managed = False
+        db_table = 'core_autopartchange'
+
+
+class RevokedToken(models.Model):
+    """Deny list entry for JWTs that must stop being accepted before they expire.
+
+    With a `jti` it revokes that token. Without one it revokes every token of
+    `user` issued up to `revoked_at`, for example when the user is
+    deactivated. Entries are useless once `expires_at`, the latest expiry of
+    the tokens they cover, has passed.
+    """
+    jti = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name='revoked_tokens'
+    )
+    revoked_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user'], condition=models.Q(jti__isnull=True), name='core_revokedtoken_user'
+            ),
+        ]
+
+    def __str__(self):
+        return f'Token {self.jti} revogado' if self.jti else f'Tokens do usuário {self.user_id} revogados'
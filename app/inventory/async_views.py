@@ -0,0 +1,73 @@
+"""Async read endpoints for auto parts.
+
+Under an ASGI server these views wait on PostgreSQL without holding a
+worker, so one process serves many concurrent list, search and detail
+requests. They return the same JSON as the list and retrieve actions of
+AutoPartView, with the same filters, `fields` and keyset pagination, but
+are not cached and do not answer conditional requests.
+"""
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound
+from rest_framework.request import Request
+from core.models import AutoPart
+from inventory.authentication import AsyncJWTAuthentication
+from inventory.filters import AutoPartFilterBackend
+from inventory.pagination import AutoPartPagination
+from inventory.serializers import AutoPartReadSerializer
+
+
+class AsyncAutoPartReadView(View):
+    """Base view: authenticates with a JWT and renders API errors as DRF does."""
+    http_method_names = ['get', 'head', 'options']
+    authentication = AsyncJWTAuthentication()
+    serializer_class = AutoPartReadSerializer
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request)
+        try:
+            if await self.authentication.aauthenticate(request) is None:
+                raise NotAuthenticated()
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            return self.handle_exception(request, exc)
+
+    def handle_exception(self, request, exc):
+        data = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+        response = JsonResponse(data, status=exc.status_code, safe=False)
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            response['WWW-Authenticate'] = self.authentication.authenticate_header(request)
+        return response
+
+    def get_columns(self, fields, *extra):
+        return sorted(set(fields or self.serializer_class.fields) | {'id', *extra})
+
+
+class AsyncAutoPartListView(AsyncAutoPartReadView):
+    """Lists auto parts, with `search`, price and stock filters, one keyset page at a time."""
+    filter_backend = AutoPartFilterBackend()
+    pagination_class = AutoPartPagination
+
+    async def get(self, request):
+        paginator = self.pagination_class()
+        fields = self.serializer_class.get_requested_fields(request)
+        queryset = await self.filter_backend.afilter_queryset(request, AutoPart.objects.all(), self)
+        columns = self.get_columns(fields, paginator.get_ordering(request)[0])
+        rows = await paginator.apaginate_queryset(queryset.values(*columns), request)
+        return JsonResponse({
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+            'results': self.serializer_class(rows, many=True, fields=fields).data,
+        })
+
+
+class AsyncAutoPartDetailView(AsyncAutoPartReadView):
+    """Returns one auto part."""
+
+    async def get(self, request, pk):
+        fields = self.serializer_class.get_requested_fields(request)
+        row = await AutoPart.objects.filter(pk=pk).values(*self.get_columns(fields)).afirst()
+        if row is None:
+            raise NotFound()
+        return JsonResponse(self.serializer_class(row, fields=fields).data)
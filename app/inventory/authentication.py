@@ -0,0 +1,189 @@
+"""JWT authentication without a user query per request.
+
+Tokens carry the user's is_staff flag, so authentication and permissions
+are checked from the validated claims alone. Revocation goes through a
+small deny list of RevokedToken entries held in the cache, and the user row
+is only loaded, then cached briefly, when something needs the full model.
+"""
+import logging
+from datetime import datetime, timezone as dt_timezone
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from core.models import RevokedToken
+
+
+logger = logging.getLogger(__name__)
+
+STAFF_CLAIM = 'is_staff'
+# Fields of the User row kept in the shared cache for CachedTokenUser.instance.
+CACHED_USER_FIELDS = ('pk', 'username', 'is_staff', 'is_active', 'is_superuser')
+DENY_LIST_KEY = 'auth:revoked-tokens'
+
+
+def _load_deny_list():
+    jtis, users = set(), {}
+    entries = RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list('jti', 'user_id', 'revoked_at')
+    for jti, user_id, revoked_at in entries:
+        if jti:
+            jtis.add(jti)
+        else:
+            users[str(user_id)] = int(revoked_at.timestamp())
+    return {'jtis': jtis, 'users': users}
+
+
+def deny_list():
+    """Returns the unexpired revocations: {'jtis': revoked jtis, 'users': {user id: revoked up to timestamp}}."""
+    try:
+        entries = cache.get(DENY_LIST_KEY)
+    except Exception:
+        logger.warning('Cache de tokens revogados indisponível.', exc_info=True)
+        return _load_deny_list()
+
+    if entries is None:
+        entries = _load_deny_list()
+        try:
+            cache.set(DENY_LIST_KEY, entries, timeout=settings.AUTH_DENY_LIST_CACHE_TIMEOUT)
+        except Exception:
+            logger.warning('Não foi possível gravar os tokens revogados no cache.', exc_info=True)
+    return entries
+
+
+def _forget_deny_list():
+    try:
+        cache.delete(DENY_LIST_KEY)
+    except Exception:
+        logger.warning('Não foi possível atualizar o cache de tokens revogados.', exc_info=True)
+
+
+def invalidate_deny_list():
+    """Drops the cached deny list, again on commit when inside a transaction."""
+    _forget_deny_list()
+    if connection.in_atomic_block:
+        transaction.on_commit(_forget_deny_list)
+
+
+def is_revoked(token):
+    entries = deny_list()
+    if token.get(api_settings.JTI_CLAIM) in entries['jtis']:
+        return True
+    revoked_up_to = entries['users'].get(str(token.get(api_settings.USER_ID_CLAIM)))
+    return revoked_up_to is not None and token.get('iat', 0) <= revoked_up_to
+
+
+def revoke_token(token):
+    """Adds one token, access or refresh, to the deny list until it expires."""
+    RevokedToken.objects.get_or_create(jti=token[api_settings.JTI_CLAIM], defaults={
+        'user_id': token[api_settings.USER_ID_CLAIM],
+        'expires_at': datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc),
+    })
+    invalidate_deny_list()
+
+
+def _revoke_user_id(user_id, now):
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    RevokedToken.objects.update_or_create(user_id=user_id, jti=None, defaults={
+        'revoked_at': now,
+        'expires_at': now + lifetime,
+    })
+
+
+def revoke_user_tokens(user):
+    """Revokes every token issued to `user` so far."""
+    _revoke_user_id(user.pk, timezone.now())
+    invalidate_deny_list()
+
+
+def update_user_access(users, **fields):
+    """Runs users.update(**fields) and revokes the tokens of every user updated.
+
+    QuerySet.update() sends no signals, so bulk changes of is_active or
+    is_staff must go through here (or call revoke_user_tokens) for the
+    tokens already issued to stop working. Returns the number of users updated.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        user_ids = list(users.values_list('pk', flat=True))
+        updated = users.model.objects.filter(pk__in=user_ids).update(**fields)
+        for user_id in user_ids:
+            _revoke_user_id(user_id, now)
+    invalidate_deny_list()
+    return updated
+
+
+class CachedTokenUser(TokenUser):
+    """Request user backed by the validated token; the User row is loaded only on demand."""
+
+    @cached_property
+    def is_staff(self):
+        if STAFF_CLAIM in self.token:
+            return self.token[STAFF_CLAIM]
+        # Tokens issued before the claim was added.
+        return self.instance.is_staff
+
+    @cached_property
+    def instance(self):
+        """An unsaved User with the access fields of the row, cached for AUTH_USER_CACHE_TIMEOUT seconds.
+
+        Only CACHED_USER_FIELDS are cached, never the password hash or other credentials.
+        """
+        key = f'auth:user-fields:{self.id}'
+        try:
+            fields = cache.get(key)
+        except Exception:
+            logger.warning('Cache de usuários indisponível.', exc_info=True)
+            fields = None
+
+        user_model = get_user_model()
+        if fields is None:
+            fields = user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: self.id}
+            ).values(*CACHED_USER_FIELDS).first()
+            if fields is None:
+                raise AuthenticationFailed('User not found', code='user_not_found')
+            try:
+                cache.set(key, fields, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+            except Exception:
+                logger.warning('Não foi possível gravar o usuário no cache.', exc_info=True)
+        return user_model(**fields)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """Authenticates from the token claims after checking the cached deny list."""
+
+    def get_user(self, validated_token):
+        if is_revoked(validated_token):
+            raise AuthenticationFailed('Token revogado.', code='token_revoked')
+        return super().get_user(validated_token)
+
+
+class AsyncJWTAuthentication(StatelessJWTAuthentication):
+    """StatelessJWTAuthentication for async views.
+
+    Token parsing and signature checks are CPU-only and reused as they are;
+    only the deny list lookup, which may have to reach the cache or the
+    database, is awaited.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        return await sync_to_async(self.get_user)(validated_token)
@@ -0,0 +1,119 @@
+"""Helpers shared by the inventory benchmark commands."""
+import csv
+import os
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache
+from django.test.utils import override_settings
+from core.models import AutoPart
+from inventory import metrics
+from inventory.cache import HITS_KEY, MISSES_KEY, VERSION_KEY
+
+
+CSV_HEADER = ['codigo', 'nome', 'descricao', 'preco', 'quantidade_inicial']
+
+
+def synthetic_rows(count, offset=0):
+    """Yields CSV rows in the mock_pecas.csv layout, with a unique `codigo` per row."""
+    for i in range(offset, offset + count):
+        yield [
+            f'SKU-{i:08d}',
+            f'Peça sintética {i}',
+            f'Descrição da peça sintética número {i} para testes de carga',
+            f'{(i % 100000) / 100 + 1:.2f}',
+            str(i % 50),
+        ]
+
+
+def synthetic_parts(count, offset=0):
+    """Yields unsaved AutoPart instances built from synthetic_rows."""
+    for sku, name, description, price, quantity in synthetic_rows(count, offset):
+        yield AutoPart(sku=sku, name=name, description=description, price=price, stock_quantity=int(quantity))
+
+
+def write_synthetic_csv(csv_file, count, offset=0):
+    """Writes a header and `count` synthetic rows to an open text file."""
+    writer = csv.writer(csv_file)
+    writer.writerow(CSV_HEADER)
+    writer.writerows(synthetic_rows(count, offset))
+
+
+class Timer:
+    """Context manager measuring wall-clock seconds in `elapsed`."""
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self._start
+
+
+@contextmanager
+def isolated_cache():
+    """Runs a benchmark with the caches and the request metrics under a key prefix of its own.
+
+    Its writes then replace a catalogue version no server reads, instead of
+    invalidating the response cache of the running servers, its hits and
+    misses stay out of their statistics, and its requests stay out of
+    /metrics. The prefix's counters and series are deleted at the end; cached
+    responses expire on their own.
+    """
+    prefix = f'bench-{uuid.uuid4().hex[:8]}'
+    caches = {alias: {**config, 'KEY_PREFIX': prefix} for alias, config in settings.CACHES.items()}
+    with override_settings(CACHES=caches, METRICS_KEY=f'{prefix}:{settings.METRICS_KEY}'):
+        try:
+            yield
+        finally:
+            cache.delete_many([VERSION_KEY, HITS_KEY, MISSES_KEY])
+            metrics.reset()
+
+
+def latency_percentiles(latencies):
+    """Returns the p50, p95 and p99 of latencies in seconds, as milliseconds."""
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else (latencies or [0]) * 99
+    return {
+        'p50_ms': round(quantiles[49] * 1000, 2),
+        'p95_ms': round(quantiles[94] * 1000, 2),
+        'p99_ms': round(quantiles[98] * 1000, 2),
+    }
+
+
+def process_tree(pids):
+    """Returns the given pids and all their descendants, read from /proc."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as stat:
+                    # The command name may contain spaces; the parent pid is the second field after it.
+                    parent = int(stat.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(parent, []).append(int(entry))
+
+    tree, pending = set(), list(pids)
+    while pending:
+        pid = pending.pop()
+        if pid not in tree:
+            tree.add(pid)
+            pending.extend(children.get(pid, []))
+    return tree
+
+
+def rss_bytes(pids):
+    """Sums the resident memory of the processes, skipping those that exited."""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
@@ -0,0 +1,77 @@
+"""Batch create, update and delete of auto parts in one transaction."""
+from django.db import IntegrityError, connection, transaction
+from core.models import AutoPart, StockMovement
+from inventory.cache import invalidate_auto_parts
+from inventory.ledger import stock_reason
+from inventory.serializers import AutoPartBulkItemSerializer
+
+
+def _delete(ids):
+    """Deletes parts with one statement and returns the ids that existed.
+
+    Goes around the ORM collector, which loads every part to send one
+    post_delete signal each; the cache is invalidated once by the caller.
+    """
+    if not ids:
+        return set()
+
+    table = connection.ops.quote_name(AutoPart._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE id = ANY(%s) RETURNING id', [list(ids)])
+        return {row[0] for row in cursor.fetchall()}
+
+
+def _as_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def apply_bulk_changes(create, update, delete):
+    """Validates and applies a batch of part writes atomically.
+
+    Returns a (result, errors) pair. When any item is invalid nothing is
+    written and `errors` maps each operation to a list of per-item errors,
+    aligned with the request, where valid items have an empty error.
+    """
+    with transaction.atomic():
+        updated_ids = {_as_id(item.get('id')) for item in update} - {None}
+        ids = sorted(updated_ids | set(delete))
+        instances = AutoPart.objects.select_for_update().order_by('id').in_bulk(ids) if ids else {}
+
+        create_serializer = AutoPartBulkItemSerializer(data=create, many=True)
+        update_serializer = AutoPartBulkItemSerializer(instances, data=update, many=True, partial=True)
+
+        errors = {}
+        if create and not create_serializer.is_valid():
+            errors['create'] = create_serializer.errors
+        if update and not update_serializer.is_valid():
+            errors['update'] = update_serializer.errors
+
+        delete_errors = [
+            'Peça não encontrada.' if pk not in instances else
+            'Peça também está em update.' if pk in updated_ids else ''
+            for pk in delete
+        ]
+        if any(delete_errors):
+            errors['delete'] = delete_errors
+        if errors:
+            return None, errors
+
+        try:
+            with stock_reason(StockMovement.Reason.BULK):
+                created = create_serializer.save() if create else []
+                updated = update_serializer.save() if update else []
+                deleted = _delete(delete)
+        except IntegrityError as e:
+            return None, {'non_field_errors': [f'Conflito ao gravar o lote: {e}']}
+
+        if created or updated or deleted:
+            invalidate_auto_parts()
+
+    return {
+        'created': [part.id for part in created],
+        'updated': [part.id for part in updated],
+        'deleted': sorted(deleted),
+    }, None
@@ -0,0 +1,113 @@
+"""Versioned response cache for the auto-parts read endpoints.
+
+Cached responses are stored under the current catalogue version. Writes do
+not delete keys, they replace the version, so old entries simply stop being
+read and expire. Paths that bypass model signals (bulk_create, COPY imports,
+queryset.update()) only have to call invalidate_auto_parts().
+
+The cache is an optimization: if Redis is unavailable every lookup is a miss.
+"""
+import hashlib
+import logging
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from rest_framework.response import Response
+
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'auto-parts:version'
+HITS_KEY = 'auto-parts:hits'
+MISSES_KEY = 'auto-parts:misses'
+
+
+def _new_version():
+    return f'{time.time_ns()}.{uuid.uuid4().hex[:8]}'
+
+
+def _bump_version():
+    try:
+        cache.set(VERSION_KEY, _new_version(), timeout=None)
+    except Exception:
+        logger.warning('Não foi possível invalidar o cache de peças.', exc_info=True)
+
+
+def invalidate_auto_parts():
+    """Invalidates every cached auto-parts response.
+
+    Inside a transaction the version is replaced again on commit, so a read
+    that cached uncommitted state in between is discarded as well.
+    """
+    _bump_version()
+    if connection.in_atomic_block:
+        transaction.on_commit(_bump_version)
+
+
+def catalogue_version():
+    """Returns the current catalogue version, '<nanoseconds>.<random>' of the last write."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _cache_key(request, action):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'auto-parts:{catalogue_version()}:{action}:{path}'
+
+
+def _count(key):
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 0, timeout=None)
+            cache.incr(key)
+    except Exception:
+        logger.warning('Não foi possível atualizar as estatísticas do cache de peças.', exc_info=True)
+
+
+def cache_stats():
+    """Returns the hit and miss counters of the auto-parts cache."""
+    try:
+        stats = cache.get_many([HITS_KEY, MISSES_KEY])
+    except Exception:
+        logger.warning('Cache de peças indisponível.', exc_info=True)
+        stats = {}
+    return {'hits': stats.get(HITS_KEY, 0), 'misses': stats.get(MISSES_KEY, 0)}
+
+
+class CachedReadMixin:
+    """ViewSet mixin that serves list and retrieve from the versioned cache."""
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, view, request, *args, **kwargs):
+        try:
+            key = _cache_key(request, self.action)
+            data = cache.get(key)
+        except Exception:
+            logger.warning('Cache de peças indisponível.', exc_info=True)
+            return view(request, *args, **kwargs)
+
+        if data is not None:
+            _count(HITS_KEY)
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            try:
+                cache.set(key, response.data, timeout=settings.AUTO_PART_CACHE_TIMEOUT)
+                _count(MISSES_KEY)
+            except Exception:
+                logger.warning('Não foi possível gravar no cache de peças.', exc_info=True)
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,70 @@
+"""Change feed for incremental catalogue sync.
+
+Feed entries are ordered by (txid, id) and only entries of transactions older
+than the oldest running one are served. Any transaction that could still add
+an entry before the cursor has therefore finished, so a client that resumes
+from its last cursor never misses a change.
+"""
+import base64
+import binascii
+import json
+from collections import namedtuple
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import NotFound
+from core.models import AutoPart, AutoPartChange
+from inventory.serializers import AutoPartReadSerializer
+
+
+ChangeCursor = namedtuple('ChangeCursor', ['txid', 'id'])
+
+START = ChangeCursor(txid=0, id=0)
+SNAPSHOT_XMIN = RawSQL('pg_snapshot_xmin(pg_current_snapshot())::text::bigint', [])
+
+
+def encode_cursor(cursor):
+    data = json.dumps({'t': cursor.txid, 'id': cursor.id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(encoded):
+    if not encoded:
+        return START
+
+    try:
+        data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        return ChangeCursor(txid=int(data['t']), id=int(data['id']))
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise NotFound('Cursor inválido.')
+
+
+def changes_since(cursor, limit):
+    """Returns (changes, next cursor, has more) for at most `limit` feed entries after `cursor`.
+
+    Each part appears once, with its current state, or as deleted if it no
+    longer exists.
+    """
+    entries = list(
+        AutoPartChange.objects
+        .filter(Q(txid__gt=cursor.txid) | Q(txid=cursor.txid, id__gt=cursor.id), txid__lt=SNAPSHOT_XMIN)
+        .order_by('txid', 'id')
+        .values_list('txid', 'id', 'part_id')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return [], cursor, False
+
+    part_ids = list(dict.fromkeys(part_id for _, _, part_id in reversed(entries)))[::-1]
+    serializer = AutoPartReadSerializer()
+    parts = {
+        row['id']: serializer.to_representation(row)
+        for row in AutoPart.objects.filter(id__in=part_ids).values(*AutoPartReadSerializer.fields)
+    }
+    changes = [
+        {'id': part_id, 'operation': 'upsert', 'part': parts[part_id]} if part_id in parts else
+        {'id': part_id, 'operation': 'delete', 'part': None}
+        for part_id in part_ids
+    ]
+    last_txid, last_id, _ = entries[-1]
+    return changes, ChangeCursor(txid=last_txid, id=last_id), has_more
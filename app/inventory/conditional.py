@@ -0,0 +1,80 @@
+"""Conditional GET (ETag / Last-Modified) for the auto-parts read endpoints.
+
+A detail response is versioned by the part's updated_at and a list response
+by the catalogue version of inventory.cache, which every write path replaces.
+Both validators are looked up without serializing anything, so a poll that
+answers 304 costs at most one indexed single-column query.
+"""
+import hashlib
+import logging
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from inventory.cache import catalogue_version
+
+
+logger = logging.getLogger(__name__)
+
+CONDITIONAL_HEADERS = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+
+
+def _etag(request, token):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()[:12]
+    return f'W/"{token}-{path}"'
+
+
+def _microseconds(moment):
+    return int(moment.timestamp() * 1_000_000)
+
+
+class ConditionalGetMixin:
+    """ViewSet mixin that sets ETag and Last-Modified on list and retrieve and answers 304."""
+
+    def list(self, request, *args, **kwargs):
+        try:
+            version = catalogue_version()
+        except Exception:
+            logger.warning('Cache de peças indisponível.', exc_info=True)
+            return super().list(request, *args, **kwargs)
+
+        etag = _etag(request, version)
+        last_modified = int(version.split('.')[0]) // 1_000_000_000
+        return self.conditional_response(super().list, etag, last_modified, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not any(header in request.META for header in CONDITIONAL_HEADERS):
+            response = super().retrieve(request, *args, **kwargs)
+            if response.status_code == 200:
+                if 'updated_at' in response.data:
+                    updated_at = parse_datetime(response.data['updated_at'])
+                else:
+                    updated_at = self.get_updated_at(kwargs)
+                self.set_validators(response, _etag(request, _microseconds(updated_at)), int(updated_at.timestamp()))
+            return response
+
+        updated_at = self.get_updated_at(kwargs)
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = _etag(request, _microseconds(updated_at))
+        return self.conditional_response(super().retrieve, etag, int(updated_at.timestamp()),
+                                         request, *args, **kwargs)
+
+    def get_updated_at(self, kwargs):
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        return self.filter_queryset(self.get_queryset()).filter(**lookup).values_list(
+            'updated_at', flat=True
+        ).first()
+
+    def conditional_response(self, view, etag, last_modified, request, *args, **kwargs):
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        self.set_validators(response, etag, last_modified)
+        return response
+
+    def set_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
@@ -0,0 +1,116 @@
+"""PostgreSQL COPY import engine for large catalogue loads."""
+import csv
+import io
+
+from django.conf import settings
+from django.db import NotSupportedError, connection
+from core.models import AutoPart, StockMovement
+from inventory.cache import invalidate_auto_parts
+from inventory.imports import UPSERT_FIELDS, batched, parse_rows, reject_existing_skus, row_hash
+from inventory.ledger import stock_reason
+
+
+STAGING_TABLE = 'autopart_import_staging'
+COLUMNS = ['name', 'description', 'price', 'stock_quantity', 'sku']
+
+
+class CSVRowStream:
+    """Read-only file object that renders rows as CSV on demand, for COPY FROM STDIN."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._pending = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+def _staged_rows(parsed, upsert):
+    for index, values in parsed:
+        yield [index] + [values[column] for column in COLUMNS] + [row_hash(values) if upsert else None]
+
+
+def _merge(cursor, table, columns, upsert):
+    """Moves the staged rows into the parts table. Returns the created, updated and unchanged counts.
+
+    In upsert mode the last row of each SKU is merged, unless the part is
+    already stored with the same content hash.
+    """
+    if not upsert:
+        cursor.execute(f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {STAGING_TABLE} ORDER BY line')
+        return cursor.rowcount, 0, 0
+
+    quote = connection.ops.quote_name
+    updates = ', '.join(f'{quote(field)} = EXCLUDED.{quote(field)}' for field in UPSERT_FIELDS)
+    cursor.execute(
+        f'WITH latest AS ('
+        f'  SELECT DISTINCT ON (sku) {columns}, content_hash FROM {STAGING_TABLE} ORDER BY sku, line DESC'
+        f'), merged AS ('
+        f'  INSERT INTO {table} ({columns})'
+        f'  SELECT {columns} FROM latest WHERE NOT EXISTS ('
+        f'    SELECT 1 FROM {table} AS part WHERE part.sku = latest.sku AND part.content_hash = latest.content_hash'
+        f'  )'
+        f'  ON CONFLICT (sku) DO UPDATE SET {updates}'
+        f'  RETURNING (xmax = 0) AS inserted'
+        f') SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted),'
+        f' (SELECT count(*) FROM latest) - count(*) FROM merged'
+    )
+    return cursor.fetchone()
+
+
+def copy_rows(rows, upsert, progress):
+    """Validates (index, row) pairs, streams them into a staging table with COPY and
+    merges the staging table into the parts table with a single statement.
+
+    Works like inventory.imports.import_rows, committing one COPY batch of
+    CSV_COPY_BATCH_SIZE rows at a time together with its progress.
+    """
+    if connection.vendor != 'postgresql':
+        raise NotSupportedError('O motor de importação COPY requer PostgreSQL.')
+
+    quote = connection.ops.quote_name
+    table = quote(AutoPart._meta.db_table)
+    columns = ', '.join(quote(column) for column in COLUMNS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} (line bigint, LIKE {table} INCLUDING DEFAULTS)'
+        )
+        cursor.execute(f'ALTER TABLE {STAGING_TABLE} DROP COLUMN IF EXISTS id')
+
+        try:
+            for batch in batched(rows, settings.CSV_COPY_BATCH_SIZE):
+                parsed = parse_rows(batch, upsert, progress)
+                with stock_reason(StockMovement.Reason.IMPORT):
+                    if not upsert:
+                        parsed = reject_existing_skus(parsed, progress)
+                    cursor.execute(f'TRUNCATE {STAGING_TABLE}')
+                    cursor.copy_expert(
+                        f'COPY {STAGING_TABLE} (line, {columns}, content_hash) FROM STDIN '
+                        f'WITH (FORMAT csv, FORCE_NOT_NULL (name, description))',
+                        CSVRowStream(_staged_rows(parsed, upsert)),
+                    )
+                    created, updated, unchanged = _merge(cursor, table, columns, upsert)
+                    if created or updated:
+                        invalidate_auto_parts()
+                    progress.created += created
+                    progress.updated += updated
+                    progress.unchanged += unchanged
+                    progress.processed += len(batch)
+                    progress.flush()
+        finally:
+            cursor.execute(f'DROP TABLE IF EXISTS {STAGING_TABLE}')
@@ -0,0 +1,68 @@
+"""Streaming catalogue export, as CSV in the import layout or as NDJSON.
+
+Rows are read through a server-side cursor in EXPORT_CHUNK_SIZE batches and
+written out one batch at a time, so memory stays flat and the header is sent
+before the first query completes.
+"""
+import csv
+import json
+from django.conf import settings
+from inventory.serializers import AutoPartReadSerializer
+
+
+# CSV header -> AutoPart field, in the column order read by the CSV import.
+CSV_COLUMNS = {
+    'codigo': 'sku',
+    'nome': 'name',
+    'descricao': 'description',
+    'preco': 'price',
+    'quantidade_inicial': 'stock_quantity',
+}
+
+
+class Echo:
+    """File-like object that returns what is written, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def fields_without_csv_column(fields):
+    """Returns the requested fields that have no column in the CSV layout."""
+    return [field for field in fields or () if field not in CSV_COLUMNS.values()]
+
+
+def csv_lines(queryset, fields=None):
+    """CSV in the import layout, limited to the columns of `fields` (all of them when None)."""
+    columns = {header: field for header, field in CSV_COLUMNS.items() if fields is None or field in fields}
+    writer = csv.writer(Echo())
+    yield writer.writerow(list(columns))
+    rows = queryset.values_list(*columns.values()).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    yield from _batches((writer.writerow(row) for row in rows), settings.EXPORT_CHUNK_SIZE)
+
+
+def ndjson_lines(queryset, fields=None):
+    serializer = AutoPartReadSerializer(fields=fields)
+    columns = fields or AutoPartReadSerializer.fields
+    rows = queryset.values(*columns).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    yield from _batches(
+        (json.dumps(serializer.to_representation(row), ensure_ascii=False) + '\n' for row in rows),
+        settings.EXPORT_CHUNK_SIZE,
+    )
+
+
+EXPORT_FORMATS = {
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+    'ndjson': (ndjson_lines, 'application/x-ndjson; charset=utf-8'),
+}
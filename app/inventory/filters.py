@@ -0,0 +1,113 @@
+from decimal import Decimal, InvalidOperation
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from inventory.validation import MAX_PRICE
+
+
+SEARCH_CONFIG = 'portuguese'
+
+
+def search_vector():
+    """Full-text document of a part. Must match the expression of the GIN index on AutoPart."""
+    return SearchVector('name', 'description', config=SEARCH_CONFIG)
+
+
+class AutoPartFilterBackend(BaseFilterBackend):
+    """Filters auto parts by text search, price range and stock availability.
+
+    `search` uses PostgreSQL full-text search and falls back to trigram
+    similarity on the name when nothing matches, so typos still find parts.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        queryset, matches = self.filter_params(request.query_params, queryset)
+        if matches is None:
+            return queryset
+        return matches if matches.exists() else self.similar(request.query_params, queryset)
+
+    async def afilter_queryset(self, request, queryset, view):
+        """Async variant of filter_queryset, checking for search matches with the async ORM."""
+        queryset, matches = self.filter_params(request.query_params, queryset)
+        if matches is None:
+            return queryset
+        return matches if await matches.aexists() else self.similar(request.query_params, queryset)
+
+    def filter_params(self, params, queryset):
+        """Applies the price and stock filters. Returns them and the full-text matches, if searching."""
+        price_min = self.parse_decimal(params, 'price_min')
+        if price_min is not None:
+            queryset = queryset.filter(price__gte=price_min)
+
+        price_max = self.parse_decimal(params, 'price_max')
+        if price_max is not None:
+            queryset = queryset.filter(price__lte=price_max)
+
+        in_stock = params.get('in_stock')
+        if in_stock is not None:
+            if in_stock.lower() not in ('true', 'false', '1', '0'):
+                raise ValidationError({'in_stock': "Use 'true' ou 'false'."})
+            if in_stock.lower() in ('true', '1'):
+                queryset = queryset.filter(stock_quantity__gt=0)
+            else:
+                queryset = queryset.filter(stock_quantity=0)
+
+        term = params.get('search', '').strip()
+        if not term:
+            return queryset, None
+
+        matches = queryset.annotate(search=search_vector()).filter(
+            search=SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+        )
+        return queryset, matches
+
+    def similar(self, params, queryset):
+        """Trigram fallback for searches without full-text matches, so typos still find parts."""
+        return queryset.filter(name__trigram_similar=params['search'].strip())
+
+    def parse_decimal(self, params, name):
+        """Parses a price bound. NaN, infinities and values the price column cannot hold are rejected."""
+        value = params.get(name)
+        if value is None:
+            return None
+        try:
+            price = Decimal(value)
+        except InvalidOperation:
+            raise ValidationError({name: 'Informe um número válido.'})
+        if not price.is_finite():
+            raise ValidationError({name: 'Informe um número válido.'})
+        if abs(price) > MAX_PRICE:
+            raise ValidationError({name: f'Informe um valor entre -{MAX_PRICE} e {MAX_PRICE}.'})
+        return price
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': 'search',
+                'required': False,
+                'in': 'query',
+                'description': 'Busca textual em nome e descrição, tolerante a erros de digitação.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': 'price_min',
+                'required': False,
+                'in': 'query',
+                'description': 'Preço mínimo.',
+                'schema': {'type': 'number'},
+            },
+            {
+                'name': 'price_max',
+                'required': False,
+                'in': 'query',
+                'description': 'Preço máximo.',
+                'schema': {'type': 'number'},
+            },
+            {
+                'name': 'in_stock',
+                'required': False,
+                'in': 'query',
+                'description': 'Apenas peças com (true) ou sem (false) estoque.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
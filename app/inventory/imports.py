@@ -0,0 +1,345 @@
+"""Helpers for spooling uploaded CSV files and reading them back in batches.
+
+Files may be gzip or zstd compressed, as told by their name; they are stored
+as received and decompressed as a stream while being read.
+"""
+import codecs
+import csv
+import gzip
+import hashlib
+import io
+import resource
+import shutil
+import tempfile
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from decimal import ROUND_HALF_UP, Decimal
+from itertools import islice
+
+import zstandard
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Greatest
+from core.models import (
+    CONTENT_HASH_FIELDS, CONTENT_HASH_SEPARATOR, AutoPart, ImportJob, ImportJobError, StockMovement,
+)
+from inventory.cache import invalidate_auto_parts
+from inventory.ledger import stock_reason
+from inventory.validation import PRICE_QUANTUM, validate_rows
+
+
+UPLOAD_DIR = 'imports'
+ENCODING_SAMPLE_SIZE = 64 * 1024
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# File name suffixes accepted for imports and their compression.
+COMPRESSIONS = {
+    '.csv': '',
+    '.csv.gz': 'gzip',
+    '.csv.zst': 'zstd',
+}
+DECOMPRESSION_ERRORS = (EOFError, gzip.BadGzipFile, zlib.error, zstandard.ZstdError)
+
+
+def compression_of(name):
+    """Returns the compression of a CSV file from its name ('' if plain), or None if it is not a CSV file."""
+    name = name.lower()
+    return next((compression for suffix, compression in COMPRESSIONS.items() if name.endswith(suffix)), None)
+
+
+def suffix_of(compression):
+    return next(suffix for suffix, known in COMPRESSIONS.items() if known == compression)
+
+
+def decompressed(stream, compression):
+    """Wraps a binary stream in a streaming decompressor. Closing the wrapper leaves `stream` open."""
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=stream, mode='rb')
+    if compression == 'zstd':
+        return zstandard.ZstdDecompressor().stream_reader(stream, read_across_frames=True, closefd=False)
+    return stream
+
+
+def check_encoding(stream, compression=''):
+    """Raises UnicodeDecodeError if the beginning of the (decompressed) file is not valid UTF-8.
+
+    Compressed files that cannot be decompressed raise one of DECOMPRESSION_ERRORS.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    decoder.decode(decompressed(stream, compression).read(ENCODING_SAMPLE_SIZE))
+    stream.seek(0)
+
+
+def file_digest(stream):
+    """Returns the SHA-256 hex digest of a binary stream, read in chunks from the start."""
+    stream.seek(0)
+    digest = hashlib.file_digest(stream, 'sha256').hexdigest()
+    stream.seek(0)
+    return digest
+
+
+def save_upload(uploaded_file, compression=''):
+    """Stores an uploaded file in the shared storage and returns its name."""
+    return default_storage.save(f'{UPLOAD_DIR}/{uuid.uuid4().hex}{suffix_of(compression)}', uploaded_file)
+
+
+def create_upload(compression=''):
+    """Stores an empty file for a resumable upload and returns its name."""
+    return save_upload(ContentFile(b''), compression)
+
+
+def receive_part(stream, max_size):
+    """Copies a part of a resumable upload to a temporary file, so no lock is held while it arrives.
+
+    Returns the file, rewound, or None if the stream is longer than `max_size` bytes.
+    """
+    part = tempfile.TemporaryFile()
+    written = 0
+    while data := stream.read(COPY_BUFFER_SIZE):
+        written += len(data)
+        if written > max_size:
+            part.close()
+            return None
+        part.write(data)
+    part.seek(0)
+    return part
+
+
+def append_upload(file_name, offset, part):
+    """Writes a received part to a stored file from `offset` on, dropping anything already stored after it.
+
+    Returns the number of bytes written.
+    """
+    with default_storage.open(file_name, 'r+b') as upload:
+        upload.seek(offset)
+        upload.truncate()
+        shutil.copyfileobj(part, upload, COPY_BUFFER_SIZE)
+        return upload.tell() - offset
+
+
+@contextmanager
+def read_text(stream, compression=''):
+    """Reads an open binary, possibly compressed, stream as CSV text, then rewinds it and leaves it open."""
+    text = io.TextIOWrapper(decompressed(stream, compression), encoding='utf-8', newline='')
+    try:
+        yield text
+    finally:
+        text.detach()
+        stream.seek(0)
+
+
+@contextmanager
+def open_csv(file_name):
+    """Opens a stored, possibly compressed, CSV file as a text stream, without loading it in memory."""
+    with default_storage.open(file_name, 'rb') as raw, decompressed(raw, compression_of(file_name)) as stream:
+        yield io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+
+def decompress_upload(file_name):
+    """Stores a decompressed copy of a compressed upload, deletes the original and returns the copy's name."""
+    with default_storage.open(file_name, 'rb') as raw, decompressed(raw, compression_of(file_name)) as stream:
+        plain_name = save_upload(File(stream))
+    default_storage.delete(file_name)
+    return plain_name
+
+
+def split_csv(file_name, rows_per_chunk):
+    """Splits a stored CSV file into byte ranges of at most `rows_per_chunk` records.
+
+    Returns the header fieldnames and a list of (start, end, first_row) tuples,
+    where first_row is the index of the first data record of the range. Quoted
+    fields spanning several lines are kept inside a single record.
+    """
+    chunks = []
+    with default_storage.open(file_name, 'rb') as csv_file:
+        header = csv_file.readline()
+        fieldnames = next(csv.reader([header.decode('utf-8')]), [])
+        offset = start = len(header)
+        records = first_row = 0
+        quotes = 0
+
+        for line in iter(csv_file.readline, b''):
+            offset += len(line)
+            quotes += line.count(b'"')
+            if quotes % 2 or not line.strip():
+                continue
+            quotes = 0
+            records += 1
+            if records - first_row == rows_per_chunk:
+                chunks.append((start, offset, first_row))
+                start, first_row = offset, records
+
+        if offset > start:
+            chunks.append((start, offset, first_row))
+
+    return fieldnames, chunks
+
+
+def read_csv_range(file_name, fieldnames, start, end):
+    """Returns a DictReader over the records stored between two byte offsets."""
+    with default_storage.open(file_name, 'rb') as csv_file:
+        csv_file.seek(start)
+        data = csv_file.read(end - start)
+    return csv.DictReader(io.StringIO(data.decode('utf-8'), newline=''), fieldnames=fieldnames)
+
+
+UPSERT_FIELDS = ['name', 'description', 'price', 'stock_quantity', 'updated_at']
+
+
+def row_hash(values):
+    """Returns the AutoPart.content_hash PostgreSQL computes for a part stored with these field values."""
+    stored = {
+        **values,
+        'price': Decimal(str(values['price'])).quantize(PRICE_QUANTUM, ROUND_HALF_UP),
+        'sku': values['sku'] or '',
+    }
+    text = CONTENT_HASH_SEPARATOR.join(str(stored[field]) for field in CONTENT_HASH_FIELDS)
+    return hashlib.md5(text.encode('utf-8'), usedforsecurity=False).hexdigest()
+
+
+def _upsert(bulk_data):
+    """Inserts or updates parts keyed on their SKU, skipping those whose content is already stored.
+
+    Returns the created, updated and unchanged counts.
+    """
+    by_sku = {part.sku: part for part in bulk_data}
+    stored = dict(AutoPart.objects.filter(sku__in=by_sku).values_list('sku', 'content_hash'))
+    changed = [
+        part for sku, part in by_sku.items()
+        if stored.get(sku) != row_hash({field: getattr(part, field) for field in CONTENT_HASH_FIELDS})
+    ]
+    if changed:
+        AutoPart.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=UPSERT_FIELDS,
+        )
+    updated = sum(part.sku in stored for part in changed)
+    return len(changed) - updated, updated, len(by_sku) - len(changed)
+
+
+def peak_memory_kb():
+    """Returns the memory high-water mark of the current process, in KB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class ImportProgress:
+    """Counts of a running import, persisted incrementally to its ImportJob.
+
+    Row errors are buffered until the next flush() and then written to the
+    database, so memory stays bounded however many rows are rejected. Counters
+    are applied as increments, so several chunks can report to the same job.
+    """
+    COUNTERS = {
+        'processed': 'rows_processed',
+        'created': 'rows_created',
+        'updated': 'rows_updated',
+        'unchanged': 'rows_unchanged',
+        'error_count': 'error_count',
+    }
+
+    def __init__(self, job_id=None):
+        self.job_id = job_id
+        self.processed = self.created = self.updated = self.unchanged = self.error_count = 0
+        self._flushed = dict.fromkeys(self.COUNTERS, 0)
+        self._errors = []
+        self._started = time.monotonic()
+
+    def add_error(self, index, message, code=''):
+        self.error_count += 1
+        if self.job_id:
+            self._errors.append(ImportJobError(job_id=self.job_id, line=index + 2, code=code, message=message))
+
+    def flush(self):
+        """Writes the buffered errors and the counters accumulated since the last flush."""
+        if not self.job_id:
+            return
+
+        ImportJobError.objects.bulk_create(self._errors)
+        self._errors = []
+
+        elapsed = time.monotonic() - self._started
+        ImportJob.objects.filter(pk=self.job_id).update(
+            **{
+                column: F(column) + getattr(self, counter) - self._flushed[counter]
+                for counter, column in self.COUNTERS.items()
+            },
+            rows_per_second=self.processed / elapsed if elapsed else None,
+            peak_memory_kb=Greatest(Coalesce(F('peak_memory_kb'), Value(0)), Value(peak_memory_kb())),
+        )
+        self._flushed = {counter: getattr(self, counter) for counter in self.COUNTERS}
+
+
+def parse_rows(rows, upsert, progress):
+    """Returns (index, field values) for the valid (index, row) pairs of a batch, reporting the others to `progress`."""
+    valid, errors = validate_rows(rows, upsert)
+    for error in errors:
+        progress.add_error(error.index, error.message, error.code)
+    return valid
+
+
+def reject_existing_skus(parsed, progress):
+    """Create mode: reports the rows whose SKU is already stored, or taken by an earlier row of the batch.
+
+    Returns the other (index, field values) pairs. One query per batch, so a
+    repeated SKU is a row error instead of an IntegrityError failing the job.
+    """
+    skus = {values['sku'] for _, values in parsed if values['sku']}
+    if not skus:
+        return parsed
+
+    taken = set(AutoPart.objects.filter(sku__in=skus).values_list('sku', flat=True))
+    kept = []
+    for index, values in parsed:
+        sku = values['sku']
+        if sku in taken:
+            progress.add_error(index, f"Código já cadastrado: {sku}.", ImportJobError.Code.DUPLICATE_SKU)
+            continue
+        if sku:
+            taken.add(sku)
+        kept.append((index, values))
+    return kept
+
+
+def import_rows(rows, upsert, progress):
+    """Builds and bulk inserts (index, row) pairs in batches.
+
+    Each batch is committed together with its progress, so the job counters
+    always match the rows stored. In create mode a row whose SKU is already
+    stored is reported as a row error. In upsert mode rows are matched on
+    their SKU and existing parts are updated in place, unless their content
+    hash shows the row is already stored as is.
+    """
+    for batch in batched(rows, settings.CSV_IMPORT_BATCH_SIZE):
+        parsed = parse_rows(batch, upsert, progress)
+
+        with stock_reason(StockMovement.Reason.IMPORT):
+            if not upsert:
+                parsed = reject_existing_skus(parsed, progress)
+            bulk_data = [AutoPart(**values) for _, values in parsed]
+            created = updated = 0
+            if upsert and bulk_data:
+                created, updated, unchanged = _upsert(bulk_data)
+                progress.unchanged += unchanged
+            elif bulk_data:
+                AutoPart.objects.bulk_create(bulk_data)
+                created = len(bulk_data)
+            if created or updated:
+                invalidate_auto_parts()
+            progress.created += created
+            progress.updated += updated
+            progress.processed += len(batch)
+            progress.flush()
+
+
+def batched(iterable, size):
+    """Yields lists of at most `size` items from `iterable`."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
@@ -0,0 +1,24 @@
+"""Origin tagging for the stock movement ledger.
+
+Movements are written by database triggers (see core.models.StockMovement),
+which read their reason from the transaction-local `inventory.stock_reason`
+setting. Writes made outside stock_reason() are recorded as 'manual'.
+"""
+from contextlib import contextmanager
+from django.db import connection, transaction
+
+
+REASON_SETTING = 'inventory.stock_reason'
+
+
+@contextmanager
+def stock_reason(reason):
+    """Runs the block in a transaction whose stock movements are tagged with `reason`."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT current_setting(%s, true), set_config(%s, %s, true)', [REASON_SETTING, REASON_SETTING, reason]
+        )
+        previous = cursor.fetchone()[0] or ''
+        yield
+        # On errors the rollback restores the previous reason by itself.
+        cursor.execute('SELECT set_config(%s, %s, true)', [REASON_SETTING, previous])
@@ -0,0 +1,64 @@
+'''
+Compare the ORM and COPY import engines on synthetic catalogues.
+'''
+
+import csv
+import json
+import tempfile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from inventory.bench import Timer, isolated_cache, write_synthetic_csv
+from inventory.imports import ImportProgress
+from inventory.tasks import IMPORT_ENGINES
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the CSV import engines. Every run is rolled back, and the cache invalidations of the '
+        'engines go to a cache key prefix of their own.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000',
+                            help='Comma separated row counts to benchmark.')
+        parser.add_argument('--engines', default=','.join(IMPORT_ENGINES),
+                            help='Comma separated engines to benchmark.')
+        parser.add_argument('--upsert', action='store_true', help='Benchmark the upsert mode.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        results = []
+        with isolated_cache():
+            for size in [int(size) for size in options['sizes'].split(',')]:
+                with tempfile.NamedTemporaryFile('w+', suffix='.csv', newline='', encoding='utf-8') as csv_file:
+                    write_synthetic_csv(csv_file, size)
+                    for engine in options['engines'].split(','):
+                        csv_file.seek(0)
+                        results.append(self._run(engine, size, csv_file, options['upsert']))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            self.stdout.write(
+                f"{result['engine']:>5} {result['rows']:>9} linhas: {result['seconds']:8.2f}s "
+                f"{result['rows_per_second']:>10.0f} linhas/s ({result['created']} criadas, {result['errors']} erros)"
+            )
+
+    def _run(self, engine, size, csv_file, upsert):
+        progress = ImportProgress()
+        with transaction.atomic():
+            with Timer() as timer:
+                IMPORT_ENGINES[engine](enumerate(csv.DictReader(csv_file)), upsert, progress)
+            transaction.set_rollback(True)
+
+        return {
+            'engine': engine,
+            'rows': size,
+            'seconds': round(timer.elapsed, 3),
+            'rows_per_second': round(size / timer.elapsed, 1) if timer.elapsed else None,
+            'created': progress.created,
+            'updated': progress.updated,
+            'errors': progress.error_count,
+        }
@@ -0,0 +1,236 @@
+'''
+Benchmark the inventory API and tasks on a synthetic catalogue.
+'''
+
+import csv
+import json
+import random
+import resource
+import tempfile
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import AutoPart, StockMovement
+from inventory.bench import Timer, isolated_cache, latency_percentiles, synthetic_parts, write_synthetic_csv
+from inventory.cache import invalidate_auto_parts
+from inventory.imports import ImportProgress
+from inventory.replenish import replenish
+from inventory.serializers import TokenObtainPairSerializer
+from inventory.tasks import IMPORT_ENGINES
+
+
+SKU_OFFSET = 3 * 10**9
+BENCH_USERNAME = 'bench-inventory'
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far; Linux reports ru_maxrss in KiB."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class QueryCounter:
+    """Database execute wrapper counting the queries of the current thread's connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates a synthetic catalogue, drives the auto-parts API (list, retrieve, search, bulk update) with '
+        'concurrent clients and runs the CSV import and stock replenishment, reporting latency percentiles, '
+        'throughput, queries per operation and peak RSS. The import run is rolled back; the replenishment '
+        'only walks the synthetic parts, and the catalogue and its stock movements are deleted at the end. '
+        'The scenarios use a cache key prefix of their own, so the response cache of running servers is left '
+        'alone. Each client holds a database connection.'
+    )
+
+    http_scenarios = ('list', 'retrieve', 'search', 'bulk_update')
+    task_scenarios = ('import', 'replenish')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--parts', type=int, default=10000, help='Synthetic parts in the catalogue.')
+        parser.add_argument('--clients', type=int, default=16, help='Concurrent API clients.')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per API scenario.')
+        parser.add_argument('--bulk-size', type=int, default=100, help='Parts changed per bulk update request.')
+        parser.add_argument('--import-rows', type=int, default=10000, help='Rows of the CSV import run.')
+        parser.add_argument('--import-engine', default='copy', choices=sorted(IMPORT_ENGINES),
+                            help='CSV import engine.')
+        parser.add_argument('--scenarios', default=','.join(self.http_scenarios + self.task_scenarios),
+                            help='Comma separated scenarios to run.')
+        parser.add_argument('--no-cache', action='store_true',
+                            help='Invalidate the response cache before every API request, measuring uncached reads.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for comparable runs.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        scenarios = [name for name in options['scenarios'].split(',') if name]
+        unknown = set(scenarios) - set(self.http_scenarios + self.task_scenarios)
+        if unknown:
+            raise CommandError(f"Cenários inválidos: {', '.join(sorted(unknown))}.")
+
+        random.seed(options['seed'])
+        user, part_ids = None, []
+        try:
+            user = get_user_model().objects.create_user(username=BENCH_USERNAME, is_staff=True)
+            token = str(TokenObtainPairSerializer.get_token(user).access_token)
+            with Timer() as setup:
+                part_ids = [
+                    part.id for part in AutoPart.objects.bulk_create(
+                        synthetic_parts(options['parts'], offset=SKU_OFFSET), batch_size=5000
+                    )
+                ]
+            results = []
+            with isolated_cache():
+                for name in scenarios:
+                    if name in self.http_scenarios:
+                        results.append(self._run_requests(name, token, part_ids, options))
+                    else:
+                        results.append(getattr(self, f'_run_{name}')(part_ids, options))
+        finally:
+            AutoPart.objects.filter(id__in=part_ids).delete()
+            StockMovement.objects.filter(part_id__in=part_ids).delete()
+            if user is not None:
+                user.delete()
+
+        report = {
+            'parts': options['parts'],
+            'clients': options['clients'],
+            'cache': not options['no_cache'],
+            'setup_seconds': round(setup.elapsed, 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'scenarios': results,
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"{report['parts']} peças sintéticas, {report['clients']} clientes:")
+        for result in results:
+            self.stdout.write(
+                f"{result['scenario']:>12}: {result['operations']} operações em {result['seconds']:.2f}s, "
+                f"{result['operations_per_second']:.1f} op/s, {result['errors']} erros, "
+                f"p50 {result['p50_ms']}ms p95 {result['p95_ms']}ms p99 {result['p99_ms']}ms, "
+                f"{result['queries_per_operation']} consultas/op, pico de RSS {result['peak_rss_mb']}MB"
+            )
+
+    def _request(self, name, rng, part_ids, options):
+        """Returns the method, path and data of one request of the scenario."""
+        if name == 'list':
+            return 'get', reverse('inventory:auto-part-list'), {
+                'page_size': 50, 'price_min': rng.randint(1, 1000), 'ordering': rng.choice(['id', 'price', 'name']),
+            }
+        if name == 'retrieve':
+            return 'get', reverse('inventory:auto-part-detail', args=[rng.choice(part_ids)]), None
+        if name == 'search':
+            number = SKU_OFFSET + rng.randrange(options['parts'])
+            return 'get', reverse('inventory:auto-part-list'), {'search': f'sintética {number}'}
+        items = [
+            {'id': part_id, 'price': f'{rng.randint(100, 99999) / 100:.2f}'}
+            for part_id in rng.sample(part_ids, min(options['bulk_size'], len(part_ids)))
+        ]
+        return 'post', reverse('inventory:auto-part-bulk'), {'update': items}
+
+    def _run_requests(self, name, token, part_ids, options):
+        latencies = []
+        outcomes = {'errors': 0, 'queries': 0, 'cache_hits': 0}
+        lock = threading.Lock()
+
+        def client(args):
+            count, seed = args
+            rng = random.Random(seed)
+            api = APIClient(SERVER_NAME='localhost')
+            api.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            counter = QueryCounter()
+            try:
+                with connection.execute_wrapper(counter):
+                    for _ in range(count):
+                        method, path, data = self._request(name, rng, part_ids, options)
+                        if options['no_cache']:
+                            invalidate_auto_parts()
+                        with Timer() as timer:
+                            response = getattr(api, method)(path, data, format='json' if method == 'post' else None)
+                        with lock:
+                            latencies.append(timer.elapsed)
+                            outcomes['errors'] += response.status_code >= 400
+                            outcomes['cache_hits'] += response.get('X-Cache') == 'HIT'
+                with lock:
+                    outcomes['queries'] += counter.count
+            finally:
+                connection.close()
+
+        clients = options['clients']
+        share, extra = divmod(options['requests'], clients)
+        work = [(share + (i < extra), random.random()) for i in range(clients)]
+        with Timer() as total:
+            with ThreadPoolExecutor(max_workers=clients) as executor:
+                list(executor.map(client, work))
+
+        return {
+            'scenario': name,
+            'operations': len(latencies),
+            'errors': outcomes['errors'],
+            'cache_hits': outcomes['cache_hits'],
+            'seconds': round(total.elapsed, 3),
+            'operations_per_second': round(len(latencies) / total.elapsed, 1),
+            **latency_percentiles(latencies),
+            'queries_per_operation': round(outcomes['queries'] / max(len(latencies), 1), 2),
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+    def _run_task(self, name, task, rollback=True):
+        """Times `task`, inside a rolled-back transaction unless `rollback` is false."""
+        counter = QueryCounter()
+        with transaction.atomic() if rollback else nullcontext(), connection.execute_wrapper(counter):
+            with Timer() as timer:
+                items = task()
+            if rollback:
+                transaction.set_rollback(True)
+
+        return {
+            'scenario': name,
+            'operations': 1,
+            'items': items,
+            'items_per_second': round(items / timer.elapsed, 1) if timer.elapsed else None,
+            'errors': 0,
+            'seconds': round(timer.elapsed, 3),
+            'operations_per_second': round(1 / timer.elapsed, 1) if timer.elapsed else None,
+            **latency_percentiles([timer.elapsed]),
+            'queries_per_operation': counter.count,
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+    def _run_import(self, part_ids, options):
+        """Upserts synthetic rows over the catalogue, half updates and half new parts."""
+        with tempfile.NamedTemporaryFile('w+', suffix='.csv', newline='', encoding='utf-8') as csv_file:
+            write_synthetic_csv(csv_file, options['import_rows'], offset=SKU_OFFSET + options['parts'] // 2)
+            csv_file.seek(0)
+            progress = ImportProgress()
+
+            def task():
+                IMPORT_ENGINES[options['import_engine']](enumerate(csv.DictReader(csv_file)), True, progress)
+                return progress.created + progress.updated
+
+            return self._run_task('import', task)
+
+    def _run_replenish(self, part_ids, options):
+        """Empties the stock of the synthetic catalogue and replenishes it.
+
+        Only the synthetic id range is walked, with the chunked transactions of production:
+        real parts are never locked, and the changes are removed with the catalogue.
+        """
+        AutoPart.objects.filter(id__in=part_ids).update(stock_quantity=0)
+
+        def task():
+            return replenish(id_range=(min(part_ids), max(part_ids))).count
+
+        return self._run_task('replenish', task, rollback=False)
@@ -0,0 +1,107 @@
+'''
+Stress the stock reservation functions with concurrent clients.
+'''
+
+import json
+import random
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core.models import AutoPart
+from inventory.bench import Timer, isolated_cache, synthetic_parts
+from inventory.stock import InsufficientStock, reserve, reserve_many
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs parallel stock reservations against synthetic parts and checks that nothing is oversold. '
+        'The reservations invalidate a cache key prefix of their own, not the response cache of running servers. '
+        'Each client holds a database connection, so PostgreSQL max_connections must exceed --clients.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200, help='Parallel clients.')
+        parser.add_argument('--parts', type=int, default=10, help='Synthetic parts competing for stock.')
+        parser.add_argument('--stock', type=int, default=1000, help='Initial stock of each part.')
+        parser.add_argument('--requests', type=int, default=20000, help='Total reservation requests.')
+        parser.add_argument('--cart-size', type=int, default=1,
+                            help='Parts per reservation; above 1 the cart path with row locks is used.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        if options['cart_size'] > options['parts']:
+            raise CommandError('--cart-size não pode ser maior que --parts.')
+
+        part_ids = []
+        try:
+            parts = AutoPart.objects.bulk_create(
+                synthetic_parts(options['parts'], offset=2 * 10**9)
+            )
+            part_ids = [part.id for part in parts]
+            AutoPart.objects.filter(id__in=part_ids).update(stock_quantity=options['stock'])
+            with isolated_cache():
+                result = self._run(part_ids, options)
+            remaining = list(AutoPart.objects.filter(id__in=part_ids).values_list('stock_quantity', flat=True))
+        finally:
+            AutoPart.objects.filter(id__in=part_ids).delete()
+
+        reserved_units = options['parts'] * options['stock'] - sum(remaining)
+        result['oversold'] = reserved_units != result['reserved'] * options['cart_size'] or min(remaining) < 0
+
+        if options['json']:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+
+        self.stdout.write(
+            f"{result['clients']} clientes, {result['requests']} pedidos em {result['seconds']:.2f}s: "
+            f"{result['reservations_per_second']:.0f} reservas/s, {result['reserved']} reservadas, "
+            f"{result['conflicts']} sem estoque, "
+            f"p50 {result['p50_ms']}ms p95 {result['p95_ms']}ms p99 {result['p99_ms']}ms, "
+            f"vendas além do estoque: {'SIM' if result['oversold'] else 'não'}"
+        )
+
+    def _run(self, part_ids, options):
+        latencies = []
+        outcomes = {'reserved': 0, 'conflicts': 0}
+        lock = threading.Lock()
+
+        def client(count):
+            try:
+                for _ in range(count):
+                    cart = random.sample(part_ids, options['cart_size'])
+                    with Timer() as timer:
+                        try:
+                            if len(cart) == 1:
+                                reserve(cart[0], 1)
+                            else:
+                                reserve_many((part_id, 1) for part_id in cart)
+                            outcome = 'reserved'
+                        except InsufficientStock:
+                            outcome = 'conflicts'
+                    with lock:
+                        outcomes[outcome] += 1
+                        latencies.append(timer.elapsed)
+            finally:
+                connection.close()
+
+        clients = options['clients']
+        share, extra = divmod(options['requests'], clients)
+        with Timer() as total:
+            with ThreadPoolExecutor(max_workers=clients) as executor:
+                list(executor.map(client, [share + (i < extra) for i in range(clients)]))
+
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            'clients': clients,
+            'requests': len(latencies),
+            'cart_size': options['cart_size'],
+            'seconds': round(total.elapsed, 3),
+            'reservations_per_second': round(len(latencies) / total.elapsed, 1),
+            'reserved': outcomes['reserved'],
+            'conflicts': outcomes['conflicts'],
+            'p50_ms': round(quantiles[49] * 1000, 2),
+            'p95_ms': round(quantiles[94] * 1000, 2),
+            'p99_ms': round(quantiles[98] * 1000, 2),
+        }
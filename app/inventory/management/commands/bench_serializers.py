@@ -0,0 +1,66 @@
+'''
+Compare AutoPartSerializer with the values-based AutoPartReadSerializer.
+'''
+
+import json
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import AutoPart
+from inventory.bench import Timer, synthetic_parts
+from inventory.serializers import AutoPartReadSerializer, AutoPartSerializer
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the AutoPart list serializers on synthetic parts. Every run is rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000', help='Comma separated item counts to benchmark.')
+        parser.add_argument('--fields', default='id,name,price', help='Sparse fieldset also benchmarked.')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per case; the best one is reported.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        fields = tuple(options['fields'].split(','))
+        results = []
+        for size in [int(size) for size in options['sizes'].split(',')]:
+            with transaction.atomic():
+                parts = AutoPart.objects.bulk_create(synthetic_parts(size, offset=10**9), batch_size=5000)
+                queryset = AutoPart.objects.filter(id__gte=parts[0].id).order_by('id')[:size]
+                cases = {
+                    'model': lambda: AutoPartSerializer(queryset.all(), many=True).data,
+                    'values': lambda: AutoPartReadSerializer(
+                        queryset.values(*AutoPartReadSerializer.fields), many=True
+                    ).data,
+                    'values+fields': lambda: AutoPartReadSerializer(
+                        queryset.values(*fields), many=True, fields=fields
+                    ).data,
+                }
+                for name, case in cases.items():
+                    results.append(self._run(name, size, case, options['repeat']))
+                transaction.set_rollback(True)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            self.stdout.write(
+                f"{result['serializer']:>13} {result['items']:>7} itens: {result['seconds'] * 1000:9.1f}ms "
+                f"{result['items_per_second']:>10.0f} itens/s, {result['bytes']} bytes"
+            )
+
+    def _run(self, name, size, case, repeat):
+        timings = []
+        for _ in range(repeat):
+            with Timer() as timer:
+                data = case()
+            timings.append(timer.elapsed)
+
+        best = min(timings)
+        return {
+            'serializer': name,
+            'items': len(data),
+            'seconds': round(best, 4),
+            'items_per_second': round(size / best, 1) if best else None,
+            'bytes': len(json.dumps(data, default=str)),
+        }
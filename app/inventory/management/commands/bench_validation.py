@@ -0,0 +1,113 @@
+'''
+Compare the columnar CSV validation with the per-row loop it replaced.
+'''
+
+import csv
+import io
+import json
+from collections import deque
+from itertools import islice
+from django.core.management.base import BaseCommand
+from inventory.bench import CSV_HEADER, Timer, synthetic_rows
+from inventory.validation import validate_csv, validate_rows
+
+# Invalid cells written into the synthetic rows, in turn: (column, value).
+CORRUPTIONS = [('preco', 'abc'), ('preco', '1.005'), ('quantidade_inicial', '-1'), ('quantidade_inicial', '2.5')]
+
+
+def row_loop(rows, upsert):
+    """The validation of inventory.imports before the columnar checks: parse each row inside a try/except."""
+    valid, errors = [], []
+    for index, row in rows:
+        try:
+            values = {
+                'name': row['nome'],
+                'description': row['descricao'],
+                'price': float(row['preco']),
+                'stock_quantity': int(row['quantidade_inicial']),
+                'sku': row.get('codigo') or None,
+            }
+        except Exception as e:
+            errors.append((index, str(e)))
+            continue
+        if upsert and not values['sku']:
+            errors.append((index, "Código da peça obrigatório no modo de atualização."))
+            continue
+        valid.append((index, values))
+    return valid, errors
+
+
+def batches(data, size):
+    rows = enumerate(csv.DictReader(io.StringIO(data, newline='')))
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the validation of import rows on in-memory synthetic catalogues: the former per-row loop, '
+        'the columnar validate_rows used by the import engines and the validate_csv pre-pass. CSV parsing is '
+        'included in every case and measured alone as a baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100000,1000000', help='Comma separated row counts to benchmark.')
+        parser.add_argument('--error-rate', type=float, default=0.01, help='Share of rows with an invalid cell.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows validated per batch.')
+        parser.add_argument('--upsert', action='store_true', help='Validate in upsert mode.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per case; the best one is reported.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        upsert, batch_size = options['upsert'], options['batch_size']
+        step = round(1 / options['error_rate']) if options['error_rate'] else 0
+        results = []
+        for size in [int(size) for size in options['sizes'].split(',')]:
+            data = self._catalogue(size, step)
+            # Like the import engines, each case keeps only one batch of results at a time.
+            cases = {
+                'csv': lambda: deque(batches(data, batch_size), maxlen=0),
+                'loop': lambda: deque((row_loop(batch, upsert) for batch in batches(data, batch_size)), maxlen=0),
+                'columnar': lambda: deque(
+                    (validate_rows(batch, upsert) for batch in batches(data, batch_size)), maxlen=0,
+                ),
+                'pre-pass': lambda: validate_csv(io.StringIO(data, newline=''), upsert),
+            }
+            for name, case in cases.items():
+                results.append(self._run(name, size, case, options['repeat']))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            self.stdout.write(
+                f"{result['case']:>8} {result['rows']:>9} linhas: {result['seconds']:7.2f}s "
+                f"{result['rows_per_second']:>10.0f} linhas/s"
+            )
+
+    def _catalogue(self, size, step):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        for i, row in enumerate(synthetic_rows(size)):
+            if step and i % step == 0:
+                column, value = CORRUPTIONS[i // step % len(CORRUPTIONS)]
+                row[CSV_HEADER.index(column)] = value
+            writer.writerow(row)
+        return buffer.getvalue()
+
+    def _run(self, name, size, case, repeat):
+        timings = []
+        for _ in range(repeat):
+            with Timer() as timer:
+                case()
+            timings.append(timer.elapsed)
+
+        best = min(timings)
+        return {
+            'case': name,
+            'rows': size,
+            'seconds': round(best, 3),
+            'rows_per_second': round(size / best, 1) if best else None,
+        }
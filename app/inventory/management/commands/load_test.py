@@ -0,0 +1,173 @@
+'''
+Load test HTTP endpoints with concurrent keep-alive clients.
+'''
+
+import asyncio
+import json
+import time
+from itertools import cycle
+from urllib.parse import urlsplit
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+from inventory.bench import latency_percentiles, process_tree, rss_bytes
+
+
+class Client:
+    """Minimal HTTP/1.1 client that reuses one connection, like a browser or a proxy would."""
+
+    def __init__(self, host, port, headers, timeout):
+        self.host, self.port = host, port
+        self.headers = ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def get(self, target):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f'GET {target} HTTP/1.1\r\nHost: {self.host}\r\n{self.headers}\r\n'.encode())
+        await self.writer.drain()
+        try:
+            return await asyncio.wait_for(self.read_response(), self.timeout)
+        except BaseException:
+            self.close()
+            raise
+
+    async def read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Conexão encerrada pelo servidor.')
+        headers = {}
+        while (line := await self.reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while size := int((await self.reader.readline()).split(b';')[0], 16):
+                await self.reader.readexactly(size + 2)
+            await self.reader.readline()
+        elif 'content-length' in headers:
+            await self.reader.readexactly(int(headers['content-length']))
+        else:
+            await self.reader.read()
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return int(status_line.split()[1])
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class Command(BaseCommand):
+    help = (
+        'Sends GET requests from concurrent keep-alive clients for a fixed time and reports throughput, '
+        'latency percentiles and, with --server-pids, the resident memory of the server processes. '
+        'Run it against the WSGI and the ASGI deployment with the same memory to compare their capacity.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='URLs requested in turn by every client.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Concurrent clients.')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds to send requests for.')
+        parser.add_argument('--timeout', type=float, default=30, help='Seconds to wait for each response.')
+        parser.add_argument('--token', help='JWT access token sent as Bearer.')
+        parser.add_argument('--user', help='Username to create an access token for, instead of --token.')
+        parser.add_argument('--server-pids', default='',
+                            help='Comma-separated pids of the server (master) processes; children are included.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        headers = {}
+        token = options['token']
+        if options['user']:
+            user = get_user_model().objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"Usuário {options['user']} não encontrado.")
+            token = AccessToken.for_user(user)
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+
+        targets = []
+        for url in options['urls']:
+            parts = urlsplit(url)
+            if parts.scheme != 'http' or not parts.hostname:
+                raise CommandError(f'URL inválida, use http://host[:porta]/caminho: {url}')
+            target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+            targets.append((parts.hostname, parts.port or 80, target))
+        if len({(host, port) for host, port, _ in targets}) > 1:
+            raise CommandError('Todas as URLs devem ser do mesmo servidor.')
+
+        try:
+            pids = [int(pid) for pid in options['server_pids'].split(',') if pid.strip()]
+        except ValueError:
+            raise CommandError('--server-pids deve ser uma lista de pids separados por vírgula.')
+
+        result = asyncio.run(self._run(targets, headers, pids, options))
+
+        if options['json']:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+
+        memory = f", RSS do servidor {result['server_rss_mb']}MB" if pids else ''
+        self.stdout.write(
+            f"{result['concurrency']} clientes, {result['requests']} pedidos em {result['seconds']:.2f}s: "
+            f"{result['requests_per_second']:.0f} pedidos/s, {result['errors']} erros, "
+            f"p50 {result['p50_ms']}ms p95 {result['p95_ms']}ms p99 {result['p99_ms']}ms{memory}"
+        )
+
+    async def _run(self, targets, headers, pids, options):
+        host, port, _ = targets[0]
+        latencies = []
+        statuses = {}
+        errors = 0
+        peak_rss = 0
+        deadline = time.perf_counter() + options['duration']
+
+        async def client(offset):
+            nonlocal errors
+            connection = Client(host, port, headers, options['timeout'])
+            paths = cycle(target for _, _, target in targets[offset % len(targets):] + targets[:offset % len(targets)])
+            try:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        status = await connection.get(next(paths))
+                    except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                        errors += 1
+                        continue
+                    latencies.append(time.perf_counter() - start)
+                    statuses[status] = statuses.get(status, 0) + 1
+                    if status >= 400:
+                        errors += 1
+            finally:
+                connection.close()
+
+        async def sample_memory():
+            nonlocal peak_rss
+            while time.perf_counter() < deadline:
+                peak_rss = max(peak_rss, rss_bytes(process_tree(pids)))
+                await asyncio.sleep(0.5)
+
+        start = time.perf_counter()
+        tasks = [client(i) for i in range(options['concurrency'])]
+        if pids:
+            tasks.append(sample_memory())
+        await asyncio.gather(*tasks)
+        seconds = time.perf_counter() - start
+
+        result = {
+            'concurrency': options['concurrency'],
+            'requests': len(latencies),
+            'errors': errors,
+            'statuses': {str(status): count for status, count in sorted(statuses.items())},
+            'seconds': round(seconds, 3),
+            'requests_per_second': round(len(latencies) / seconds, 1),
+            **latency_percentiles(latencies),
+        }
+        if pids:
+            result['server_rss_mb'] = round(peak_rss / 2**20, 1)
+            result['requests_per_second_per_gb'] = round(result['requests_per_second'] / (peak_rss / 2**30), 1)
+        return result
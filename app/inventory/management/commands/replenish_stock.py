@@ -0,0 +1,29 @@
+'''
+Run the stock replenishment outside of Celery, optionally as a dry run.
+'''
+
+from django.core.management.base import BaseCommand
+from inventory.replenish import replenish
+
+
+class Command(BaseCommand):
+    help = 'Raises stock below each part\'s reorder point to its reorder target.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change.')
+        parser.add_argument('--chunk-size', type=int, help='Parts per transaction (default REPLENISH_CHUNK_SIZE).')
+        parser.add_argument('--verbose-parts', action='store_true', help='List every part that changes.')
+
+    def handle(self, *args, **options):
+        result = replenish(
+            dry_run=options['dry_run'], chunk_size=options['chunk_size'], collect=options['verbose_parts'],
+        )
+
+        if options['verbose_parts']:
+            for part in result.parts:
+                self.stdout.write(f'{part.id}: {part.previous} -> {part.stock_quantity}')
+
+        verb = 'seriam reabastecidas' if result.dry_run else 'reabastecidas'
+        self.stdout.write(
+            f'{result.count} peças {verb} (+{result.units} unidades) em {result.chunks} lotes.'
+        )
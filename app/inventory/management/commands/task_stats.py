@@ -0,0 +1,80 @@
+'''
+Print percentiles of the recent runs of each Celery task.
+'''
+
+import json
+import statistics
+from django.core.management.base import BaseCommand
+from inventory.telemetry import recent_runs
+
+
+def percentiles(values):
+    """Returns the p50, p95 and p99 of values, or None for each without values."""
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None}
+    quantiles = statistics.quantiles(values, n=100, method='inclusive') if len(values) > 1 else values * 99
+    return {'p50': round(quantiles[49], 3), 'p95': round(quantiles[94], 3), 'p99': round(quantiles[98], 3)}
+
+
+def summarize(task, runs):
+    counters = sorted({name for run in runs for name in run['counters']})
+    return {
+        'task': task,
+        'runs': len(runs),
+        'failures': sum(run['state'] != 'SUCCESS' for run in runs),
+        'queue_seconds': percentiles([run['queue_seconds'] for run in runs if run['queue_seconds'] is not None]),
+        'run_seconds': percentiles([run['run_seconds'] for run in runs]),
+        'peak_memory_mb': round(max(run['peak_memory_kb'] for run in runs) / 1024, 1),
+        'counters': {
+            name: {
+                'total': sum(run['counters'].get(name, 0) for run in runs),
+                'per_second': percentiles([
+                    run['counters'][name] / run['run_seconds']
+                    for run in runs if name in run['counters'] and run['run_seconds']
+                ]),
+            }
+            for name in counters
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Prints, for each Celery task, the p50/p95/p99 of the queue wait and run time of its recent runs, the '
+        'memory high-water mark of the workers and the throughput of its counters (rows parsed, parts '
+        'replenished, ...), as recorded by the task telemetry.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--task', help='Full task name, such as inventory.tasks.replenish_stock.')
+        parser.add_argument('--last', type=int, help='Only the N most recent runs of each task.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        summaries = [
+            summarize(task, runs[:options['last']] if options['last'] else runs)
+            for task, runs in recent_runs(options['task']).items()
+        ]
+
+        if options['json']:
+            self.stdout.write(json.dumps(summaries, indent=2))
+            return
+
+        if not summaries:
+            self.stdout.write('Nenhuma execução de tarefa registrada.')
+            return
+
+        for summary in summaries:
+            queue, run = summary['queue_seconds'], summary['run_seconds']
+            self.stdout.write(
+                f"{summary['task']}: {summary['runs']} execuções, {summary['failures']} falhas, "
+                f"pico de memória {summary['peak_memory_mb']}MB"
+            )
+            self.stdout.write(f"  fila:     p50 {queue['p50']}s p95 {queue['p95']}s p99 {queue['p99']}s")
+            self.stdout.write(f"  execução: p50 {run['p50']}s p95 {run['p95']}s p99 {run['p99']}s")
+            for name, counter in summary['counters'].items():
+                rate = counter['per_second']
+                self.stdout.write(
+                    f"  {name}: {counter['total']:g} no total, por segundo p50 {rate['p50']} "
+                    f"p95 {rate['p95']} p99 {rate['p99']}"
+                )
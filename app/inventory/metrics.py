@@ -0,0 +1,164 @@
+"""Prometheus-style metrics shared by every process.
+
+Observations are added to one Redis hash (METRICS_KEY) in a single pipelined round trip,
+so all uwsgi workers (and Celery processes) report into the same series,
+and render() formats them in the Prometheus text exposition format.
+Histogram buckets are stored per bucket and made cumulative when rendered.
+Like the response cache, metrics are best effort: if Redis is unavailable
+observations are dropped.
+"""
+import logging
+from dataclasses import dataclass
+import redis
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = '\t'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+TASK_DURATION_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600)
+MEMORY_BUCKETS = tuple(2**power for power in range(26, 34))
+
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    kind: str
+    help: str
+    buckets: tuple = ()
+
+
+HTTP_REQUESTS = Metric('http_requests_total', 'counter', 'HTTP requests by view, method and status.')
+HTTP_DURATION = Metric(
+    'http_request_duration_seconds', 'histogram', 'Time to produce the response, rendering included.',
+    DURATION_BUCKETS,
+)
+HTTP_DB_DURATION = Metric(
+    'http_request_db_duration_seconds', 'histogram', 'Time spent in database queries per request.',
+    DURATION_BUCKETS,
+)
+HTTP_RENDER_DURATION = Metric(
+    'http_request_render_duration_seconds', 'histogram', 'Time spent rendering the response body.',
+    DURATION_BUCKETS,
+)
+HTTP_QUERIES = Metric('http_request_queries', 'histogram', 'Database queries per request.', QUERY_BUCKETS)
+HTTP_QUERY_BUDGET_EXCEEDED = Metric(
+    'http_request_query_budget_exceeded_total', 'counter',
+    'Requests above METRICS_QUERY_BUDGET queries or repeating one query over METRICS_REPEATED_QUERY_LIMIT times.',
+)
+
+TASK_RUNS = Metric('celery_task_runs_total', 'counter', 'Celery task runs by task and final state.')
+TASK_DURATION = Metric(
+    'celery_task_duration_seconds', 'histogram', 'Run time of Celery tasks.', TASK_DURATION_BUCKETS,
+)
+TASK_QUEUE_DURATION = Metric(
+    'celery_task_queue_seconds', 'histogram', 'Time Celery tasks waited in the queue after becoming due.',
+    TASK_DURATION_BUCKETS,
+)
+TASK_PEAK_MEMORY = Metric(
+    'celery_task_peak_memory_bytes', 'histogram', 'Memory high-water mark of the worker process after each run.',
+    MEMORY_BUCKETS,
+)
+TASK_ITEMS = Metric(
+    'celery_task_items_total', 'counter', 'Items reported by Celery tasks, such as rows parsed or parts replenished.',
+)
+
+_redis = None
+
+
+def _client():
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.METRICS_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return _redis
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _field(*parts):
+    return SEPARATOR.join(parts)
+
+
+class Observations:
+    """A batch of metric updates, written with save() in one round trip."""
+
+    def __init__(self):
+        self.increments = {}
+        self.lists = []
+
+    def _add(self, field, amount):
+        self.increments[field] = self.increments.get(field, 0) + amount
+
+    def inc(self, metric, labels, amount=1):
+        self._add(_field(metric.name, _labels(labels), ''), amount)
+
+    def observe(self, metric, labels, value):
+        labels = _labels(labels)
+        bucket = next((str(bound) for bound in metric.buckets if value <= bound), '+Inf')
+        self._add(_field(metric.name, labels, bucket), 1)
+        self._add(_field(f'{metric.name}_sum', labels, ''), value)
+        self._add(_field(f'{metric.name}_count', labels, ''), 1)
+
+    def push(self, key, value, limit):
+        """Prepends `value` to the list at `key`, keeping its `limit` most recent values."""
+        self.lists.append((key, value, limit))
+
+    def save(self):
+        if not self.increments and not self.lists:
+            return
+        try:
+            pipeline = _client().pipeline(transaction=False)
+            for field, amount in self.increments.items():
+                pipeline.hincrbyfloat(settings.METRICS_KEY, field, amount)
+            for key, value, limit in self.lists:
+                pipeline.lpush(key, value)
+                pipeline.ltrim(key, 0, limit - 1)
+            pipeline.execute()
+        except Exception:
+            logger.warning('Não foi possível registrar as métricas.', exc_info=True)
+
+
+def _number(value):
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def render(metrics):
+    """Returns the stored series of `metrics` in the Prometheus text format."""
+    stored = {}
+    for field, value in _client().hgetall(settings.METRICS_KEY).items():
+        name, labels, bucket = field.decode().split(SEPARATOR)
+        stored.setdefault(name, {}).setdefault(labels, {})[bucket] = float(value)
+
+    lines = []
+    for metric in metrics:
+        lines.append(f'# HELP {metric.name} {metric.help}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        if metric.kind == 'counter':
+            for labels, values in sorted(stored.get(metric.name, {}).items()):
+                lines.append(f'{metric.name}{{{labels}}} {_number(values[""])}')
+            continue
+
+        for labels, buckets in sorted(stored.get(metric.name, {}).items()):
+            cumulative = 0
+            for bound in [*map(str, metric.buckets), '+Inf']:
+                cumulative += buckets.get(bound, 0)
+                bucket_labels = f'{labels},le="{bound}"' if labels else f'le="{bound}"'
+                lines.append(f'{metric.name}_bucket{{{bucket_labels}}} {_number(cumulative)}')
+            for suffix in ('_sum', '_count'):
+                value = stored.get(f'{metric.name}{suffix}', {}).get(labels, {}).get('', 0)
+                lines.append(f'{metric.name}{suffix}{{{labels}}} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Deletes every stored series."""
+    _client().delete(settings.METRICS_KEY)
@@ -0,0 +1,143 @@
+"""Per-request query and timing instrumentation.
+
+Every request is timed and its database queries are counted and timed
+through an execute wrapper installed on each database connection, so no
+DEBUG query log is needed. The wrapper finds the request's recorder in a
+context variable, which also reaches the threads that run the queries of
+async views. The numbers are sent back in a Server-Timing header and
+aggregated per view into the histograms of inventory.metrics. Requests above the query budget,
+or repeating one statement more often than allowed (the usual sign of an
+N+1 pattern), are logged and counted.
+
+Work done while a streaming response is consumed happens after the
+response leaves the middleware and is not included.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from inventory import metrics
+
+
+logger = logging.getLogger(__name__)
+
+_recorder = ContextVar('query_recorder', default=None)
+
+
+class QueryRecorder:
+    """Execute wrapper counting and timing the queries of a request, per SQL statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper of every connection, reporting to the current request's recorder."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection, **kwargs):
+    """connection_created receiver adding record_query to the new connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def recording(recorder):
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+class RequestMetricsMiddleware:
+    """Records queries, database time, rendering time and total time of each view."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with recording(recorder):
+            response = self.get_response(request)
+        self.save(self.finish(request, response, recorder, time.perf_counter() - start))
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with recording(recorder):
+            response = await self.get_response(request)
+        observations = self.finish(request, response, recorder, time.perf_counter() - start)
+        await sync_to_async(self.save, thread_sensitive=False)(observations)
+        return response
+
+    def save(self, observations):
+        # Metrics are best effort: whatever goes wrong storing them, the response is still returned.
+        try:
+            observations.save()
+        except Exception:
+            logger.warning('Não foi possível registrar as métricas da requisição.', exc_info=True)
+
+    def process_template_response(self, request, response):
+        # Called right before DRF and template responses are rendered.
+        start = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_render_duration = time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, recorder, duration):
+        view = request.resolver_match.view_name if request.resolver_match else 'unmatched'
+        labels = {'view': view, 'method': request.method}
+        render_duration = getattr(request, '_metrics_render_duration', 0.0)
+
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={recorder.duration * 1000:.2f};desc="{recorder.count} queries", '
+                f'render;dur={render_duration * 1000:.2f}, total;dur={duration * 1000:.2f}'
+            )
+
+        observations = metrics.Observations()
+        observations.inc(metrics.HTTP_REQUESTS, {**labels, 'status': response.status_code})
+        observations.observe(metrics.HTTP_DURATION, labels, duration)
+        observations.observe(metrics.HTTP_DB_DURATION, labels, recorder.duration)
+        observations.observe(metrics.HTTP_RENDER_DURATION, labels, render_duration)
+        observations.observe(metrics.HTTP_QUERIES, labels, recorder.count)
+
+        statement, repeats = recorder.statements.most_common(1)[0] if recorder.statements else ('', 0)
+        if recorder.count > settings.METRICS_QUERY_BUDGET or repeats > settings.METRICS_REPEATED_QUERY_LIMIT:
+            logger.warning(
+                '%s %s executou %d consultas ao banco; a mais repetida (%d vezes): %.300s',
+                request.method, view, recorder.count, repeats, statement,
+            )
+            observations.inc(metrics.HTTP_QUERY_BUDGET_EXCEEDED, labels)
+        return observations
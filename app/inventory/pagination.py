@@ -0,0 +1,169 @@
+import base64
+import binascii
+import json
+from collections import namedtuple
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+Cursor = namedtuple('Cursor', ['value', 'id', 'reverse'])
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over an (ordering field, id) pair.
+
+    Each page is fetched with a `field > last value OR (field = last value AND
+    id > last id)` condition instead of an OFFSET, so with an index on
+    (field, id) deep pages cost the same as the first one.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering_param = 'ordering'
+    ordering_fields = ('id',)
+    default_ordering = None
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.get_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async variant of paginate_queryset, fetching the page with the async ORM."""
+        return self.get_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """Returns the query for the requested page plus one row, telling whether more rows follow."""
+        self.request = request
+        self.field, descending = self.get_ordering(request)
+        self.page_size = self.get_page_size(request)
+        self.cursor = cursor = self.decode_cursor(request)
+        self.reverse = cursor.reverse if cursor else False
+
+        backwards = descending != self.reverse
+        ordering = ['id'] if self.field == 'id' else [self.field, 'id']
+        queryset = queryset.order_by(*(f'-{name}' if backwards else name for name in ordering))
+        if cursor:
+            queryset = self.filter_after(queryset, cursor, 'lt' if backwards else 'gt')
+        return queryset[:self.page_size + 1]
+
+    def get_page(self, rows):
+        cursor = self.cursor
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+        self.next_position = self.get_position(rows[-1]) if rows and has_next else None
+        self.previous_position = self.get_position(rows[0]) if rows and has_previous else None
+        return rows
+
+    def filter_after(self, queryset, cursor, lookup):
+        if self.field == 'id':
+            return queryset.filter(**{f'id__{lookup}': cursor.id})
+
+        return queryset.filter(**{f'{self.field}__{lookup}e': cursor.value}).filter(
+            Q(**{f'{self.field}__{lookup}': cursor.value}) | Q(**{self.field: cursor.value, f'id__{lookup}': cursor.id})
+        )
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_param, self.default_ordering or self.ordering_fields[0])
+        if ordering.lstrip('-') not in self.ordering_fields:
+            raise ValidationError({self.ordering_param: f"Ordenação inválida. Use: {', '.join(self.ordering_fields)}."})
+        return ordering.lstrip('-'), ordering.startswith('-')
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            return str(row[self.field]), row['id']
+        return str(getattr(row, self.field)), row.id
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            return Cursor(value=str(data['v']), id=int(data['id']), reverse=bool(data['r']))
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse):
+        value, row_id = position
+        data = json.dumps({'v': value, 'id': row_id, 'r': reverse}, separators=(',', ':'))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, base64.urlsafe_b64encode(data.encode()).decode())
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Cursor de paginação retornado em `next` ou `previous`.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Itens por página (máximo {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.ordering_param,
+                'required': False,
+                'in': 'query',
+                'description': f"Campo de ordenação, opcionalmente com '-': {', '.join(self.ordering_fields)}.",
+                'schema': {'type': 'string'},
+            },
+        ]
+
+
+class AutoPartPagination(KeysetPagination):
+    ordering_fields = ('id', 'price', 'name')
+
+
+class StockMovementPagination(KeysetPagination):
+    ordering_fields = ('created_at',)
+    default_ordering = '-created_at'
@@ -0,0 +1,108 @@
+"""Chunked stock replenishment.
+
+Parts whose stock is below their reorder point are raised to their reorder
+target, walking the table in primary-key chunks of REPLENISH_CHUNK_SIZE
+parts. Each chunk is one short transaction with a single UPDATE ...
+RETURNING, so row locks are held briefly and only on one chunk at a time,
+and the replenished ids and quantities come from the statement itself.
+"""
+from dataclasses import dataclass, field
+from django.conf import settings
+from django.db import connection
+from core.models import AutoPart, StockMovement
+from inventory.cache import invalidate_auto_parts
+from inventory.ledger import stock_reason
+
+
+@dataclass
+class Replenishment:
+    """A replenished (or, in a dry run, replenishable) part."""
+    id: int
+    previous: int
+    stock_quantity: int
+
+
+@dataclass
+class ReplenishResult:
+    """Totals of a run; the Replenishment of every part is only kept in `parts` when asked for."""
+    dry_run: bool
+    chunks: int = 0
+    count: int = 0
+    units: int = 0
+    parts: list = field(default_factory=list)
+
+    def add(self, parts, collect):
+        self.chunks += 1
+        self.count += len(parts)
+        self.units += sum(part.stock_quantity - part.previous for part in parts)
+        if collect:
+            self.parts.extend(sorted(parts, key=lambda part: part.id))
+
+
+def _chunk_end(cursor, table, start, last, chunk_size):
+    """Returns the first id after the chunk starting at `start`, or None for the last chunk."""
+    cursor.execute(
+        f'SELECT id FROM {table} WHERE id >= %s AND (%s::bigint IS NULL OR id <= %s) ORDER BY id OFFSET %s LIMIT 1',
+        [start, last, last, chunk_size],
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _replenish_chunk(cursor, table, start, end, last, dry_run):
+    levels = {
+        'start': start,
+        'end': end,
+        'last': last,
+        'point': settings.REPLENISH_REORDER_POINT,
+        'target': settings.REPLENISH_REORDER_TARGET,
+    }
+    low_stock = (
+        f'SELECT id, stock_quantity AS previous, COALESCE(reorder_target, %(target)s) AS target FROM {table}'
+        f' WHERE id >= %(start)s AND (%(end)s IS NULL OR id < %(end)s)'
+        f' AND (%(last)s::bigint IS NULL OR id <= %(last)s)'
+        f' AND stock_quantity < COALESCE(reorder_point, %(point)s)'
+        f' AND stock_quantity < COALESCE(reorder_target, %(target)s)'
+    )
+    if dry_run:
+        cursor.execute(f'{low_stock} ORDER BY id', levels)
+    else:
+        cursor.execute(
+            f'UPDATE {table} AS part SET stock_quantity = low.target, updated_at = now()'
+            f' FROM ({low_stock} FOR UPDATE) AS low WHERE part.id = low.id'
+            f' RETURNING part.id, low.previous, part.stock_quantity',
+            levels,
+        )
+    return [Replenishment(*row) for row in cursor.fetchall()]
+
+
+def replenish(dry_run=False, chunk_size=None, id_range=None, collect=False):
+    """Raises low stock to the reorder targets and returns a ReplenishResult.
+
+    With `dry_run` nothing is written and the result lists what would change;
+    otherwise only the totals are kept, so memory does not grow with the
+    catalogue, unless `collect` asks for the list of parts as well.
+    `id_range`, a (first, last) pair of ids, limits the run to the parts in
+    between, both included.
+    """
+    chunk_size = chunk_size or settings.REPLENISH_CHUNK_SIZE
+    table = connection.ops.quote_name(AutoPart._meta.db_table)
+    result = ReplenishResult(dry_run=dry_run)
+    first, last = id_range or (None, None)
+
+    parts_in_range = AutoPart.objects.order_by('id')
+    if id_range:
+        parts_in_range = parts_in_range.filter(id__gte=first, id__lte=last)
+
+    with connection.cursor() as cursor:
+        start = parts_in_range.values_list('id', flat=True).first()
+        while start is not None:
+            with stock_reason(StockMovement.Reason.REPLENISH):
+                end = _chunk_end(cursor, table, start, last, chunk_size)
+                parts = _replenish_chunk(cursor, table, start, end, last, dry_run)
+                if parts and not dry_run:
+                    invalidate_auto_parts()
+            result.add(parts, collect or dry_run)
+            start = end
+
+    return result
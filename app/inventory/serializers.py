@@ -1,8 +1,244 @@
+from collections import Counter
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from core.models import AutoPart
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from core.models import AutoPart, ImportJob, StockMovement, UploadSession
+from inventory.authentication import STAFF_CLAIM, is_revoked
+from inventory.imports import compression_of
 
 
 class AutoPartSerializer(serializers.ModelSerializer):
     class Meta:
         model = AutoPart
-        fields = ['id', 'name', 'description', 'price', 'stock_quantity']
+        fields = [
+            'id', 'name', 'description', 'price', 'stock_quantity', 'sku', 'reorder_point', 'reorder_target',
+            'updated_at',
+        ]
+
+    def validate_sku(self, value):
+        return value or None
+
+    def validate(self, attrs):
+        point = attrs.get('reorder_point', getattr(self.instance, 'reorder_point', None))
+        target = attrs.get('reorder_target', getattr(self.instance, 'reorder_target', None))
+        if point is not None and target is not None and target < point:
+            raise ValidationError({'reorder_target': 'O estoque alvo não pode ser menor que o ponto de reposição.'})
+        return attrs
+
+
+class AutoPartReadSerializer:
+    """Read-only AutoPart representation built from `.values()` rows.
+
+    Produces the same output as AutoPartSerializer without instantiating
+    models or running DRF field machinery per item; only `price` and
+    `updated_at` need converting. `fields` restricts the output keys.
+    """
+    fields = tuple(AutoPartSerializer.Meta.fields)
+    fields_param = 'fields'
+    _datetime = serializers.DateTimeField()
+
+    def __init__(self, instance=None, many=False, fields=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.output_fields = fields or self.fields
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        """Returns the fields asked for in the `fields` query parameter, or None for all of them."""
+        value = request.query_params.get(cls.fields_param)
+        if not value:
+            return None
+
+        requested = [field.strip() for field in value.split(',') if field.strip()]
+        invalid = [field for field in requested if field not in cls.fields]
+        if invalid:
+            raise ValidationError({cls.fields_param: (
+                f"Campos inválidos: {', '.join(invalid)}. Use: {', '.join(cls.fields)}."
+            )})
+        return tuple(dict.fromkeys(requested)) or None
+
+    def to_representation(self, row):
+        data = {field: row[field] for field in self.output_fields}
+        if data.get('price') is not None:
+            data['price'] = str(data['price'])
+        if data.get('updated_at') is not None:
+            data['updated_at'] = self._datetime.to_representation(data['updated_at'])
+        return data
+
+    @property
+    def data(self):
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
+
+
+class AutoPartBulkListSerializer(serializers.ListSerializer):
+    """Validates a batch of AutoPart writes and applies it with bulk statements.
+
+    Given an {id: AutoPart} mapping as instance, items are partial updates
+    identified by their `id`. SKU uniqueness is checked for the whole batch
+    with one query instead of one query per item.
+    """
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+
+        try:
+            instance = self.instance.get(int(data['id']))
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError({'id': 'Informe o id da peça.'})
+        if instance is None:
+            raise ValidationError({'id': 'Peça não encontrada.'})
+
+        self.child.instance = instance
+        self.child.initial_data = data
+        validated = super().run_child_validation(data)
+        validated['id'] = instance.id
+        return validated
+
+    def to_internal_value(self, data):
+        # Batch checks run here rather than in validate() so their errors stay aligned with the items.
+        attrs = super().to_internal_value(data)
+        ids = Counter(item['id'] for item in attrs if 'id' in item)
+        skus = Counter(item['sku'] for item in attrs if item.get('sku'))
+        owners = dict(AutoPart.objects.filter(sku__in=skus).values_list('sku', 'id')) if skus else {}
+
+        errors = []
+        for item in attrs:
+            error = {}
+            if ids[item.get('id')] > 1:
+                error['id'] = ['Peça repetida no lote.']
+            sku = item.get('sku')
+            if sku and (skus[sku] > 1 or owners.get(sku, item.get('id')) != item.get('id')):
+                error['sku'] = ['Já existe uma peça com este código.']
+            errors.append(error)
+
+        if any(errors):
+            raise ValidationError(errors)
+        return attrs
+
+    def create(self, validated_data):
+        return AutoPart.objects.bulk_create(
+            [AutoPart(**item) for item in validated_data], batch_size=settings.AUTO_PART_BULK_BATCH_SIZE
+        )
+
+    def update(self, instance, validated_data):
+        # bulk_update() skips auto_now, so updated_at is set here.
+        now = timezone.now()
+        fields = {'updated_at'}
+        parts = []
+        for item in validated_data:
+            part = instance[item.pop('id')]
+            for attr, value in item.items():
+                setattr(part, attr, value)
+            part.updated_at = now
+            fields.update(item)
+            parts.append(part)
+
+        AutoPart.objects.bulk_update(parts, sorted(fields), batch_size=settings.AUTO_PART_BULK_BATCH_SIZE)
+        return parts
+
+
+class AutoPartBulkItemSerializer(AutoPartSerializer):
+    class Meta(AutoPartSerializer.Meta):
+        list_serializer_class = AutoPartBulkListSerializer
+        extra_kwargs = {'sku': {'validators': []}}
+
+
+class AutoPartBulkSerializer(serializers.Serializer):
+    """Shape of a bulk write request: parts to create, partial updates and ids to delete."""
+    create = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate(self, attrs):
+        total = sum(len(items) for items in attrs.values())
+        if not total:
+            raise ValidationError('Informe ao menos uma operação em create, update ou delete.')
+        if total > settings.AUTO_PART_BULK_MAX_ITEMS:
+            raise ValidationError(f'O lote aceita no máximo {settings.AUTO_PART_BULK_MAX_ITEMS} itens.')
+        return attrs
+
+
+class StockQuantitySerializer(serializers.Serializer):
+    """Quantity of a part to reserve or release."""
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class StockReservationItemSerializer(StockQuantitySerializer):
+    id = serializers.IntegerField()
+
+
+class StockReservationSerializer(serializers.Serializer):
+    """Cart of parts to reserve together."""
+    items = StockReservationItemSerializer(many=True, allow_empty=False,
+                                           max_length=settings.STOCK_RESERVATION_MAX_ITEMS)
+
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StockMovement
+        fields = ['id', 'quantity', 'balance', 'reason', 'created_at']
+        read_only_fields = fields
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'status', 'upsert', 'engine', 'parallel', 'content_hash', 'rows_processed', 'rows_created',
+            'rows_updated', 'rows_unchanged', 'error_count', 'rows_per_second', 'peak_memory_kb', 'validation',
+            'message', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'name', 'size', 'offset', 'compression', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'offset', 'compression', 'created_at', 'updated_at']
+
+    def validate_name(self, value):
+        if compression_of(value) is None:
+            raise ValidationError('Arquivo não é do tipo CSV. Use .csv, .csv.gz ou .csv.zst.')
+        return value
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """Issues tokens carrying the user's is_staff flag, so requests need no user query."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[STAFF_CLAIM] = user.is_staff
+        return token
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """Refuses revoked refresh tokens."""
+
+    def validate(self, attrs):
+        if is_revoked(self.token_class(attrs['refresh'])):
+            raise AuthenticationFailed('Token revogado.', code='token_revoked')
+        return super().validate(attrs)
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """Optional refresh token, of the requesting user, to revoke with the access token."""
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            token = RefreshToken(value)
+        except TokenError as e:
+            raise ValidationError(str(e))
+        if str(token[jwt_settings.USER_ID_CLAIM]) != str(self.context['request'].user.pk):
+            raise ValidationError('O token pertence a outro usuário.')
+        return token
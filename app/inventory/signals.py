@@ -0,0 +1,46 @@
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from core.models import AutoPart
+from inventory.authentication import revoke_user_tokens
+from inventory.cache import invalidate_auto_parts
+from inventory.middleware import install_query_recorder
+from inventory.telemetry import finish_run, start_run, stamp_published_at
+
+
+@receiver(post_save, sender=AutoPart)
+@receiver(post_delete, sender=AutoPart)
+def invalidate_cache_on_write(sender, **kwargs):
+    invalidate_auto_parts()
+
+
+ACCESS_FIELDS = {'is_active', 'is_staff'}
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def revoke_tokens_on_access_change(sender, instance, update_fields=None, **kwargs):
+    """Tokens carry is_staff and are not checked against the user row, so access changes revoke them.
+
+    Saves limited to other fields, such as the last_login update of every login, are not compared.
+    QuerySet.update() sends no signal: see inventory.authentication.update_user_access.
+    """
+    if instance.pk is None or (update_fields is not None and not ACCESS_FIELDS & set(update_fields)):
+        return
+
+    previous = sender.objects.filter(pk=instance.pk).values('is_active', 'is_staff').first()
+    if previous and (previous['is_staff'] != instance.is_staff or (previous['is_active'] and not instance.is_active)):
+        revoke_user_tokens(instance)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def revoke_tokens_on_user_delete(sender, instance, **kwargs):
+    """Tokens are not checked against the user row, so they would outlive a deleted user."""
+    revoke_user_tokens(instance)
+
+
+connection_created.connect(install_query_recorder, dispatch_uid='inventory.install_query_recorder')
+before_task_publish.connect(stamp_published_at, dispatch_uid='inventory.stamp_published_at')
+task_prerun.connect(start_run, dispatch_uid='inventory.start_run')
+task_postrun.connect(finish_run, dispatch_uid='inventory.finish_run')
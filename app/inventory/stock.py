@@ -0,0 +1,105 @@
+"""Atomic stock reservation and release.
+
+A single part is reserved with one conditional UPDATE, so concurrent
+checkouts never read-modify-write `stock_quantity`; it returns the stock it
+wrote, which no other request can have changed in between. A cart locks its parts
+in id order, which keeps two carts with the same parts from deadlocking.
+"""
+from django.db import connection
+from django.db.models.functions import Now
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+from core.models import AutoPart, StockMovement
+from inventory.cache import invalidate_auto_parts
+from inventory.ledger import stock_reason
+
+
+class InsufficientStock(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Estoque insuficiente.'
+    default_code = 'insufficient_stock'
+
+    def __init__(self, items):
+        super().__init__()
+        # Kept out of APIException's detail handling, which would turn the numbers into strings.
+        self.detail = {'detail': self.detail, 'items': items}
+
+
+def _remaining(part_id):
+    return AutoPart.objects.filter(pk=part_id).values_list('stock_quantity', flat=True).first()
+
+
+def _add_stock(part_id, quantity):
+    """Adds `quantity` (negative to take) to the stock of a part in one UPDATE, unless stock would go below zero.
+
+    Returns the stock written by that very statement, or None when no row was updated.
+    """
+    table = connection.ops.quote_name(AutoPart._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET stock_quantity = stock_quantity + %(quantity)s, updated_at = now() '
+            f'WHERE id = %(id)s AND stock_quantity + %(quantity)s >= 0 RETURNING stock_quantity',
+            {'id': part_id, 'quantity': quantity},
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def reserve(part_id, quantity):
+    """Takes `quantity` units of a part and returns the remaining stock."""
+    with stock_reason(StockMovement.Reason.RESERVATION):
+        remaining = _add_stock(part_id, -quantity)
+    if remaining is None:
+        available = _remaining(part_id)
+        if available is None:
+            raise NotFound('Peça não encontrada.')
+        raise InsufficientStock([{'id': part_id, 'requested': quantity, 'available': available}])
+
+    invalidate_auto_parts()
+    return remaining
+
+
+def release(part_id, quantity):
+    """Returns `quantity` units of a part to stock and returns the new stock."""
+    with stock_reason(StockMovement.Reason.RELEASE):
+        stock = _add_stock(part_id, quantity)
+    if stock is None:
+        raise NotFound('Peça não encontrada.')
+
+    invalidate_auto_parts()
+    return stock
+
+
+def reserve_many(items):
+    """Reserves every (part id, quantity) pair of a cart or none of them.
+
+    Returns {part id: remaining stock}. Raises InsufficientStock listing
+    every short item.
+    """
+    quantities = {}
+    for part_id, quantity in items:
+        quantities[part_id] = quantities.get(part_id, 0) + quantity
+
+    with stock_reason(StockMovement.Reason.RESERVATION):
+        parts = list(
+            AutoPart.objects.select_for_update().filter(pk__in=quantities).order_by('id').only('id', 'stock_quantity')
+        )
+        missing = set(quantities) - {part.id for part in parts}
+        if missing:
+            raise NotFound(f"Peças não encontradas: {', '.join(str(part_id) for part_id in sorted(missing))}.")
+
+        shortages = [
+            {'id': part.id, 'requested': quantities[part.id], 'available': part.stock_quantity}
+            for part in parts if part.stock_quantity < quantities[part.id]
+        ]
+        if shortages:
+            raise InsufficientStock(shortages)
+
+        for part in parts:
+            part.stock_quantity -= quantities[part.id]
+            part.updated_at = Now()
+        # The rows are locked, so writing the computed values back is safe.
+        AutoPart.objects.bulk_update(parts, ['stock_quantity', 'updated_at'])
+        invalidate_auto_parts()
+
+    return {part.id: part.stock_quantity for part in parts}
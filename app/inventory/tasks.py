@@ -1,50 +1,260 @@
-from celery import shared_task
+from celery import chord, shared_task
 import csv
-import io
-from core.models import AutoPart
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import DatabaseError, InterfaceError, OperationalError, connection, transaction
+from django.utils import timezone
+from core.models import ImportJob, RevokedToken, UploadSession
+from inventory.copy_import import copy_rows
+from inventory.imports import (
+    ImportProgress, compression_of, decompress_upload, import_rows, open_csv, read_csv_range, split_csv,
+)
+from inventory.replenish import replenish
+from inventory.telemetry import count
+from inventory.validation import header_error, validate_csv
 
 
-@shared_task
-def import_auto_parts_from_csv(csv_file):
-    """Reads a CSV file and imports auto parts into the database."""
-    csv_file = io.StringIO(csv_file)
-    reader = csv.DictReader(csv_file)
+# Task behaviour per queue (see CELERY_TASK_ROUTES). Imports are not
+# idempotent, a redelivered import would insert its committed batches again,
+# so they are acknowledged on receipt and never retried. Maintenance jobs are
+# idempotent: they are acknowledged once done, redelivered if their worker
+# dies and retried on database connection errors.
+IMPORT_TASK = {
+    'acks_late': False,
+    'max_retries': 0,
+    'soft_time_limit': settings.IMPORT_TASK_TIME_LIMIT,
+    'time_limit': settings.IMPORT_TASK_TIME_LIMIT + settings.TASK_TIME_LIMIT_GRACE,
+}
+MAINTENANCE_TASK = {
+    'acks_late': True,
+    'reject_on_worker_lost': True,
+    'autoretry_for': (InterfaceError, OperationalError),
+    'retry_backoff': True,
+    'max_retries': settings.MAINTENANCE_TASK_MAX_RETRIES,
+    'soft_time_limit': settings.MAINTENANCE_TASK_TIME_LIMIT,
+    'time_limit': settings.MAINTENANCE_TASK_TIME_LIMIT + settings.TASK_TIME_LIMIT_GRACE,
+}
+DEFAULT_TASK = {
+    'acks_late': True,
+    'soft_time_limit': settings.DEFAULT_TASK_TIME_LIMIT,
+    'time_limit': settings.DEFAULT_TASK_TIME_LIMIT + settings.TASK_TIME_LIMIT_GRACE,
+}
 
-    bulk_data = []
-    errors = []
+logger = logging.getLogger(__name__)
 
-    for index, row in enumerate(reader):
-        try:
-            bulk_data.append(
-                AutoPart(
-                    name=row['nome'],
-                    description=row['descricao'],
-                    price=float(row['preco']),
-                    stock_quantity=int(row['quantidade_inicial'])
-                )
-            )
-        except Exception as e:
-            errors.append(f"Linha {index+2}: Erro. {e}")
+IMPORT_ENGINES = {
+    'orm': import_rows,
+    'copy': copy_rows,
+}
 
-    if bulk_data:
-        try:
-            AutoPart.objects.bulk_create(bulk_data)
-            return f"Importação concluída. {len(bulk_data)} peças criadas. {len(errors)} erros."
-        except Exception as e:
-            return f"Falha crítica na importação. Nenhuma peça foi criada. Erro: {e}"
 
-    return f"Importação finalizada. Nenhuma peça nova para criar. {len(errors)} erros."
+def _import_summary(created, error_count, updated=0, unchanged=0):
+    if unchanged:
+        return (
+            f"Importação concluída. {created} peças criadas, {updated} atualizadas, "
+            f"{unchanged} sem alterações. {error_count} erros."
+        )
 
+    if updated:
+        return f"Importação concluída. {created} peças criadas, {updated} atualizadas. {error_count} erros."
 
-@shared_task
-def replenish_stock():
-    """Replenishes stock for auto parts that are below 10."""
-    low_stock_parts = AutoPart.objects.filter(stock_quantity__lt=10)
+    if created:
+        return f"Importação concluída. {created} peças criadas. {error_count} erros."
+
+    return f"Importação finalizada. Nenhuma peça nova para criar. {error_count} erros."
+
+
+def _count_rows(progress):
+    count('rows_parsed', progress.processed)
+    count('rows_inserted', progress.created)
+    count('rows_updated', progress.updated)
+    count('rows_unchanged', progress.unchanged)
+    count('rows_rejected', progress.error_count)
+
+
+def _start_job(job_id):
+    ImportJob.objects.filter(pk=job_id).update(status=ImportJob.Status.RUNNING, started_at=timezone.now())
+    return ImportJob.objects.get(pk=job_id)
+
+
+def _validate(job):
+    """First stage of an import: the validation pass over the whole file, unless made at upload.
+
+    Its summary is stored on the job before any row is written; a header without the
+    required columns fails the job.
+    """
+    if job.validation is None:
+        with open_csv(job.file_name) as csv_file:
+            job.validation = validate_csv(csv_file, job.upsert).as_dict()
+        job.save(update_fields=['validation'])
+    if job.validation['missing_columns']:
+        raise ValueError(header_error(job.validation['missing_columns']))
+
+
+def _finish_job(job, failure=None):
+    """Stores the final status of a job and returns its summary message."""
+    job.refresh_from_db()
+    job.finished_at = timezone.now()
+    elapsed = (job.finished_at - job.started_at).total_seconds()
+    job.rows_per_second = job.rows_processed / elapsed if elapsed else None
+
+    if failure:
+        job.status = ImportJob.Status.FAILED
+        job.message = (
+            f"Falha crítica na importação. {job.rows_created} peças criadas antes da falha. Erro: {failure}"
+        )
+    else:
+        job.status = ImportJob.Status.SUCCEEDED
+        job.message = _import_summary(job.rows_created, job.error_count, job.rows_updated, job.rows_unchanged)
+
+    job.save(update_fields=['status', 'message', 'finished_at', 'rows_per_second'])
+    default_storage.delete(job.file_name)
+    return job.message
+
+
+@shared_task(**IMPORT_TASK)
+def import_auto_parts_from_csv(job_id):
+    """Streams the stored CSV file of an import job and imports its auto parts in batches."""
+    job = _start_job(job_id)
+    progress = ImportProgress(job.id)
+
+    try:
+        _validate(job)
+        with open_csv(job.file_name) as csv_file:
+            IMPORT_ENGINES[job.engine](enumerate(csv.DictReader(csv_file)), job.upsert, progress)
+    except Exception as e:
+        return _finish_job(job, failure=e)
+    finally:
+        _count_rows(progress)
+
+    return _finish_job(job)
+
+
+@shared_task(**IMPORT_TASK)
+def import_auto_parts_from_csv_parallel(job_id):
+    """Splits the stored CSV file of an import job in row ranges and imports them concurrently as a chord.
+
+    Compressed files cannot be read from an offset, so they are decompressed to a plain file first,
+    then validated like a sequential import.
+    """
+    job = _start_job(job_id)
+    try:
+        if compression_of(job.file_name):
+            job.file_name = decompress_upload(job.file_name)
+            job.save(update_fields=['file_name'])
+        _validate(job)
+        fieldnames, chunks = split_csv(job.file_name, settings.CSV_IMPORT_CHUNK_SIZE)
+        if chunks:
+            # A chunk task that raises (or is killed by its time limit) fails the chord instead of
+            # reaching the merge; the error callback then closes the job.
+            merge = merge_csv_import_results.s(job.id)
+            merge.link_error(fail_csv_import.s(job.id))
+            chord(
+                import_csv_chunk.s(job.id, fieldnames, start, end, first_row)
+                for start, end, first_row in chunks
+            )(merge)
+    except Exception as e:
+        return _finish_job(job, failure=e)
 
-    count = low_stock_parts.count()
+    if not chunks:
+        return _finish_job(job)
 
-    if count > 0:
-        low_stock_parts.update(stock_quantity=10)
-        return f"Reabastecimento concluído. {count} peças reabastecidas."
+    return f"Importação dividida em {len(chunks)} partes."
+
+
+@shared_task(**IMPORT_TASK)
+def import_csv_chunk(job_id, fieldnames, start, end, first_row):
+    """Imports the records stored between two byte offsets of an import job's CSV file."""
+    job = ImportJob.objects.get(pk=job_id)
+    rows = enumerate(read_csv_range(job.file_name, fieldnames, start, end), start=first_row)
+    progress = ImportProgress(job.id)
+
+    try:
+        IMPORT_ENGINES[job.engine](rows, job.upsert, progress)
+    except Exception as e:
+        return f"Linhas a partir de {first_row+2}: {e}"
+    finally:
+        _count_rows(progress)
+
+    return None
+
+
+@shared_task(**DEFAULT_TASK)
+def merge_csv_import_results(failures, job_id):
+    """Closes a parallel import job once all of its chunks are done."""
+    job = ImportJob.objects.get(pk=job_id)
+    failures = [failure for failure in failures if failure]
+
+    if failures:
+        return _finish_job(job, failure=f"{len(failures)} partes falharam: {'; '.join(failures)}")
+
+    return _finish_job(job)
+
+
+@shared_task(**DEFAULT_TASK)
+def fail_csv_import(request, exc, traceback, job_id):
+    """Error callback of a parallel import chord: fails the job when a chunk task or the merge did not finish."""
+    job = ImportJob.objects.get(pk=job_id)
+    if job.status != ImportJob.Status.RUNNING:
+        return job.message
+    return _finish_job(job, failure=exc)
+
+
+@shared_task(**MAINTENANCE_TASK)
+def replenish_stock():
+    """Replenishes stock for auto parts below their reorder point, one primary-key chunk at a time."""
+    result = replenish()
+    count('parts_replenished', result.count)
+    count('units_replenished', result.units)
+
+    if result.count:
+        return f"Reabastecimento concluído. {result.count} peças reabastecidas."
 
     return "Nenhuma peça precisa de reabastecimento."
+
+
+@shared_task(**MAINTENANCE_TASK)
+def create_stock_movement_partitions():
+    """Creates the monthly stock movement partitions for the coming STOCK_MOVEMENT_PARTITIONS_AHEAD months.
+
+    Each month is created in its own transaction, so one that fails does not keep the
+    following ones from being created; the first error is raised once all were tried.
+    """
+    errors = []
+    for ahead in range(settings.STOCK_MOVEMENT_PARTITIONS_AHEAD + 1):
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT core_create_stockmovement_partition((now() + make_interval(months => %s))::date)",
+                    [ahead],
+                )
+        except DatabaseError as e:
+            logger.error('Não foi possível criar a partição de movimentação de daqui a %s meses.', ahead,
+                         exc_info=True)
+            errors.append(e)
+    if errors:
+        raise errors[0]
+    return f"Partições de movimentação garantidas para {settings.STOCK_MOVEMENT_PARTITIONS_AHEAD + 1} meses."
+
+
+@shared_task(**MAINTENANCE_TASK)
+def purge_revoked_tokens():
+    """Deletes deny list entries whose tokens have all expired."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return f"{deleted} tokens revogados expirados removidos."
+
+
+@shared_task(**MAINTENANCE_TASK)
+def purge_upload_sessions():
+    """Deletes resumable uploads left unfinished for more than UPLOAD_SESSION_TTL seconds, with their files."""
+    expired = UploadSession.objects.filter(
+        updated_at__lt=timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    )
+    deleted = 0
+    for upload in expired.iterator():
+        default_storage.delete(upload.file_name)
+        upload.delete()
+        deleted += 1
+    return f"{deleted} envios abandonados removidos."
@@ -0,0 +1,115 @@
+"""Celery task telemetry driven by the task signals.
+
+The publisher stamps every message with its publication time, so the worker
+can tell how long a task waited in the queue. Around each run the worker
+measures the run time and the process memory high-water mark, and tasks may
+add their own counters (rows parsed, parts replenished, ...) with count().
+Each run is recorded in the task histograms of inventory.metrics and kept
+in a capped Redis list per task, read back by the task_stats command.
+"""
+import json
+import time
+from datetime import datetime
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from django.conf import settings
+from inventory import metrics
+from inventory.imports import peak_memory_kb
+
+
+PUBLISHED_AT_HEADER = 'published_at'
+RUNS_KEY = 'task_runs:'
+
+_run = ContextVar('task_run', default=None)
+
+
+@dataclass
+class TaskRun:
+    task: str
+    task_id: str
+    started_at: float
+    queue_seconds: float = None
+    counters: dict = field(default_factory=dict)
+    clock: float = field(default_factory=time.perf_counter)
+    token: object = None
+
+
+def count(name, amount=1):
+    """Adds `amount` to a counter of the running task; does nothing outside a worker run."""
+    run = _run.get()
+    if run is not None:
+        run.counters[name] = run.counters.get(name, 0) + amount
+
+
+def stamp_published_at(headers=None, **kwargs):
+    """before_task_publish receiver storing the publication time in the message headers."""
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+def _queue_seconds(request, now):
+    published_at = (request.headers or {}).get(PUBLISHED_AT_HEADER) or getattr(request, PUBLISHED_AT_HEADER, None)
+    if published_at is None:
+        return None
+    # A task with a countdown or eta only becomes due after it.
+    if request.eta:
+        eta = datetime.fromisoformat(request.eta) if isinstance(request.eta, str) else request.eta
+        published_at = max(published_at, eta.timestamp())
+    return max(now - published_at, 0.0)
+
+
+def start_run(task_id=None, task=None, **kwargs):
+    """task_prerun receiver starting the measurement of a run."""
+    now = time.time()
+    run = TaskRun(task=task.name, task_id=task_id, started_at=now, queue_seconds=_queue_seconds(task.request, now))
+    run.token = _run.set(run)
+
+
+def finish_run(task_id=None, task=None, state=None, **kwargs):
+    """task_postrun receiver recording the run in the metrics and the recent runs of its task."""
+    run = _run.get()
+    if run is None or run.task_id != task_id:
+        return
+    _run.reset(run.token)
+
+    duration = time.perf_counter() - run.clock
+    memory_kb = peak_memory_kb()
+    labels = {'task': run.task}
+    observations = metrics.Observations()
+    observations.inc(metrics.TASK_RUNS, {**labels, 'state': state})
+    observations.observe(metrics.TASK_DURATION, labels, duration)
+    observations.observe(metrics.TASK_PEAK_MEMORY, labels, memory_kb * 1024)
+    if run.queue_seconds is not None:
+        observations.observe(metrics.TASK_QUEUE_DURATION, labels, run.queue_seconds)
+    for name, amount in run.counters.items():
+        observations.inc(metrics.TASK_ITEMS, {**labels, 'counter': name}, amount)
+
+    observations.push(f'{RUNS_KEY}{run.task}', json.dumps({
+        'task_id': run.task_id,
+        'state': state,
+        'started_at': run.started_at,
+        'queue_seconds': run.queue_seconds,
+        'run_seconds': duration,
+        'peak_memory_kb': memory_kb,
+        'counters': run.counters,
+    }), settings.TASK_TELEMETRY_RECENT_RUNS)
+    observations.save()
+
+
+def recent_runs(task=None):
+    """Returns {task name: [run, ...]} with the recorded runs, most recent first."""
+    client = metrics._client()
+    keys = [f'{RUNS_KEY}{task}'] if task else sorted(key.decode() for key in client.scan_iter(f'{RUNS_KEY}*'))
+    return {
+        key[len(RUNS_KEY):]: [json.loads(run) for run in runs]
+        for key in keys
+        if (runs := client.lrange(key, 0, -1))
+    }
+
+
+def reset():
+    """Deletes the recorded runs of every task."""
+    client = metrics._client()
+    keys = list(client.scan_iter(f'{RUNS_KEY}*'))
+    if keys:
+        client.delete(*keys)
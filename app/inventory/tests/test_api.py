@@ -1,23 +1,72 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import shutil
+import tempfile
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.test import AsyncClient, TestCase, override_settings
 from django.urls import reverse
 from unittest.mock import patch
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APIClient
-from core.models import AutoPart
-from inventory.serializers import AutoPartSerializer
+from rest_framework_simplejwt.tokens import AccessToken
+from core.models import AutoPart, ImportJob, ImportJobError, StockMovement, UploadSession
+from inventory.imports import receive_part
+from inventory.serializers import AutoPartSerializer, TokenObtainPairSerializer
+from inventory.tasks import replenish_stock
 from decimal import Decimal
 
 
 AUTO_PART_URL = reverse('inventory:auto-part-list')
 CSV_UPLOAD_URL = reverse('inventory:auto-part-upload-csv')
+CACHE_STATS_URL = reverse('inventory:auto-part-cache-stats')
+AUTO_PART_BULK_URL = reverse('inventory:auto-part-bulk')
+RESERVE_CART_URL = reverse('inventory:auto-part-reserve-cart')
+EXPORT_URL = reverse('inventory:auto-part-export')
+ASYNC_AUTO_PART_URL = reverse('inventory:async-auto-part-list')
+UPLOAD_SESSION_URL = reverse('inventory:upload-session-list')
+
+
+def import_job_url(job_id):
+    return reverse('inventory:import-job-detail', args=[job_id])
+
+
+def import_job_errors_url(job_id):
+    return reverse('inventory:import-job-errors', args=[job_id])
+
+
+def upload_session_url(upload_id):
+    return reverse('inventory:upload-session-detail', args=[upload_id])
+
+
+def upload_finalize_url(upload_id):
+    return reverse('inventory:upload-session-finalize', args=[upload_id])
 
 
 def detail_url(auto_part_id):
     return reverse('inventory:auto-part-detail', args=[auto_part_id])
 
 
+def async_detail_url(auto_part_id):
+    return reverse('inventory:async-auto-part-detail', args=[auto_part_id])
+
+
+def reserve_url(auto_part_id):
+    return reverse('inventory:auto-part-reserve', args=[auto_part_id])
+
+
+def release_url(auto_part_id):
+    return reverse('inventory:auto-part-release', args=[auto_part_id])
+
+
+def movements_url(auto_part_id):
+    return reverse('inventory:auto-part-movements', args=[auto_part_id])
+
+
 def create_auto_part(**params):
     defaults = {
         'name': 'Sample Part',
@@ -98,7 +147,7 @@ class RegularUserAutoPartAPITests(TestCase):
         res = self.client.get(AUTO_PART_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_retrieve_auto_parts_details(self):
         auto_part = create_auto_part()
@@ -142,6 +191,11 @@ class AdminAutoPartAPITests(TestCase):
         self.client = APIClient()
         self.user = create_superuser(username="admin", password="adminpass123", email="admin@testing.com")
         self.client.force_authenticate(self.user)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
 
     def test_create_auto_part(self):
         payload = {
@@ -186,6 +240,14 @@ class AdminAutoPartAPITests(TestCase):
         auto_part.refresh_from_db()
         self.assertEqual(auto_part.price, payload['price'])
 
+    def test_reorder_target_below_reorder_point_is_rejected(self):
+        auto_part = create_auto_part(reorder_point=20)
+
+        res = self.client.patch(detail_url(auto_part.id), {'reorder_target': 5})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('reorder_target', res.data)
+
     def test_delete_auto_part(self):
         auto_part = create_auto_part()
 
@@ -234,4 +296,988 @@ class AdminAutoPartAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
         self.assertIn('message', res.data)
+        job = ImportJob.objects.get(pk=res.data['job_id'])
+        mock_import_task.assert_called_once_with(job.id)
+        self.assertEqual(job.status, ImportJob.Status.PENDING)
+        with default_storage.open(job.file_name, 'rb') as stored_file:
+            self.assertEqual(stored_file.read(), csv_content)
+
+    def test_bulk_create_auto_parts_via_csv_invalid_mode(self):
+        csv_file = SimpleUploadedFile("partes.csv", b"nome,descricao,preco,quantidade_inicial\n",
+                                      content_type="text/csv")
+        data = {"file": csv_file, "mode": "replace"}
+
+        res = self.client.post(CSV_UPLOAD_URL, data, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', res.data)
+
+    def test_bulk_create_auto_parts_via_csv_invalid_engine(self):
+        csv_file = SimpleUploadedFile("partes.csv", b"nome,descricao,preco,quantidade_inicial\n",
+                                      content_type="text/csv")
+        data = {"file": csv_file, "engine": "magic"}
+
+        res = self.client.post(CSV_UPLOAD_URL, data, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', res.data)
+
+    @patch('inventory.views.import_auto_parts_from_csv.delay')
+    def test_bulk_create_auto_parts_via_csv_upsert_mode(self, mock_import_task):
+        csv_file = SimpleUploadedFile("partes.csv", b"codigo,nome,descricao,preco,quantidade_inicial\n",
+                                      content_type="text/csv")
+        data = {"file": csv_file, "mode": "upsert"}
+
+        res = self.client.post(CSV_UPLOAD_URL, data, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(ImportJob.objects.get(pk=res.data['job_id']).upsert)
+
+    @patch('inventory.views.import_auto_parts_from_csv.delay')
+    def test_bulk_create_auto_parts_via_csv_returns_validation_summary(self, mock_import_task):
+        csv_content = (
+            b"nome,descricao,preco,quantidade_inicial\n"
+            b"Part X,Description X,12.50,10\n"
+            b"Part Y,Description Y,12.5.0,20\n"
+        )
+        csv_file = SimpleUploadedFile("partes.csv", csv_content, content_type="text/csv")
+
+        res = self.client.post(CSV_UPLOAD_URL, {"file": csv_file}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        validation = res.data['validation']
+        self.assertEqual((validation['rows'], validation['valid_rows']), (2, 1))
+        self.assertEqual(validation['errors'], {'invalid_price': 1})
+        self.assertEqual(validation['sample'], [
+            {'line': 3, 'code': 'invalid_price', 'message': "Preço inválido: '12.5.0'."},
+        ])
+        self.assertEqual(ImportJob.objects.get(pk=res.data['job_id']).validation, validation)
+
+    @override_settings(CSV_SYNC_VALIDATION_MAX_SIZE=10)
+    @patch('inventory.views.import_auto_parts_from_csv.delay')
+    def test_bulk_create_auto_parts_via_large_csv_is_validated_by_the_task(self, mock_import_task):
+        csv_file = SimpleUploadedFile("partes.csv", b"nome\nPart X\n", content_type="text/csv")
+
+        res = self.client.post(CSV_UPLOAD_URL, {"file": csv_file}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertIsNone(res.data['validation'])
+
+    def test_bulk_create_auto_parts_via_csv_missing_columns(self):
+        csv_file = SimpleUploadedFile("partes.csv", b"nome,preco\nPart X,12.50\n", content_type="text/csv")
+
+        res = self.client.post(CSV_UPLOAD_URL, {"file": csv_file, "mode": "upsert"}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['error'], "Colunas obrigatórias ausentes: descricao, quantidade_inicial, codigo.")
+        self.assertFalse(ImportJob.objects.exists())
+
+    def test_create_auto_part_with_blank_sku(self):
+        payload = {'name': 'Part', 'description': 'No SKU', 'price': '1.00', 'stock_quantity': 1, 'sku': ''}
+
+        self.client.post(AUTO_PART_URL, payload)
+        res = self.client.post(AUTO_PART_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(res.data['sku'])
+
+    @patch('inventory.views.import_auto_parts_from_csv_parallel.delay')
+    def test_bulk_create_auto_parts_via_csv_parallel(self, mock_import_task):
+        csv_content = b"nome,descricao,preco,quantidade_inicial\n"
+        csv_file = SimpleUploadedFile("partes.csv", csv_content, content_type="text/csv")
+        data = {"file": csv_file, "parallel": "true"}
+
+        res = self.client.post(CSV_UPLOAD_URL, data, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
         mock_import_task.assert_called_once()
+
+    @patch('inventory.views.import_auto_parts_from_csv.delay')
+    def test_bulk_create_auto_parts_via_gzip_csv(self, mock_import_task):
+        compressed = gzip.compress(b"nome,descricao,preco,quantidade_inicial\nPart X,Description X,12.50,10\n")
+        data = {"file": SimpleUploadedFile("partes.csv.gz", compressed, content_type="application/gzip")}
+
+        res = self.client.post(CSV_UPLOAD_URL, data, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        job = ImportJob.objects.get(pk=res.data['job_id'])
+        self.assertTrue(job.file_name.endswith('.csv.gz'))
+        with default_storage.open(job.file_name, 'rb') as stored_file:
+            self.assertEqual(stored_file.read(), compressed)
+        self.assertIsNone(res.data['validation'])
+
+    @patch('inventory.views.validate_csv')
+    @patch('inventory.views.import_auto_parts_from_csv.delay')
+    def test_bulk_create_auto_parts_via_small_gzip_csv_is_validated_by_the_task(self, mock_import_task, mock_validate):
+        # A few KB of gzip can expand to far more than CSV_SYNC_VALIDATION_MAX_SIZE.
+        rows = b"Part X,Description X,12.50,10\n" * 200000
+        compressed = gzip.compress(b"nome,descricao,preco,quantidade_inicial\n" + rows)
+        data = {"file": SimpleUploadedFile("partes.csv.gz", compressed, content_type="application/gzip")}
+
+        res = self.client.post(CSV_UPLOAD_URL, data, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertLess(len(compressed), settings.CSV_SYNC_VALIDATION_MAX_SIZE)
+        self.assertIsNone(res.data['validation'])
+        mock_validate.assert_not_called()
+
+    @patch('inventory.views.import_auto_parts_from_csv.delay')
+    def test_bulk_create_auto_parts_via_identical_csv_is_not_imported_again(self, mock_import_task):
+        csv_content = b"codigo,nome,descricao,preco,quantidade_inicial\nA-1,Part X,Description X,12.50,10\n"
+
+        def upload(**data):
+            csv_file = SimpleUploadedFile("partes.csv", csv_content, content_type="text/csv")
+            return self.client.post(CSV_UPLOAD_URL, {"file": csv_file, "mode": "upsert", **data}, format='multipart')
+
+        first = upload()
+        second = upload()
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertTrue(second.data['duplicate'])
+        self.assertEqual(second.data['job_id'], first.data['job_id'])
+        mock_import_task.assert_called_once()
+        self.assertEqual(len(default_storage.listdir('imports')[1]), 1)
+
+        forced = upload(force="true")
+
+        self.assertEqual(forced.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(ImportJob.objects.count(), 2)
+        self.assertEqual(ImportJob.objects.get(pk=forced.data['job_id']).content_hash,
+                         ImportJob.objects.get(pk=first.data['job_id']).content_hash)
+
+    def test_bulk_create_auto_parts_via_corrupt_gzip_csv(self):
+        data = {"file": SimpleUploadedFile("partes.csv.gz", b"not gzip", content_type="application/gzip")}
+
+        res = self.client.post(CSV_UPLOAD_URL, data, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['error'], "Arquivo compactado inválido.")
+        self.assertFalse(ImportJob.objects.exists())
+
+
+class UploadSessionAPITests(TestCase):
+    """Tests for resumable CSV uploads sent in parts."""
+    content = (
+        b"codigo,nome,descricao,preco,quantidade_inicial\n"
+        b"SKU-X,Part X,Description X,12.50,10\nSKU-Y,Part Y,Description Y,22.75,20\n"
+    )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_superuser(username="admin", password="adminpass123", email="admin@testing.com")
+        self.authorize(self.user)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def authorize(self, user):
+        # A real token, so the stateless authentication used in production runs.
+        token = TokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def start(self, **payload):
+        res = self.client.post(UPLOAD_SESSION_URL, {'name': 'partes.csv', 'size': len(self.content), **payload})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res.data['id']
+
+    def send(self, upload_id, offset, data):
+        return self.client.patch(
+            upload_session_url(upload_id), data, content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    @patch('inventory.views.import_auto_parts_from_csv.delay')
+    def test_upload_in_parts_and_finalize(self, mock_import_task):
+        upload_id = self.start()
+
+        self.assertEqual(self.send(upload_id, 0, self.content[:50])['Upload-Offset'], '50')
+        res = self.send(upload_id, 50, self.content[50:])
+        self.assertEqual(res.data['offset'], len(self.content))
+        res = self.client.post(upload_finalize_url(upload_id), {'mode': 'upsert'})
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        job = ImportJob.objects.get(pk=res.data['job_id'])
+        mock_import_task.assert_called_once_with(job.id)
+        self.assertTrue(job.upsert)
+        with default_storage.open(job.file_name, 'rb') as stored_file:
+            self.assertEqual(stored_file.read(), self.content)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(self.client.post(upload_finalize_url(upload_id)).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_resume_after_interrupted_part(self):
+        upload_id = self.start()
+        self.send(upload_id, 0, self.content[:50])
+
+        res = self.send(upload_id, 80, self.content[80:])
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.client.get(upload_session_url(upload_id)).data['offset'], 50)
+        self.assertEqual(self.send(upload_id, 50, self.content[50:]).status_code, status.HTTP_200_OK)
+
+    def test_part_is_received_before_the_session_is_locked(self):
+        upload_id = self.start()
+
+        def concurrent_part(stream, max_size):
+            # Another request stores the same part while this one is still arriving.
+            part = receive_part(stream, max_size)
+            mock_receive.side_effect = receive_part
+            self.assertEqual(self.send(upload_id, 0, self.content[:50]).status_code, status.HTTP_200_OK)
+            return part
+
+        with patch('inventory.views.receive_part', side_effect=concurrent_part) as mock_receive:
+            res = self.send(upload_id, 0, self.content[:20])
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res['Upload-Offset'], '50')
+        upload = UploadSession.objects.get(pk=upload_id)
+        with default_storage.open(upload.file_name, 'rb') as stored_file:
+            self.assertEqual(stored_file.read(), self.content[:50])
+
+    @override_settings(UPLOAD_PART_MAX_SIZE=10)
+    def test_part_larger_than_allowed_is_rejected(self):
+        upload_id = self.start()
+
+        res = self.send(upload_id, 0, self.content[:11])
+
+        self.assertEqual(res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertEqual(self.send(upload_id, 0, self.content[:10])['Upload-Offset'], '10')
+
+    def test_incomplete_upload_cannot_be_finalized(self):
+        upload_id = self.start()
+        self.send(upload_id, 0, self.content[:50])
+
+        res = self.client.post(upload_finalize_url(upload_id))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(ImportJob.objects.exists())
+
+    def test_upload_name_must_be_csv(self):
+        res = self.client.post(UPLOAD_SESSION_URL, {'name': 'partes.xlsx'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_abort_upload_deletes_file(self):
+        upload_id = self.start(name='partes.csv.zst')
+        file_name = UploadSession.objects.get(pk=upload_id).file_name
+
+        res = self.client.delete(upload_session_url(upload_id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(file_name.endswith('.csv.zst'))
+        self.assertFalse(default_storage.exists(file_name))
+
+    def test_uploads_of_other_users_are_hidden(self):
+        upload_id = self.start()
+        self.authorize(create_superuser(username="other", password="otherpass123"))
+
+        self.assertEqual(self.client.get(upload_session_url(upload_id)).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.send(upload_id, 0, self.content).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ImportJobAPITests(TestCase):
+    """Tests for following CSV import jobs through the API."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_superuser(username="admin", password="adminpass123", email="admin@testing.com")
+        self.client.force_authenticate(self.user)
+        self.job = ImportJob.objects.create(file_name='imports/partes.csv', rows_processed=3, error_count=2)
+        self.job.errors.create(line=4, code=ImportJobError.Code.INVALID_QUANTITY, message="Quantidade inválida: '1.5'.")
+        self.job.errors.create(line=2, code=ImportJobError.Code.INVALID_PRICE, message="Preço inválido: 'x, y'.")
+
+    def test_retrieve_import_job(self):
+        res = self.client.get(import_job_url(self.job.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['status'], ImportJob.Status.PENDING)
+        self.assertEqual(res.data['rows_processed'], 3)
+        self.assertEqual(res.data['error_count'], 2)
+
+    def test_download_import_job_error_report(self):
+        res = self.client.get(import_job_errors_url(self.job.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('attachment', res['Content-Disposition'])
+        content = b''.join(res.streaming_content).decode('utf-8')
+        self.assertEqual(
+            content.splitlines(),
+            [
+                'linha,tipo,erro',
+                '2,invalid_price,"Preço inválido: \'x, y\'."',
+                "4,invalid_quantity,Quantidade inválida: '1.5'.",
+            ],
+        )
+
+    def test_import_job_requires_admin(self):
+        self.client.force_authenticate(create_user(username="user", password="userpass123"))
+
+        self.assertEqual(self.client.get(import_job_url(self.job.id)).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(import_job_errors_url(self.job.id)).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AutoPartPaginationAPITests(TestCase):
+    """Tests for the keyset pagination of the AutoPart list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(username="user", password="userpass123", email="user@testing.com")
+        self.client.force_authenticate(self.user)
+        prices = ['30.00', '10.00', '20.00', '10.00', '20.00']
+        self.parts = [create_auto_part(name=f'Part {i}', price=Decimal(price)) for i, price in enumerate(prices)]
+
+    def collect_pages(self, url):
+        ids = []
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in res.data['results'])
+            url = res.data['next']
+        return ids
+
+    def test_list_is_paginated_by_id(self):
+        res = self.client.get(AUTO_PART_URL, {'page_size': 2})
+
+        self.assertEqual([item['id'] for item in res.data['results']], [p.id for p in self.parts[:2]])
+        self.assertIsNone(res.data['previous'])
+        self.assertIsNotNone(res.data['next'])
+
+    def test_follow_next_links_through_all_pages(self):
+        ids = self.collect_pages(f'{AUTO_PART_URL}?page_size=2')
+
+        self.assertEqual(ids, [p.id for p in self.parts])
+
+    def test_ordering_by_price_uses_id_as_tiebreaker(self):
+        ids = self.collect_pages(f'{AUTO_PART_URL}?page_size=1&ordering=-price')
+
+        expected = sorted(self.parts, key=lambda p: (-p.price, -p.id))
+        self.assertEqual(ids, [p.id for p in expected])
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get(AUTO_PART_URL, {'page_size': 2, 'ordering': 'price'})
+        second = self.client.get(first.data['next'])
+
+        previous = self.client.get(second.data['previous'])
+
+        self.assertEqual(previous.data['results'], first.data['results'])
+        self.assertIsNone(previous.data['previous'])
+
+    def test_invalid_ordering(self):
+        res = self.client.get(AUTO_PART_URL, {'ordering': 'description'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(AUTO_PART_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AutoPartFilterAPITests(TestCase):
+    """Tests for searching and filtering the AutoPart list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(username="user", password="userpass123", email="user@testing.com")
+        self.client.force_authenticate(self.user)
+        self.oil_filter = create_auto_part(
+            name='Filtro de Óleo', description='Retém impurezas do óleo do motor', price=Decimal('29.90'),
+            stock_quantity=5,
+        )
+        self.brake_pad = create_auto_part(
+            name='Pastilha de Freio', description='Conjunto de atrito usado para frear o veículo',
+            price=Decimal('129.99'), stock_quantity=0,
+        )
+
+    def result_ids(self, params):
+        res = self.client.get(AUTO_PART_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in res.data['results']]
+
+    def test_full_text_search_matches_stemmed_words(self):
+        self.assertEqual(self.result_ids({'search': 'filtros'}), [self.oil_filter.id])
+        self.assertEqual(self.result_ids({'search': 'freiar veículos'}), [self.brake_pad.id])
+
+    def test_search_falls_back_to_trigram_similarity(self):
+        self.assertEqual(self.result_ids({'search': 'Pastiha de Frei'}), [self.brake_pad.id])
+
+    def test_filter_by_price_range(self):
+        self.assertEqual(self.result_ids({'price_min': '100'}), [self.brake_pad.id])
+        self.assertEqual(self.result_ids({'price_max': '29.90'}), [self.oil_filter.id])
+        self.assertEqual(self.result_ids({'price_min': '30', 'price_max': '100'}), [])
+
+    def test_filter_in_stock(self):
+        self.assertEqual(self.result_ids({'in_stock': 'true'}), [self.oil_filter.id])
+        self.assertEqual(self.result_ids({'in_stock': 'false'}), [self.brake_pad.id])
+
+    def test_invalid_filters(self):
+        self.assertEqual(self.client.get(AUTO_PART_URL, {'price_min': 'abc'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(AUTO_PART_URL, {'in_stock': 'maybe'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_price_filters_reject_values_outside_the_price_column(self):
+        for value in ('NaN', 'Infinity', '-inf', '1e999999', '100000000'):
+            with self.subTest(value=value):
+                res = self.client.get(AUTO_PART_URL, {'price_max': value})
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('price_max', res.json())
+        self.assertCountEqual(self.result_ids({'price_max': '99999999.99'}), [self.brake_pad.id, self.oil_filter.id])
+
+
+class AutoPartCacheAPITests(TestCase):
+    """Tests for the versioned cache of the AutoPart read endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_superuser(username="admin", password="adminpass123", email="admin@testing.com")
+        self.client.force_authenticate(self.user)
+        self.auto_part = create_auto_part()
+
+    def test_list_and_retrieve_are_cached(self):
+        self.assertEqual(self.client.get(AUTO_PART_URL)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(detail_url(self.auto_part.id))['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            list_res = self.client.get(AUTO_PART_URL)
+            detail_res = self.client.get(detail_url(self.auto_part.id))
+
+        self.assertEqual(list_res['X-Cache'], 'HIT')
+        self.assertEqual(list_res.data['results'][0]['id'], self.auto_part.id)
+        self.assertEqual(detail_res['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(CACHE_STATS_URL).data, {'hits': 2, 'misses': 2})
+
+    def test_query_parameters_are_cached_separately(self):
+        self.client.get(AUTO_PART_URL)
+
+        res = self.client.get(AUTO_PART_URL, {'price_min': '100'})
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['results'], [])
+
+    def test_api_writes_invalidate_cache(self):
+        self.client.get(detail_url(self.auto_part.id))
+
+        self.client.patch(detail_url(self.auto_part.id), {'price': '49.99'})
+        res = self.client.get(detail_url(self.auto_part.id))
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['price'], '49.99')
+
+    def test_bulk_update_invalidates_cache(self):
+        AutoPart.objects.filter(id=self.auto_part.id).update(stock_quantity=1)
+        self.client.get(detail_url(self.auto_part.id))
+
+        replenish_stock()
+        res = self.client.get(detail_url(self.auto_part.id))
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['stock_quantity'], 10)
+
+    def test_cache_stats_requires_admin(self):
+        self.client.force_authenticate(create_user(username="user", password="userpass123"))
+
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AutoPartConditionalGetAPITests(TestCase):
+    """Tests for ETag / Last-Modified conditional requests on the AutoPart read endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_superuser(username="admin", password="adminpass123", email="admin@testing.com")
+        self.client.force_authenticate(self.user)
+        self.auto_part = create_auto_part()
+
+    def test_retrieve_if_none_match_returns_not_modified(self):
+        etag = self.client.get(detail_url(self.auto_part.id))['ETag']
+
+        with self.assertNumQueries(1):
+            res = self.client.get(detail_url(self.auto_part.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertEqual(res.content, b'')
+
+    def test_retrieve_if_modified_since_returns_not_modified(self):
+        last_modified = self.client.get(detail_url(self.auto_part.id))['Last-Modified']
+
+        res = self.client.get(detail_url(self.auto_part.id), HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_retrieve_changes_etag_after_update(self):
+        etag = self.client.get(detail_url(self.auto_part.id))['ETag']
+
+        self.client.patch(detail_url(self.auto_part.id), {'price': '49.99'})
+        res = self.client.get(detail_url(self.auto_part.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(res.data['price'], '49.99')
+
+    def test_replenish_stock_changes_etag(self):
+        AutoPart.objects.filter(id=self.auto_part.id).update(stock_quantity=1)
+        etag = self.client.get(detail_url(self.auto_part.id))['ETag']
+
+        replenish_stock()
+        res = self.client.get(detail_url(self.auto_part.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['stock_quantity'], 10)
+
+    def test_list_if_none_match_returns_not_modified_without_queries(self):
+        etag = self.client.get(AUTO_PART_URL)['ETag']
+
+        with self.assertNumQueries(0):
+            res = self.client.get(AUTO_PART_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_etag_changes_after_write(self):
+        etag = self.client.get(AUTO_PART_URL)['ETag']
+
+        create_auto_part(name='Another Part')
+        res = self.client.get(AUTO_PART_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_list_etag_depends_on_query(self):
+        etag = self.client.get(AUTO_PART_URL)['ETag']
+
+        res = self.client.get(AUTO_PART_URL, {'price_min': '100'}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_conditional_request_requires_authentication(self):
+        etag = self.client.get(AUTO_PART_URL)['ETag']
+        self.client.force_authenticate(None)
+
+        res = self.client.get(AUTO_PART_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AutoPartSparseFieldsAPITests(TestCase):
+    """Tests for the values-based read path and the `fields` parameter of the AutoPart API."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(username="user", password="userpass123")
+        self.client.force_authenticate(self.user)
+        self.auto_part = create_auto_part(sku='SKU-1')
+
+    def test_read_output_matches_model_serializer(self):
+        res = self.client.get(detail_url(self.auto_part.id))
+
+        self.auto_part.refresh_from_db()
+        self.assertEqual(res.data, AutoPartSerializer(self.auto_part).data)
+
+    def test_list_returns_only_requested_fields(self):
+        res = self.client.get(AUTO_PART_URL, {'fields': 'id,name,price'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [{'id': self.auto_part.id, 'name': 'Sample Part', 'price': '19.99'}])
+
+    def test_retrieve_returns_only_requested_fields(self):
+        res = self.client.get(detail_url(self.auto_part.id), {'fields': 'name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'name': 'Sample Part'})
+        self.assertIn('ETag', res)
+
+    def test_fields_restrict_selected_columns(self):
+        with self.assertNumQueries(1) as context:
+            self.client.get(AUTO_PART_URL, {'fields': 'name', 'ordering': 'price'})
+
+        sql = context.captured_queries[0]['sql']
+        self.assertIn('"name"', sql)
+        self.assertNotIn('"description"', sql)
+
+    def test_fields_keep_pagination_working(self):
+        second = create_auto_part(name='Second Part', price=29.99)
+
+        res = self.client.get(AUTO_PART_URL, {'fields': 'name', 'ordering': 'price', 'page_size': 1})
+        next_res = self.client.get(res.data['next'])
+
+        self.assertEqual(next_res.data['results'], [{'name': second.name}])
+
+    def test_invalid_field_returns_bad_request(self):
+        res = self.client.get(AUTO_PART_URL, {'fields': 'id,secret'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+
+class AutoPartBulkAPITests(TestCase):
+    """Tests for the bulk write endpoint of the AutoPart API."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_superuser(username="admin", password="adminpass123", email="admin@testing.com")
+        self.client.force_authenticate(self.user)
+        self.auto_part = create_auto_part(sku='SKU-1')
+
+    def test_bulk_create_update_and_delete(self):
+        to_delete = create_auto_part(name='Old Part')
+        payload = {
+            'create': [{'name': 'New Part', 'description': 'New', 'price': '5.00', 'stock_quantity': 3}],
+            'update': [{'id': self.auto_part.id, 'price': '9.99'}],
+            'delete': [to_delete.id],
+        }
+
+        res = self.client.post(AUTO_PART_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['updated'], [self.auto_part.id])
+        self.assertEqual(res.data['deleted'], [to_delete.id])
+        self.assertTrue(AutoPart.objects.filter(id__in=res.data['created'], name='New Part').exists())
+        self.assertFalse(AutoPart.objects.filter(id=to_delete.id).exists())
+        self.auto_part.refresh_from_db()
+        self.assertEqual(self.auto_part.price, Decimal('9.99'))
+
+    def test_bulk_price_update_uses_few_queries(self):
+        parts = AutoPart.objects.bulk_create(
+            AutoPart(name=f'Part {i}', description='', price=1, stock_quantity=1) for i in range(200)
+        )
+        payload = {'update': [{'id': part.id, 'price': '2.50'} for part in parts]}
+
+        # One SELECT ... FOR UPDATE and one UPDATE, plus the savepoints of the nested transactions
+        # and the two statements tagging the stock movements.
+        with self.assertNumQueries(8):
+            res = self.client.post(AUTO_PART_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(AutoPart.objects.filter(price=Decimal('2.50')).count(), 200)
+
+    def test_bulk_update_refreshes_updated_at_and_cache(self):
+        etag = self.client.get(detail_url(self.auto_part.id))['ETag']
+
+        self.client.post(AUTO_PART_BULK_URL, {'update': [{'id': self.auto_part.id, 'stock_quantity': 7}]},
+                         format='json')
+        res = self.client.get(detail_url(self.auto_part.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['stock_quantity'], 7)
+
+    def test_invalid_item_reports_errors_and_writes_nothing(self):
+        payload = {
+            'create': [
+                {'name': 'Valid', 'description': 'x', 'price': '1.00', 'stock_quantity': 1},
+                {'name': 'Invalid', 'description': 'x', 'price': 'abc', 'stock_quantity': 1},
+            ],
+            'update': [{'id': self.auto_part.id, 'price': '3.00'}, {'id': 999999, 'price': '3.00'}],
+            'delete': [999998],
+        }
+
+        res = self.client.post(AUTO_PART_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['create'][0], {})
+        self.assertIn('price', res.data['create'][1])
+        self.assertEqual(res.data['update'][0], {})
+        self.assertIn('id', res.data['update'][1])
+        self.assertEqual(res.data['delete'], ['Peça não encontrada.'])
+        self.assertEqual(AutoPart.objects.count(), 1)
+        self.auto_part.refresh_from_db()
+        self.assertEqual(self.auto_part.price, Decimal('19.99'))
+
+    def test_duplicate_sku_is_reported_per_item(self):
+        payload = {'create': [
+            {'name': 'A', 'description': 'x', 'price': '1.00', 'stock_quantity': 1, 'sku': 'SKU-1'},
+            {'name': 'B', 'description': 'x', 'price': '1.00', 'stock_quantity': 1, 'sku': 'SKU-2'},
+        ]}
+
+        res = self.client.post(AUTO_PART_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('sku', res.data['create'][0])
+        self.assertEqual(res.data['create'][1], {})
+
+    def test_bulk_requires_admin(self):
+        self.client.force_authenticate(create_user(username="user", password="userpass123"))
+
+        res = self.client.post(AUTO_PART_BULK_URL, {'delete': [self.auto_part.id]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(AutoPart.objects.filter(id=self.auto_part.id).exists())
+
+
+class StockReservationAPITests(TestCase):
+    """Tests for reserving and releasing AutoPart stock."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user(username="user", password="userpass123")
+        self.client.force_authenticate(self.user)
+        self.auto_part = create_auto_part(stock_quantity=5)
+
+    def test_reserve_decrements_stock(self):
+        res = self.client.post(reserve_url(self.auto_part.id), {'quantity': 3}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'id': self.auto_part.id, 'stock_quantity': 2})
+        self.auto_part.refresh_from_db()
+        self.assertEqual(self.auto_part.stock_quantity, 2)
+
+    def test_reserve_more_than_available_returns_conflict(self):
+        res = self.client.post(reserve_url(self.auto_part.id), {'quantity': 6}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['items'], [{'id': self.auto_part.id, 'requested': 6, 'available': 5}])
+        self.auto_part.refresh_from_db()
+        self.assertEqual(self.auto_part.stock_quantity, 5)
+
+    def test_reserve_missing_part_returns_not_found(self):
+        res = self.client.post(reserve_url(999999), {'quantity': 1}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reserve_requires_positive_quantity(self):
+        res = self.client.post(reserve_url(self.auto_part.id), {'quantity': 0}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reserve_invalidates_cache(self):
+        self.client.get(detail_url(self.auto_part.id))
+
+        self.client.post(reserve_url(self.auto_part.id), {'quantity': 1}, format='json')
+        res = self.client.get(detail_url(self.auto_part.id))
+
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.data['stock_quantity'], 4)
+
+    def test_release_requires_admin(self):
+        res = self.client.post(release_url(self.auto_part.id), {'quantity': 1}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_admin_release_increments_stock(self):
+        self.client.force_authenticate(create_superuser(username="admin", password="adminpass123"))
+
+        res = self.client.post(release_url(self.auto_part.id), {'quantity': 2}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['stock_quantity'], 7)
+
+    def test_reserve_cart(self):
+        other = create_auto_part(name='Other Part', stock_quantity=2)
+        payload = {'items': [{'id': other.id, 'quantity': 2}, {'id': self.auto_part.id, 'quantity': 1}]}
+
+        res = self.client.post(RESERVE_CART_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['items'], [
+            {'id': self.auto_part.id, 'stock_quantity': 4},
+            {'id': other.id, 'stock_quantity': 0},
+        ])
+
+    def test_reserve_cart_is_all_or_nothing(self):
+        other = create_auto_part(name='Other Part', stock_quantity=1)
+        payload = {'items': [{'id': self.auto_part.id, 'quantity': 1}, {'id': other.id, 'quantity': 2}]}
+
+        res = self.client.post(RESERVE_CART_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['items'], [{'id': other.id, 'requested': 2, 'available': 1}])
+        self.auto_part.refresh_from_db()
+        self.assertEqual(self.auto_part.stock_quantity, 5)
+
+
+class StockMovementAPITests(TestCase):
+    """Tests for the stock movement ledger of the AutoPart API."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_superuser(username="admin", password="adminpass123", email="admin@testing.com")
+        self.client.force_authenticate(self.user)
+
+    def movements(self, auto_part_id):
+        return [
+            (m.quantity, m.balance, m.reason)
+            for m in StockMovement.objects.filter(part_id=auto_part_id).order_by('id')
+        ]
+
+    def test_api_writes_record_movements(self):
+        res = self.client.post(AUTO_PART_URL, {
+            'name': 'Part', 'description': 'Part', 'price': '1.00', 'stock_quantity': 8,
+        })
+        auto_part_id = res.data['id']
+        self.client.patch(detail_url(auto_part_id), {'stock_quantity': 5})
+        self.client.patch(detail_url(auto_part_id), {'price': '2.00'})
+        self.client.post(reserve_url(auto_part_id), {'quantity': 2}, format='json')
+        self.client.delete(detail_url(auto_part_id))
+
+        self.assertEqual(self.movements(auto_part_id), [
+            (8, 8, 'api'), (-3, 5, 'api'), (-2, 3, 'reservation'), (-3, 0, 'api'),
+        ])
+
+    def test_writes_outside_tagged_paths_are_manual(self):
+        auto_part = create_auto_part(stock_quantity=3)
+
+        AutoPart.objects.filter(id=auto_part.id).update(stock_quantity=7)
+
+        self.assertEqual(self.movements(auto_part.id), [(3, 3, 'manual'), (4, 7, 'manual')])
+
+    def test_movement_history_is_newest_first(self):
+        auto_part = create_auto_part(stock_quantity=3)
+        self.client.post(reserve_url(auto_part.id), {'quantity': 1}, format='json')
+
+        res = self.client.get(movements_url(auto_part.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([m['reason'] for m in res.data['results']], ['reservation', 'manual'])
+        self.assertEqual(res.data['results'][0]['balance'], 2)
+
+    def test_movement_history_requires_admin(self):
+        auto_part = create_auto_part()
+        self.client.force_authenticate(create_user(username="user", password="userpass123"))
+
+        res = self.client.get(movements_url(auto_part.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AutoPartExportAPITests(TestCase):
+    """Tests for the streaming catalogue export."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(username="user", password="userpass123")
+        self.client.force_authenticate(self.user)
+        self.part_a = create_auto_part(name='Filtro, "premium"', description='Linha 1\nLinha 2', sku='SKU-A')
+        self.part_b = create_auto_part(name='Vela', price=5, stock_quantity=0)
+
+    def content(self, res):
+        return b''.join(res.streaming_content).decode('utf-8')
+
+    def test_export_csv_uses_import_layout(self):
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.DictReader(self.content(res).splitlines(keepends=True)))
+        self.assertEqual(rows, [
+            {'codigo': 'SKU-A', 'nome': 'Filtro, "premium"', 'descricao': 'Linha 1\nLinha 2',
+             'preco': '19.99', 'quantidade_inicial': '100'},
+            {'codigo': '', 'nome': 'Vela', 'descricao': 'This is a sample auto part.',
+             'preco': '5.00', 'quantidade_inicial': '0'},
+        ])
+
+    def test_export_csv_fields(self):
+        res = self.client.get(EXPORT_URL, {'fields': 'price,sku'})
+
+        rows = list(csv.reader(self.content(res).splitlines(keepends=True)))
+        self.assertEqual(rows, [['codigo', 'preco'], ['SKU-A', '19.99'], ['', '5.00']])
+
+    def test_export_csv_rejects_fields_without_column(self):
+        res = self.client.get(EXPORT_URL, {'fields': 'id,name'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', res.data['fields'])
+
+    def test_export_ndjson(self):
+        res = self.client.get(EXPORT_URL, {'output': 'ndjson', 'fields': 'id,name,price'})
+
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lines = [json.loads(line) for line in self.content(res).splitlines()]
+        self.assertEqual(lines, [
+            {'id': self.part_a.id, 'name': 'Filtro, "premium"', 'price': '19.99'},
+            {'id': self.part_b.id, 'name': 'Vela', 'price': '5.00'},
+        ])
+
+    def test_export_applies_filters(self):
+        res = self.client.get(EXPORT_URL, {'output': 'ndjson', 'in_stock': 'false'})
+
+        lines = [json.loads(line) for line in self.content(res).splitlines()]
+        self.assertEqual([line['id'] for line in lines], [self.part_b.id])
+
+    def test_export_invalid_output(self):
+        res = self.client.get(EXPORT_URL, {'output': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_requires_authentication(self):
+        self.client.force_authenticate(None)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AsyncAutoPartAPITests(TestCase):
+    """Tests for the async AutoPart read endpoints."""
+
+    def setUp(self):
+        self.user = create_user(username="user", password="userpass123")
+        self.client = AsyncClient()
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.oil_filter = create_auto_part(name='Filtro de Óleo', description='Retém impurezas do óleo do motor')
+        self.brake_pad = create_auto_part(name='Pastilha de Freio', price=Decimal('129.99'), stock_quantity=0)
+
+    def get(self, url, params=None):
+        return self.client.get(url, params, headers=self.headers)
+
+    async def test_list_matches_serializer_output(self):
+        res = await self.get(ASYNC_AUTO_PART_URL, {'page_size': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = res.json()
+        self.assertEqual(data['results'], [AutoPartSerializer(self.oil_filter).data])
+        self.assertIsNone(data['previous'])
+
+        next_page = (await self.get(data['next'])).json()
+        self.assertEqual([item['id'] for item in next_page['results']], [self.brake_pad.id])
+        self.assertIsNone(next_page['next'])
+
+    async def test_search_and_filters(self):
+        res = await self.get(ASYNC_AUTO_PART_URL, {'search': 'filtros', 'fields': 'id,name'})
+
+        self.assertEqual(res.json()['results'], [{'id': self.oil_filter.id, 'name': 'Filtro de Óleo'}])
+
+        res = await self.get(ASYNC_AUTO_PART_URL, {'search': 'Pastiha de Frei'})
+        self.assertEqual([item['id'] for item in res.json()['results']], [self.brake_pad.id])
+
+        res = await self.get(ASYNC_AUTO_PART_URL, {'in_stock': 'false', 'ordering': '-price'})
+        self.assertEqual([item['id'] for item in res.json()['results']], [self.brake_pad.id])
+
+    async def test_retrieve(self):
+        res = await self.get(async_detail_url(self.brake_pad.id), {'fields': 'id,price'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {'id': self.brake_pad.id, 'price': '129.99'})
+
+        res = await self.get(async_detail_url(self.brake_pad.id + 100))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_invalid_params(self):
+        res = await self.get(ASYNC_AUTO_PART_URL, {'price_min': 'abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('price_min', res.json())
+
+    async def test_requires_valid_token(self):
+        res = await self.client.get(ASYNC_AUTO_PART_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('WWW-Authenticate', res)
+
+        res = await self.client.get(ASYNC_AUTO_PART_URL, headers={'Authorization': 'Bearer invalid'})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_inactive_user_is_rejected(self):
+        self.user.is_active = False
+        await self.user.asave()
+
+        res = await self.get(async_detail_url(self.oil_filter.id))
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,153 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from core.models import AutoPart, RevokedToken
+from inventory.authentication import update_user_access
+from inventory.tasks import purge_revoked_tokens
+
+
+TOKEN_URL = reverse('token_obtain_pair')
+TOKEN_REFRESH_URL = reverse('token_refresh')
+TOKEN_REVOKE_URL = reverse('token_revoke')
+AUTO_PART_URL = reverse('inventory:auto-part-list')
+CACHE_STATS_URL = reverse('inventory:auto-part-cache-stats')
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    """Tests for authenticating from token claims and for token revocation."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='user', password='userpass123')
+        self.admin = get_user_model().objects.create_superuser(username='admin', password='adminpass123')
+        AutoPart.objects.create(name='Vela', description='Vela de ignição', price=10, stock_quantity=1)
+
+    def obtain_tokens(self, username, password):
+        res = self.client.post(TOKEN_URL, {'username': username, 'password': password})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data['access'], res.data['refresh']
+
+    def authorize(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_tokens_carry_is_staff(self):
+        self.assertTrue(AccessToken(self.obtain_tokens('admin', 'adminpass123')[0])['is_staff'])
+        self.assertFalse(AccessToken(self.obtain_tokens('user', 'userpass123')[0])['is_staff'])
+
+    def test_reads_run_no_auth_queries(self):
+        self.authorize(self.obtain_tokens('user', 'userpass123')[0])
+        self.client.get(AUTO_PART_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(AUTO_PART_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_admin_permission_comes_from_the_claim(self):
+        self.authorize(self.obtain_tokens('admin', 'adminpass123')[0])
+        self.client.get(CACHE_STATS_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.authorize(self.obtain_tokens('user', 'userpass123')[0])
+        self.assertEqual(self.client.get(CACHE_STATS_URL).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_token_without_claim_falls_back_to_user(self):
+        self.authorize(AccessToken.for_user(self.admin))
+
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_cached_user_holds_no_credentials(self):
+        self.authorize(AccessToken.for_user(self.admin))
+        self.client.get(CACHE_STATS_URL)
+
+        cached = cache.get(f'auth:user-fields:{self.admin.pk}')
+
+        self.assertEqual(set(cached), {'pk', 'username', 'is_staff', 'is_active', 'is_superuser'})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(CACHE_STATS_URL).status_code, status.HTTP_200_OK)
+
+    def test_revoke_access_and_refresh_tokens(self):
+        access, refresh = self.obtain_tokens('user', 'userpass123')
+        self.authorize(access)
+        self.assertEqual(self.client.get(AUTO_PART_URL).status_code, status.HTTP_200_OK)
+
+        res = self.client.post(TOKEN_REVOKE_URL, {'refresh': refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(AUTO_PART_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        res = self.client.post(TOKEN_REFRESH_URL, {'refresh': refresh})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke_rejects_refresh_token_of_another_user(self):
+        _, refresh = self.obtain_tokens('admin', 'adminpass123')
+        self.authorize(self.obtain_tokens('user', 'userpass123')[0])
+
+        res = self.client.post(TOKEN_REVOKE_URL, {'refresh': refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_deactivating_user_revokes_tokens(self):
+        access, refresh = self.obtain_tokens('user', 'userpass123')
+        self.authorize(access)
+        self.client.get(AUTO_PART_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get(AUTO_PART_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        self.assertEqual(self.client.post(TOKEN_REFRESH_URL, {'refresh': refresh}).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+    def test_changing_is_staff_revokes_tokens(self):
+        self.authorize(self.obtain_tokens('admin', 'adminpass123')[0])
+
+        self.admin.is_staff = False
+        self.admin.save()
+
+        self.assertEqual(self.client.get(CACHE_STATS_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleting_user_revokes_tokens(self):
+        self.authorize(self.obtain_tokens('admin', 'adminpass123')[0])
+        self.client.get(CACHE_STATS_URL)
+
+        self.admin.delete()
+
+        self.assertEqual(self.client.get(AUTO_PART_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.get(CACHE_STATS_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_deactivation_revokes_tokens(self):
+        self.authorize(self.obtain_tokens('user', 'userpass123')[0])
+        self.client.get(AUTO_PART_URL)
+
+        updated = update_user_access(get_user_model().objects.filter(username='user'), is_active=False)
+
+        self.assertEqual(updated, 1)
+        self.assertEqual(self.client.get(AUTO_PART_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_does_not_compare_access_fields(self):
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+
+    def test_purge_revoked_tokens_keeps_unexpired_entries(self):
+        access, _ = self.obtain_tokens('user', 'userpass123')
+        self.authorize(access)
+        self.client.post(TOKEN_REVOKE_URL)
+        RevokedToken.objects.create(user=self.admin, jti='expired', expires_at='2000-01-01T00:00:00Z')
+
+        purge_revoked_tokens()
+
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), [AccessToken(access)['jti']])
@@ -0,0 +1,99 @@
+from django.db import connection, transaction
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import AutoPart
+from inventory.tasks import replenish_stock
+
+
+CHANGES_URL = reverse('inventory:auto-part-changes')
+
+
+def create_auto_part(**params):
+    defaults = {
+        'name': 'Sample Part',
+        'description': 'This is a sample auto part.',
+        'price': 19.99,
+        'stock_quantity': 100,
+    }
+    defaults.update(params)
+    return AutoPart.objects.create(**defaults)
+
+
+class AutoPartChangeFeedTests(TransactionTestCase):
+    """Tests for the change feed. Feed entries only become visible after their transaction commits,
+    so these tests run outside of a wrapping transaction."""
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM core_autopartchange')
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username="user", password="pass12345"))
+
+    def sync(self, since=None, **params):
+        if since:
+            params['since'] = since
+        res = self.client.get(CHANGES_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_feed_returns_only_changes_after_cursor(self):
+        part_a = create_auto_part(name='A')
+        part_b = create_auto_part(name='B')
+
+        first = self.sync()
+        self.assertEqual([change['id'] for change in first['changes']], [part_a.id, part_b.id])
+        self.assertEqual(first['changes'][0]['part']['name'], 'A')
+
+        AutoPart.objects.filter(id=part_b.id).update(price=1)
+        second = self.sync(first['cursor'])
+
+        self.assertEqual([(c['id'], c['operation']) for c in second['changes']], [(part_b.id, 'upsert')])
+        self.assertEqual(second['changes'][0]['part']['price'], '1.00')
+        self.assertEqual(self.sync(second['cursor'])['changes'], [])
+
+    def test_feed_reports_deletes_and_replenish(self):
+        part_a = create_auto_part(name='A', stock_quantity=1)
+        part_b = create_auto_part(name='B')
+        part_b_id = part_b.id
+        cursor = self.sync()['cursor']
+
+        replenish_stock()
+        part_b.delete()
+        changes = self.sync(cursor)['changes']
+
+        self.assertEqual(
+            [(c['id'], c['operation']) for c in changes], [(part_a.id, 'upsert'), (part_b_id, 'delete')]
+        )
+        self.assertEqual(changes[0]['part']['stock_quantity'], 10)
+        self.assertIsNone(changes[1]['part'])
+
+    def test_feed_pages_with_limit(self):
+        parts = [create_auto_part(name=f'Part {i}') for i in range(5)]
+
+        first = self.sync(limit=3)
+        second = self.sync(first['cursor'], limit=3)
+
+        self.assertTrue(first['has_more'])
+        self.assertFalse(second['has_more'])
+        self.assertEqual([c['id'] for c in first['changes'] + second['changes']], [part.id for part in parts])
+
+    def test_uncommitted_changes_are_not_served(self):
+        cursor = self.sync()['cursor']
+
+        with transaction.atomic():
+            create_auto_part(name='Pending')
+            with connection.cursor() as db:
+                db.execute("SELECT count(*) FROM core_autopartchange")
+                self.assertEqual(db.fetchone()[0], 1)
+            # The feed is read here from the writing transaction itself, which is still running.
+            self.assertEqual(self.sync(cursor)['changes'], [])
+
+        self.assertEqual(len(self.sync(cursor)['changes']), 1)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(CHANGES_URL, {'since': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,187 @@
+import redis
+from unittest.mock import Mock, patch
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from core.models import AutoPart
+from inventory import metrics, telemetry
+from inventory.bench import isolated_cache
+from inventory.middleware import RequestMetricsMiddleware
+from inventory.tasks import replenish_stock
+from inventory.views import MetricsView
+
+
+METRICS_URL = reverse('metrics')
+AUTO_PART_URL = reverse('inventory:auto-part-list')
+ASYNC_AUTO_PART_URL = reverse('inventory:async-auto-part-list')
+
+
+def server_timing(response):
+    """Parses a Server-Timing header into {name: {'dur': ..., 'desc': ...}}."""
+    entries = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        entries[name] = dict(param.split('=', 1) for param in params)
+    return entries
+
+
+@override_settings(METRICS_TOKEN='secret')
+class RequestMetricsTests(TestCase):
+    """Tests for the request metrics middleware and the /metrics endpoint."""
+
+    def setUp(self):
+        metrics.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username='user', password='userpass123')
+        self.client.force_authenticate(self.user)
+        for i in range(3):
+            AutoPart.objects.create(name=f'Peça {i}', description='x', price=10, stock_quantity=1)
+
+    def scrape(self):
+        return self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer secret').content.decode()
+
+    def test_server_timing_reports_queries_and_durations(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(AUTO_PART_URL, {'fields': 'id'})
+
+        timing = server_timing(res)
+        self.assertEqual(timing['db']['desc'], '"1 queries"')
+        self.assertGreater(float(timing['total']['dur']), 0)
+        self.assertIn('render', timing)
+
+    @override_settings(METRICS_SERVER_TIMING=False)
+    def test_server_timing_can_be_disabled(self):
+        self.assertNotIn('Server-Timing', self.client.get(AUTO_PART_URL))
+
+    def test_metrics_aggregate_per_view(self):
+        self.client.get(AUTO_PART_URL)
+        self.client.get(AUTO_PART_URL)
+
+        body = self.scrape()
+
+        labels = 'view="inventory:auto-part-list",method="GET"'
+        self.assertIn(f'http_requests_total{{{labels},status="200"}} 2', body)
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 2', body)
+        self.assertIn(f'http_request_queries_bucket{{{labels},le="+Inf"}} 2', body)
+        self.assertIn('# TYPE http_request_db_duration_seconds histogram', body)
+
+    async def test_async_views_are_measured(self):
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+        res = await AsyncClient().get(ASYNC_AUTO_PART_URL, headers=headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(server_timing(res)['db']['desc'], '"0 queries"')
+
+    @override_settings(METRICS_QUERY_BUDGET=0)
+    def test_query_budget_is_flagged(self):
+        with self.assertLogs('inventory.middleware', level='WARNING') as logs:
+            self.client.get(AUTO_PART_URL)
+
+        self.assertIn('inventory:auto-part-list', logs.output[0])
+        body = self.scrape()
+        self.assertIn(
+            'http_request_query_budget_exceeded_total{view="inventory:auto-part-list",method="GET"} 1', body
+        )
+
+    @override_settings(METRICS_REPEATED_QUERY_LIMIT=2)
+    def test_repeated_queries_are_flagged(self):
+        def n_plus_one_view(request):
+            for part_id in AutoPart.objects.values_list('id', flat=True):
+                AutoPart.objects.get(pk=part_id)
+            return HttpResponse()
+        middleware = RequestMetricsMiddleware(n_plus_one_view)
+
+        with self.assertLogs('inventory.middleware', level='WARNING') as logs:
+            response = middleware(RequestFactory().get('/'))
+
+        self.assertEqual(server_timing(response)['db']['desc'], '"4 queries"')
+        self.assertIn('(3 vezes)', logs.output[0])
+
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, status.HTTP_403_FORBIDDEN)
+
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer secret')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_without_token_require_debug(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, status.HTTP_403_FORBIDDEN)
+
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get(METRICS_URL).status_code, status.HTTP_200_OK)
+
+    def test_benchmark_requests_stay_out_of_the_metrics(self):
+        with isolated_cache():
+            self.client.get(AUTO_PART_URL)
+            self.assertIn('view="inventory:auto-part-list"', metrics.render([metrics.HTTP_REQUESTS]))
+
+        self.assertNotIn('view="inventory:auto-part-list"', self.scrape())
+
+    def test_requests_succeed_when_redis_is_down(self):
+        unavailable = Mock(side_effect=redis.ConnectionError('Connection refused'))
+
+        with patch.object(metrics.redis.Redis, 'pipeline', unavailable), \
+                self.assertLogs('inventory.metrics', level='WARNING'):
+            res = self.client.get(AUTO_PART_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_requests_succeed_when_metrics_cannot_be_saved(self):
+        with patch.object(metrics.Observations, 'save', side_effect=RuntimeError('falha')), \
+                self.assertLogs('inventory.middleware', level='WARNING'):
+            res = self.client.get(AUTO_PART_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class TaskTelemetryTests(TestCase):
+    """Tests for the Celery task telemetry recorded through the task signals."""
+    task = 'inventory.tasks.replenish_stock'
+
+    def setUp(self):
+        metrics.reset()
+        telemetry.reset()
+        AutoPart.objects.create(name='Peça', description='x', price=10, stock_quantity=0)
+
+    def test_run_is_recorded_with_task_counters(self):
+        replenish_stock.apply()
+
+        [run] = telemetry.recent_runs(self.task)[self.task]
+        self.assertEqual(run['state'], 'SUCCESS')
+        self.assertEqual(run['counters']['parts_replenished'], 1)
+        self.assertGreater(run['run_seconds'], 0)
+        self.assertGreater(run['peak_memory_kb'], 0)
+        body = metrics.render(MetricsView.metrics)
+        self.assertIn(f'celery_task_runs_total{{task="{self.task}",state="SUCCESS"}} 1', body)
+        self.assertIn(f'celery_task_items_total{{task="{self.task}",counter="parts_replenished"}} 1', body)
+        self.assertIn(f'celery_task_duration_seconds_count{{task="{self.task}"}} 1', body)
+
+    def test_queue_wait_comes_from_the_publication_header(self):
+        headers = {}
+        telemetry.stamp_published_at(headers=headers)
+        headers[telemetry.PUBLISHED_AT_HEADER] -= 5
+
+        replenish_stock.apply(headers=headers)
+
+        [run] = telemetry.recent_runs(self.task)[self.task]
+        self.assertGreaterEqual(run['queue_seconds'], 5)
+        self.assertIn(f'celery_task_queue_seconds_count{{task="{self.task}"}} 1', metrics.render(MetricsView.metrics))
+
+    @override_settings(TASK_TELEMETRY_RECENT_RUNS=2)
+    def test_recent_runs_are_capped(self):
+        results = [replenish_stock.apply() for _ in range(3)]
+
+        runs = telemetry.recent_runs()[self.task]
+        self.assertEqual([run['task_id'] for run in runs], [result.id for result in results[:0:-1]])
+
+    def test_count_outside_a_run_is_ignored(self):
+        telemetry.count('rows_parsed', 10)
+
+        self.assertEqual(telemetry.recent_runs(), {})
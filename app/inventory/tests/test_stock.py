@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connection
+from django.test import TransactionTestCase
+from rest_framework.exceptions import APIException
+from core.models import AutoPart
+from inventory.stock import reserve, reserve_many
+
+
+def create_auto_part(**params):
+    defaults = {
+        'name': 'Sample Part',
+        'description': 'This is a sample auto part.',
+        'price': 19.99,
+        'stock_quantity': 100,
+    }
+    defaults.update(params)
+    return AutoPart.objects.create(**defaults)
+
+
+def run_concurrently(function, calls, workers=20):
+    """Runs `function(*args)` for every args tuple in `calls` from parallel threads, each with its own connection.
+
+    Returns the results, with the raised APIException in place of failed calls.
+    """
+    def call(args):
+        try:
+            return function(*args)
+        except APIException as e:
+            return e
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(call, calls))
+
+
+class StockConcurrencyTests(TransactionTestCase):
+    """Tests that concurrent reservations never oversell stock."""
+
+    def test_concurrent_reservations_do_not_oversell(self):
+        auto_part = create_auto_part(stock_quantity=25)
+
+        results = run_concurrently(reserve, [(auto_part.id, 1)] * 60)
+
+        successes = [result for result in results if not isinstance(result, APIException)]
+        self.assertEqual(len(successes), 25)
+        auto_part.refresh_from_db()
+        self.assertEqual(auto_part.stock_quantity, 0)
+
+    def test_concurrent_reservations_return_the_stock_they_left(self):
+        auto_part = create_auto_part(stock_quantity=25)
+
+        results = run_concurrently(reserve, [(auto_part.id, 1)] * 25)
+
+        self.assertEqual(sorted(results), list(range(25)))
+
+    def test_concurrent_carts_in_opposite_orders_do_not_deadlock(self):
+        first = create_auto_part(name='First', stock_quantity=30)
+        second = create_auto_part(name='Second', stock_quantity=30)
+        carts = [
+            ([(first.id, 1), (second.id, 1)],) if i % 2 else ([(second.id, 1), (first.id, 1)],)
+            for i in range(40)
+        ]
+
+        results = run_concurrently(reserve_many, carts)
+
+        self.assertEqual(sum(not isinstance(result, APIException) for result in results), 30)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.stock_quantity, second.stock_quantity), (0, 0))
@@ -1,7 +1,34 @@
-from django.test import TestCase
+import gzip
+import shutil
+import tempfile
+import zstandard
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
 from decimal import Decimal
-from core.models import AutoPart
-from inventory.tasks import import_auto_parts_from_csv, replenish_stock
+from unittest.mock import Mock, patch
+from app.celery import app
+from celery.exceptions import SoftTimeLimitExceeded
+from core.models import AutoPart, ImportJob, ImportJobError, StockMovement, UploadSession
+from inventory.imports import create_upload, read_csv_range, row_hash, save_upload, split_csv
+from inventory.replenish import ReplenishResult, replenish
+from inventory.tasks import (
+    IMPORT_ENGINES,
+    create_stock_movement_partitions,
+    fail_csv_import,
+    import_auto_parts_from_csv,
+    import_auto_parts_from_csv_parallel,
+    import_csv_chunk,
+    merge_csv_import_results,
+    purge_revoked_tokens,
+    purge_upload_sessions,
+    replenish_stock,
+)
 
 
 def create_auto_part(**params):
@@ -15,9 +42,24 @@ def create_auto_part(**params):
     return AutoPart.objects.create(**defaults)
 
 
+def store_csv(content):
+    return save_upload(ContentFile(content.encode('utf-8'), name='partes.csv'))
+
+
+def create_import_job(content, **params):
+    return ImportJob.objects.create(file_name=store_csv(content), **params).id
+
+
 class TaskLogicTests(TestCase):
     """Tests for the tasks of bulk creation of auto parts from CSV and stock replenishment."""
 
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
     def test_import_auto_parts_from_csv(self):
         csv_content = (
             "nome,descricao,preco,quantidade_inicial\n"
@@ -26,7 +68,7 @@ class TaskLogicTests(TestCase):
             "Part C,Description C,20.00,40\n"
         )
 
-        result_message = import_auto_parts_from_csv(csv_content)
+        result_message = import_auto_parts_from_csv(create_import_job(csv_content))
 
         self.assertIn("3 peças criadas", result_message)
         self.assertEqual(AutoPart.objects.count(), 3)
@@ -44,10 +86,15 @@ class TaskLogicTests(TestCase):
             "Part C,Description C,20.00,40\n"
         )
 
-        result_message = import_auto_parts_from_csv(csv_content)
+        job_id = create_import_job(csv_content)
+
+        result_message = import_auto_parts_from_csv(job_id)
 
         self.assertIn("1 peças criadas", result_message)
         self.assertIn("2 erros", result_message)
+        job = ImportJob.objects.get(pk=job_id)
+        self.assertEqual(job.error_count, 2)
+        self.assertEqual(list(job.errors.order_by('line').values_list('line', flat=True)), [2, 3])
         self.assertEqual(AutoPart.objects.count(), 1)
 
         part_c = AutoPart.objects.get(name="Part C")
@@ -55,6 +102,388 @@ class TaskLogicTests(TestCase):
         self.assertEqual(part_c.price, Decimal('20.00'))
         self.assertEqual(part_c.stock_quantity, 40)
 
+    @override_settings(CSV_IMPORT_BATCH_SIZE=2)
+    def test_import_auto_parts_from_csv_reports_existing_skus(self):
+        create_auto_part(sku='SKU-A')
+        csv_content = (
+            "codigo,nome,descricao,preco,quantidade_inicial\n"
+            "SKU-B,Part B,Description B,10.00,1\n"
+            "SKU-A,Part A,Description A,11.00,2\n"
+            "SKU-C,Part C,Description C,12.00,3\n"
+            "SKU-B,Part B2,Description B2,13.00,4\n"
+            ",Part D,Description D,14.00,5\n"
+            ",Part E,Description E,15.00,6\n"
+        )
+        job_id = create_import_job(csv_content)
+
+        result_message = import_auto_parts_from_csv(job_id)
+
+        job = ImportJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, ImportJob.Status.SUCCEEDED)
+        self.assertIn("4 peças criadas", result_message)
+        self.assertEqual(list(job.errors.order_by('line').values_list('line', 'code')), [
+            (3, ImportJobError.Code.DUPLICATE_SKU), (5, ImportJobError.Code.DUPLICATE_SKU),
+        ])
+        self.assertEqual(AutoPart.objects.get(sku='SKU-B').name, 'Part B')
+
+    def test_import_auto_parts_from_csv_reports_typed_errors(self):
+        csv_content = (
+            "nome,descricao,preco,quantidade_inicial\n"
+            "Part A,Description A,10.505,1\n"
+            "Part B,Description B,-1.00,1\n"
+            "Part C,Description C,100000000.00,1\n"
+            "Part D,Description D,1.00,-3\n"
+            "Part E,Description E,1.00,2.5\n"
+            f"{'X' * 256},Description F,1.00,1\n"
+            "Part G,Description G\n"
+            "Part H,Description H,99999999.99, 7 \n"
+            "Part I,Description I,.5,0\n"
+        )
+        job_id = create_import_job(csv_content)
+
+        result_message = import_auto_parts_from_csv(job_id)
+
+        self.assertIn("2 peças criadas", result_message)
+        job = ImportJob.objects.get(pk=job_id)
+        codes = [
+            ImportJobError.Code.PRICE_PRECISION, ImportJobError.Code.NEGATIVE_PRICE,
+            ImportJobError.Code.PRICE_TOO_LARGE, ImportJobError.Code.NEGATIVE_QUANTITY,
+            ImportJobError.Code.INVALID_QUANTITY, ImportJobError.Code.TOO_LONG, ImportJobError.Code.MISSING_VALUE,
+        ]
+        self.assertEqual(list(job.errors.order_by('line').values_list('line', 'code')), list(zip(range(2, 9), codes)))
+        self.assertEqual(job.validation['rows'], 9)
+        self.assertEqual(job.validation['valid_rows'], 2)
+        self.assertEqual(job.validation['errors'], {code: 1 for code in codes})
+        self.assertEqual(job.validation['sample'][0]['line'], 2)
+        self.assertEqual(AutoPart.objects.get(name="Part H").price, Decimal('99999999.99'))
+        self.assertEqual(AutoPart.objects.get(name="Part H").stock_quantity, 7)
+        self.assertEqual(AutoPart.objects.get(name="Part I").price, Decimal('0.50'))
+
+    def test_import_auto_parts_from_csv_missing_columns_fails_job(self):
+        job_id = create_import_job("nome,descricao,quantidade_inicial\nPart A,Description A,20\n")
+
+        result_message = import_auto_parts_from_csv(job_id)
+
+        self.assertIn("Colunas obrigatórias ausentes: preco.", result_message)
+        job = ImportJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, ImportJob.Status.FAILED)
+        self.assertEqual(job.validation['missing_columns'], ['preco'])
+        self.assertEqual(job.rows_processed, 0)
+        self.assertFalse(AutoPart.objects.exists())
+
+    @override_settings(CSV_IMPORT_BATCH_SIZE=2)
+    def test_import_auto_parts_from_csv_in_batches(self):
+        csv_content = "nome,descricao,preco,quantidade_inicial\n" + "".join(
+            f"Part {i},Description {i},10.00,{i}\n" for i in range(5)
+        )
+        job_id = create_import_job(csv_content)
+
+        result_message = import_auto_parts_from_csv(job_id)
+
+        self.assertIn("5 peças criadas", result_message)
+        self.assertEqual(AutoPart.objects.count(), 5)
+        job = ImportJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, ImportJob.Status.SUCCEEDED)
+        self.assertEqual(job.rows_processed, 5)
+        self.assertEqual(job.rows_created, 5)
+        self.assertEqual(job.message, result_message)
+        self.assertIsNotNone(job.rows_per_second)
+        self.assertGreater(job.peak_memory_kb, 0)
+
+    def test_import_auto_parts_from_csv_invalidates_cache(self):
+        job_id = create_import_job("nome,descricao,preco,quantidade_inicial\nPart A,Description A,10.50,20\n")
+
+        with patch('inventory.imports.invalidate_auto_parts') as mock_invalidate:
+            import_auto_parts_from_csv(job_id)
+
+        mock_invalidate.assert_called()
+
+    def test_import_auto_parts_from_csv_removes_stored_file(self):
+        job_id = create_import_job("nome,descricao,preco,quantidade_inicial\nPart A,Description A,10.50,20\n")
+
+        import_auto_parts_from_csv(job_id)
+
+        self.assertFalse(default_storage.exists(ImportJob.objects.get(pk=job_id).file_name))
+
+    def test_import_auto_parts_from_compressed_csv(self):
+        content = b"nome,descricao,preco,quantidade_inicial\nPart A,Description A,10.50,20\n"
+        compressed = {'gzip': gzip.compress(content), 'zstd': zstandard.ZstdCompressor().compress(content)}
+
+        for compression, data in compressed.items():
+            with self.subTest(compression=compression):
+                file_name = save_upload(ContentFile(data), compression)
+                job = ImportJob.objects.create(file_name=file_name)
+
+                result_message = import_auto_parts_from_csv(job.id)
+
+                self.assertIn("1 peças criadas", result_message)
+                self.assertFalse(default_storage.exists(file_name))
+        self.assertEqual(AutoPart.objects.count(), 2)
+
+    def test_import_auto_parts_from_truncated_gzip_fails_job(self):
+        data = gzip.compress(b"nome,descricao,preco,quantidade_inicial\nPart A,Description A,10.50,20\n" * 100)
+        job = ImportJob.objects.create(file_name=save_upload(ContentFile(data[:-20]), 'gzip'))
+
+        result_message = import_auto_parts_from_csv(job.id)
+
+        self.assertIn("Falha crítica", result_message)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.FAILED)
+
+    def test_import_auto_parts_from_csv_decode_error_fails_job(self):
+        content = b"nome,descricao,preco,quantidade_inicial\nPart A,Description A,10.50,20\nPart \xff,B,1.00,1\n"
+        job = ImportJob.objects.create(file_name=save_upload(ContentFile(content, name='partes.csv')))
+
+        result_message = import_auto_parts_from_csv(job.id)
+
+        self.assertIn("Falha crítica", result_message)
+        self.assertEqual(AutoPart.objects.count(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.FAILED)
+
+    def test_import_auto_parts_from_csv_upsert(self):
+        create_auto_part(name="Old Part A", sku="A-1", price=Decimal('9.99'), stock_quantity=1)
+        csv_content = (
+            "codigo,nome,descricao,preco,quantidade_inicial\n"
+            "A-1,Part A,Description A,10.50,20\n"
+            "B-1,Part B,Description B,15.75,30\n"
+            "B-1,Part B,Corrected B,16.00,35\n"
+            ",Part C,Description C,20.00,40\n"
+        )
+
+        result_message = import_auto_parts_from_csv(create_import_job(csv_content, upsert=True))
+
+        self.assertIn("1 peças criadas, 1 atualizadas", result_message)
+        self.assertIn("1 erros", result_message)
+        self.assertEqual(AutoPart.objects.count(), 2)
+        part_a = AutoPart.objects.get(sku="A-1")
+        self.assertEqual(part_a.name, "Part A")
+        self.assertEqual(part_a.price, Decimal('10.50'))
+        self.assertEqual(part_a.stock_quantity, 20)
+        part_b = AutoPart.objects.get(sku="B-1")
+        self.assertEqual(part_b.description, "Corrected B")
+        self.assertEqual(part_b.stock_quantity, 35)
+
+    def test_import_auto_parts_from_csv_upsert_twice_does_not_duplicate(self):
+        csv_content = "codigo,nome,descricao,preco,quantidade_inicial\nA-1,Part A,Description A,10.50,20\n"
+
+        import_auto_parts_from_csv(create_import_job(csv_content, upsert=True))
+        result_message = import_auto_parts_from_csv(create_import_job(csv_content, upsert=True))
+
+        self.assertIn("0 peças criadas, 0 atualizadas, 1 sem alterações", result_message)
+        self.assertEqual(AutoPart.objects.count(), 1)
+
+    def test_import_upsert_writes_only_changed_rows(self):
+        original = (
+            "codigo,nome,descricao,preco,quantidade_inicial\n"
+            "A-1,Part A,Description A,10.5,20\n"
+            "B-1,Part B,Description B,15.75,30\n"
+            "C-1,Part C,Description C,20,40\n"
+        )
+        changed = original.replace("B-1,Part B,Description B,15.75,30", "B-1,Part B,Description B,15.80,30")
+
+        for engine in IMPORT_ENGINES:
+            with self.subTest(engine=engine):
+                AutoPart.objects.all().delete()
+                import_auto_parts_from_csv(create_import_job(original, upsert=True, engine=engine))
+                before = dict(AutoPart.objects.values_list('sku', 'updated_at'))
+
+                job_id = create_import_job(changed, upsert=True, engine=engine)
+                result_message = import_auto_parts_from_csv(job_id)
+
+                self.assertIn("0 peças criadas, 1 atualizadas, 2 sem alterações", result_message)
+                self.assertEqual(ImportJob.objects.get(pk=job_id).rows_unchanged, 2)
+                after = dict(AutoPart.objects.values_list('sku', 'updated_at'))
+                self.assertEqual(after['A-1'], before['A-1'])
+                self.assertNotEqual(after['B-1'], before['B-1'])
+                self.assertEqual(AutoPart.objects.get(sku='B-1').price, Decimal('15.80'))
+
+    def test_import_upsert_rewrites_rows_changed_since_last_import(self):
+        csv_content = "codigo,nome,descricao,preco,quantidade_inicial\nA-1,Part A,Description A,10.50,20\n"
+        import_auto_parts_from_csv(create_import_job(csv_content, upsert=True))
+        AutoPart.objects.filter(sku='A-1').update(stock_quantity=3)
+
+        result_message = import_auto_parts_from_csv(create_import_job(csv_content, upsert=True))
+
+        self.assertIn("0 peças criadas, 1 atualizadas", result_message)
+        self.assertEqual(AutoPart.objects.get(sku='A-1').stock_quantity, 20)
+
+    def test_row_hash_matches_stored_content_hash(self):
+        rows = [
+            {'name': 'Peça ç', 'description': '', 'price': 10.505, 'stock_quantity': 0, 'sku': None},
+            {'name': 'Part', 'description': 'Line 1\nLine 2', 'price': 3, 'stock_quantity': 7, 'sku': 'X-1'},
+        ]
+
+        for values in rows:
+            part = AutoPart.objects.create(**values)
+            self.assertEqual(AutoPart.objects.get(pk=part.pk).content_hash, row_hash(values))
+
+    def test_import_auto_parts_from_csv_copy_engine(self):
+        csv_content = (
+            "nome,descricao,preco,quantidade_inicial\n"
+            "Part A,\"Description, with comma\",10.50,20\n"
+            "Part B,,15.75,invalid_quantity\n"
+            "Part C,,20.00,40\n"
+        )
+
+        result_message = import_auto_parts_from_csv(create_import_job(csv_content, engine='copy'))
+
+        self.assertIn("2 peças criadas", result_message)
+        self.assertIn("1 erros", result_message)
+        part_a = AutoPart.objects.get(name="Part A")
+        self.assertEqual(part_a.description, "Description, with comma")
+        self.assertEqual(part_a.price, Decimal('10.50'))
+        self.assertIsNone(part_a.sku)
+        self.assertEqual(AutoPart.objects.get(name="Part C").description, "")
+
+    def test_import_auto_parts_from_csv_copy_engine_upsert(self):
+        create_auto_part(name="Old Part A", sku="A-1", stock_quantity=1)
+        csv_content = (
+            "codigo,nome,descricao,preco,quantidade_inicial\n"
+            "A-1,Part A,Description A,10.50,20\n"
+            "B-1,Part B,Description B,15.75,30\n"
+            "B-1,Part B,Corrected B,16.00,35\n"
+        )
+
+        result_message = import_auto_parts_from_csv(create_import_job(csv_content, upsert=True, engine='copy'))
+
+        self.assertIn("1 peças criadas, 1 atualizadas", result_message)
+        self.assertEqual(AutoPart.objects.get(sku="A-1").stock_quantity, 20)
+        self.assertEqual(AutoPart.objects.get(sku="B-1").description, "Corrected B")
+
+    @override_settings(CSV_COPY_BATCH_SIZE=2)
+    def test_import_auto_parts_from_csv_copy_engine_reports_existing_skus(self):
+        create_auto_part(sku="A-1")
+        csv_content = (
+            "codigo,nome,descricao,preco,quantidade_inicial\n"
+            "B-1,Part B,Description B,10.00,1\n"
+            "A-1,Part A,Description A,11.00,2\n"
+            "C-1,Part C,Description C,12.00,3\n"
+            "B-1,Part B2,Description B2,13.00,4\n"
+        )
+        job_id = create_import_job(csv_content, engine='copy')
+
+        result_message = import_auto_parts_from_csv(job_id)
+
+        self.assertIn("2 peças criadas", result_message)
+        self.assertEqual(list(ImportJob.objects.get(pk=job_id).errors.order_by('line').values_list('line', 'code')), [
+            (3, ImportJobError.Code.DUPLICATE_SKU), (5, ImportJobError.Code.DUPLICATE_SKU),
+        ])
+        self.assertEqual(AutoPart.objects.get(sku="B-1").name, "Part B")
+
+    def test_split_csv_keeps_multiline_records_together(self):
+        file_name = store_csv(
+            "nome,descricao,preco,quantidade_inicial\n"
+            "Part A,\"Line 1\nLine 2\",10.00,1\n"
+            "Part B,Description B,11.00,2\n"
+            "Part C,Description C,12.00,3\n"
+        )
+
+        fieldnames, chunks = split_csv(file_name, 2)
+
+        self.assertEqual(fieldnames, ['nome', 'descricao', 'preco', 'quantidade_inicial'])
+        self.assertEqual([first_row for _, _, first_row in chunks], [0, 2])
+        rows = [row for start, end, _ in chunks for row in read_csv_range(file_name, fieldnames, start, end)]
+        self.assertEqual([row['nome'] for row in rows], ['Part A', 'Part B', 'Part C'])
+        self.assertEqual(rows[0]['descricao'], "Line 1\nLine 2")
+
+    @override_settings(CSV_IMPORT_CHUNK_SIZE=2)
+    def test_import_auto_parts_from_csv_parallel_dispatches_chunks(self):
+        job_id = create_import_job(
+            "nome,descricao,preco,quantidade_inicial\n"
+            "Part A,Description A,10.00,1\n"
+            "Part B,Description B,11.00,2\n"
+            "Part C,Description C,12.00,3\n",
+            parallel=True,
+        )
+
+        with patch('inventory.tasks.chord') as mock_chord:
+            result_message = import_auto_parts_from_csv_parallel(job_id)
+
+        self.assertIn("2 partes", result_message)
+        header = list(mock_chord.call_args.args[0])
+        self.assertEqual(len(header), 2)
+        callback = mock_chord.return_value.call_args.args[0]
+        self.assertEqual(callback.task, merge_csv_import_results.name)
+
+    @override_settings(CSV_IMPORT_CHUNK_SIZE=2)
+    def test_import_auto_parts_from_csv_parallel_fails_job_when_a_chunk_fails(self):
+        job_id = create_import_job(
+            "nome,descricao,preco,quantidade_inicial\n"
+            "Part A,Description A,10.00,1\n"
+            "Part B,Description B,11.00,2\n"
+            "Part C,Description C,12.00,3\n",
+            parallel=True,
+        )
+        with patch('inventory.tasks.chord') as mock_chord:
+            import_auto_parts_from_csv_parallel(job_id)
+        callback = mock_chord.return_value.call_args.args[0]
+        errback = callback.options['link_error'][0]
+        self.assertEqual(errback.task, fail_csv_import.name)
+
+        # What the result backend does when a task of the chord header raises.
+        result_message = errback(Mock(id='chunk'), SoftTimeLimitExceeded('Time limit exceeded'), None)
+
+        job = ImportJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, ImportJob.Status.FAILED)
+        self.assertIn("Time limit exceeded", result_message)
+        self.assertFalse(default_storage.exists(job.file_name))
+
+    def test_import_auto_parts_from_csv_parallel_fails_job_when_split_fails(self):
+        job_id = create_import_job("nome,descricao,preco,quantidade_inicial\nPart A,Description A,10.00,1\n",
+                                   parallel=True)
+
+        with patch('inventory.tasks.split_csv', side_effect=OSError('Disco indisponível')):
+            result_message = import_auto_parts_from_csv_parallel(job_id)
+
+        job = ImportJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, ImportJob.Status.FAILED)
+        self.assertIn("Disco indisponível", result_message)
+
+    def test_import_auto_parts_from_csv_parallel_decompresses_first(self):
+        content = (
+            b"nome,descricao,preco,quantidade_inicial\n"
+            b"Part A,Description A,10.00,1\n"
+            b"Part B,Description B,11.00,2\n"
+        )
+        compressed_name = save_upload(ContentFile(gzip.compress(content)), 'gzip')
+        job = ImportJob.objects.create(file_name=compressed_name, parallel=True)
+
+        with patch('inventory.tasks.chord') as mock_chord:
+            import_auto_parts_from_csv_parallel(job.id)
+
+        self.assertEqual(len(list(mock_chord.call_args.args[0])), 1)
+        job.refresh_from_db()
+        self.assertTrue(job.file_name.endswith('.csv'))
+        self.assertFalse(default_storage.exists(compressed_name))
+        with default_storage.open(job.file_name, 'rb') as plain:
+            self.assertEqual(plain.read(), content)
+
+    def test_import_csv_chunks_and_merge_results(self):
+        job_id = create_import_job(
+            "nome,descricao,preco,quantidade_inicial\n"
+            "Part A,Description A,10.00,1\n"
+            "Part B,Description B,invalid_price,2\n"
+            "Part C,Description C,12.00,3\n",
+            parallel=True,
+        )
+        job = ImportJob.objects.get(pk=job_id)
+        job.started_at = job.created_at
+        job.save()
+        fieldnames, chunks = split_csv(job.file_name, 2)
+
+        results = [import_csv_chunk(job_id, fieldnames, *chunk) for chunk in chunks]
+        result_message = merge_csv_import_results(results, job_id)
+
+        self.assertEqual(results, [None, None])
+        self.assertIn("2 peças criadas", result_message)
+        self.assertIn("1 erros", result_message)
+        self.assertEqual(AutoPart.objects.count(), 2)
+        job.refresh_from_db()
+        self.assertEqual(job.rows_processed, 3)
+        self.assertEqual(job.status, ImportJob.Status.SUCCEEDED)
+        self.assertFalse(default_storage.exists(job.file_name))
+
     def test_replanish_stock(self):
         create_auto_part(name="Part A", stock_quantity=5)
         create_auto_part(name="Part B", stock_quantity=15)
@@ -71,3 +500,192 @@ class TaskLogicTests(TestCase):
         self.assertEqual(part_a.stock_quantity, 10)
         self.assertEqual(part_b.stock_quantity, 15)
         self.assertEqual(part_c.stock_quantity, 10)
+
+    def test_replenish_stock_uses_part_reorder_levels(self):
+        part_a = create_auto_part(name="Part A", stock_quantity=15, reorder_point=20, reorder_target=50)
+        part_b = create_auto_part(name="Part B", stock_quantity=5, reorder_point=3)
+        part_c = create_auto_part(name="Part C", stock_quantity=5)
+
+        result_message = replenish_stock()
+
+        self.assertIn("2 peças reabastecidas", result_message)
+        for part in (part_a, part_b, part_c):
+            part.refresh_from_db()
+        self.assertEqual(part_a.stock_quantity, 50)
+        self.assertEqual(part_b.stock_quantity, 5)
+        self.assertEqual(part_c.stock_quantity, 10)
+
+    @override_settings(REPLENISH_REORDER_POINT=30, REPLENISH_REORDER_TARGET=40)
+    def test_replenish_stock_default_levels_come_from_settings(self):
+        part = create_auto_part(stock_quantity=25)
+
+        replenish_stock()
+
+        part.refresh_from_db()
+        self.assertEqual(part.stock_quantity, 40)
+
+    def test_replenish_in_chunks_reports_changes(self):
+        parts = [create_auto_part(name=f"Part {i}", stock_quantity=i) for i in range(7)]
+
+        result = replenish(chunk_size=2, collect=True)
+
+        self.assertEqual(result.chunks, 4)
+        self.assertEqual(result.count, 7)
+        self.assertEqual([part.id for part in result.parts], [part.id for part in parts])
+        self.assertEqual(result.units, sum(10 - i for i in range(7)))
+        self.assertEqual(AutoPart.objects.filter(stock_quantity=10).count(), 7)
+
+    def test_replenish_limited_to_an_id_range(self):
+        parts = [create_auto_part(name=f"Part {i}", stock_quantity=0) for i in range(5)]
+
+        result = replenish(chunk_size=2, id_range=(parts[1].id, parts[3].id), collect=True)
+
+        self.assertEqual([part.id for part in result.parts], [part.id for part in parts[1:4]])
+        self.assertEqual(result.chunks, 2)
+        self.assertEqual(AutoPart.objects.filter(stock_quantity=0).count(), 2)
+
+    def test_replenish_keeps_only_totals_by_default(self):
+        for i in range(3):
+            create_auto_part(name=f"Part {i}", stock_quantity=i)
+
+        result = replenish(chunk_size=2)
+
+        self.assertEqual((result.count, result.units, result.chunks), (3, 27, 2))
+        self.assertEqual(result.parts, [])
+
+    def test_replenish_dry_run_changes_nothing(self):
+        part = create_auto_part(stock_quantity=4)
+
+        result = replenish(dry_run=True)
+
+        self.assertEqual([(p.id, p.previous, p.stock_quantity) for p in result.parts], [(part.id, 4, 10)])
+        part.refresh_from_db()
+        self.assertEqual(part.stock_quantity, 4)
+
+    def test_no_stock_to_replenish(self):
+        create_auto_part(stock_quantity=10)
+
+        self.assertEqual(replenish_stock(), "Nenhuma peça precisa de reabastecimento.")
+
+    def test_import_records_stock_movements(self):
+        for engine in ('orm', 'copy'):
+            with self.subTest(engine=engine):
+                csv_content = (
+                    "codigo,nome,descricao,preco,quantidade_inicial\n"
+                    f"{engine}-A,Part A,Description A,10.50,20\n"
+                )
+                import_auto_parts_from_csv(create_import_job(csv_content, engine=engine, upsert=True))
+                csv_content = csv_content.replace(',20\n', ',35\n')
+                import_auto_parts_from_csv(create_import_job(csv_content, engine=engine, upsert=True))
+
+                part = AutoPart.objects.get(sku=f"{engine}-A")
+                movements = StockMovement.objects.filter(part=part).order_by('id')
+                self.assertEqual(
+                    [(m.quantity, m.balance, m.reason) for m in movements],
+                    [(20, 20, 'import'), (15, 35, 'import')],
+                )
+
+    def test_replenish_records_stock_movements(self):
+        part = create_auto_part(stock_quantity=4)
+
+        replenish_stock()
+
+        movement = StockMovement.objects.filter(part=part).latest('id')
+        self.assertEqual((movement.quantity, movement.balance, movement.reason), (6, 10, 'replenish'))
+
+    def test_create_stock_movement_partitions(self):
+        with self.settings(STOCK_MOVEMENT_PARTITIONS_AHEAD=6):
+            create_stock_movement_partitions()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_inherits JOIN pg_class ON pg_class.oid = inhrelid "
+                "WHERE inhparent = 'core_stockmovement'::regclass AND relname <> 'core_stockmovement_default' "
+                "AND relname >= 'core_stockmovement_' || to_char(now(), 'YYYY_MM')"
+            )
+            self.assertEqual(cursor.fetchone()[0], 7)
+
+    def test_create_stock_movement_partitions_moves_rows_out_of_default(self):
+        part = create_auto_part(stock_quantity=0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO core_stockmovement (part_id, quantity, balance, reason, created_at) "
+                "VALUES (%s, 5, 5, 'manual', now() + interval '5 months') RETURNING tableoid::regclass::text",
+                [part.id],
+            )
+            self.assertEqual(cursor.fetchone()[0], 'core_stockmovement_default')
+
+        with self.settings(STOCK_MOVEMENT_PARTITIONS_AHEAD=6):
+            create_stock_movement_partitions()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT tableoid::regclass::text, to_char(now() + interval '5 months', 'YYYY_MM') "
+                "FROM core_stockmovement WHERE part_id = %s",
+                [part.id],
+            )
+            partition, month = cursor.fetchone()
+        self.assertEqual(partition, f'core_stockmovement_{month}')
+        self.assertEqual(StockMovement.objects.filter(part=part).get().quantity, 5)
+
+    def test_create_stock_movement_partitions_tries_every_month(self):
+        calls = []
+
+        def execute(cursor, sql, params=None):
+            if 'core_create_stockmovement_partition' in sql:
+                calls.append(params[0])
+                if params[0] == 1:
+                    raise OperationalError('partição bloqueada')
+
+        with patch('django.db.backends.utils.CursorWrapper.execute', execute), \
+                self.assertLogs('inventory.tasks', 'ERROR'), self.assertRaises(OperationalError):
+            create_stock_movement_partitions()
+
+        self.assertEqual(calls, list(range(settings.STOCK_MOVEMENT_PARTITIONS_AHEAD + 1)))
+
+    def test_purge_upload_sessions(self):
+        user = get_user_model().objects.create_user(username='admin')
+        stale = UploadSession.objects.create(user=user, name='a.csv', file_name=create_upload())
+        fresh = UploadSession.objects.create(user=user, name='b.csv', file_name=create_upload())
+        UploadSession.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - timedelta(days=2))
+
+        result_message = purge_upload_sessions()
+
+        self.assertIn("1 envios", result_message)
+        self.assertEqual(list(UploadSession.objects.all()), [fresh])
+        self.assertFalse(default_storage.exists(stale.file_name))
+        self.assertTrue(default_storage.exists(fresh.file_name))
+
+
+class TaskRoutingTests(SimpleTestCase):
+    """Tests for the routing of tasks to queues and the behaviour of each queue."""
+
+    def queue(self, task):
+        return app.amqp.router.route({}, task.name)['queue'].name
+
+    def test_tasks_are_routed_to_their_queue(self):
+        routes = {
+            import_auto_parts_from_csv: 'imports',
+            import_auto_parts_from_csv_parallel: 'imports',
+            import_csv_chunk: 'imports',
+            merge_csv_import_results: 'default',
+            fail_csv_import: 'default',
+            replenish_stock: 'maintenance',
+            create_stock_movement_partitions: 'maintenance',
+            purge_revoked_tokens: 'maintenance',
+            purge_upload_sessions: 'maintenance',
+        }
+        self.assertEqual({task: self.queue(task) for task in routes}, routes)
+
+    def test_imports_are_acknowledged_early_and_never_retried(self):
+        self.assertFalse(import_auto_parts_from_csv.acks_late)
+        self.assertEqual(import_auto_parts_from_csv.max_retries, 0)
+        self.assertGreater(import_auto_parts_from_csv.time_limit, import_auto_parts_from_csv.soft_time_limit)
+
+    def test_maintenance_tasks_retry_on_database_errors(self):
+        self.assertTrue(replenish_stock.acks_late)
+        outcomes = [OperationalError('conexão perdida'), ReplenishResult(dry_run=False)]
+        with patch('inventory.tasks.replenish', side_effect=outcomes):
+            result = replenish_stock.apply()
+
+        self.assertEqual(result.get(), "Nenhuma peça precisa de reabastecimento.")
@@ -1,5 +1,5 @@
 from django.urls import path, include
-from inventory import views
+from inventory import async_views, views
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -9,5 +9,13 @@ app_name = 'inventory'
 
 urlpatterns = [
     path('auto-parts/upload-csv/', views.AutoPartCSVUploadView.as_view(), name='auto-part-upload-csv'),
+    path('auto-parts/cache-stats/', views.AutoPartCacheStatsView.as_view(), name='auto-part-cache-stats'),
+    path('async/auto-parts/', async_views.AsyncAutoPartListView.as_view(), name='async-auto-part-list'),
+    path('async/auto-parts/<int:pk>/', async_views.AsyncAutoPartDetailView.as_view(), name='async-auto-part-detail'),
+    path('uploads/', views.UploadSessionView.as_view(), name='upload-session-list'),
+    path('uploads/<uuid:pk>/', views.UploadSessionDetailView.as_view(), name='upload-session-detail'),
+    path('uploads/<uuid:pk>/finalize/', views.UploadSessionFinalizeView.as_view(), name='upload-session-finalize'),
+    path('import-jobs/<int:pk>/', views.ImportJobView.as_view(), name='import-job-detail'),
+    path('import-jobs/<int:pk>/errors/', views.ImportJobErrorReportView.as_view(), name='import-job-errors'),
     path('', include(router.urls)),
 ]
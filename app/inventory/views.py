@@ -1,21 +1,206 @@
+import csv
+import hmac
+import io
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views import View
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.generics import CreateAPIView, RetrieveAPIView, RetrieveDestroyAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.parsers import MultiPartParser
-from core.models import AutoPart
-from inventory import serializers
-from .tasks import import_auto_parts_from_csv
+from core.models import AutoPart, ImportJob, StockMovement, UploadSession
+from inventory import metrics, serializers
+from inventory.authentication import revoke_token
+from inventory.bulk import apply_bulk_changes
+from inventory.cache import CachedReadMixin, cache_stats
+from inventory.changes import changes_since, decode_cursor, encode_cursor
+from inventory.conditional import ConditionalGetMixin
+from inventory.export import EXPORT_FORMATS, Echo, fields_without_csv_column
+from inventory.filters import AutoPartFilterBackend
+from inventory.ledger import stock_reason
+from inventory.pagination import AutoPartPagination, StockMovementPagination
+from inventory.stock import release, reserve, reserve_many
+from .imports import (
+    DECOMPRESSION_ERRORS, append_upload, check_encoding, compression_of, create_upload, file_digest, read_text,
+    receive_part, save_upload,
+)
+from .tasks import IMPORT_ENGINES, import_auto_parts_from_csv, import_auto_parts_from_csv_parallel
+from .validation import header_error, validate_csv
 
 
-class AutoPartView(ModelViewSet):
+FIELDS_PARAMETER = OpenApiParameter(
+    'fields', str, description=(
+        'Campos da resposta separados por vírgula, por exemplo `id,name,price`. '
+        'Também reduz as colunas consultadas.'
+    ),
+)
+
+
+@extend_schema_view(
+    list=extend_schema(parameters=[FIELDS_PARAMETER]),
+    retrieve=extend_schema(parameters=[FIELDS_PARAMETER]),
+)
+class AutoPartView(ConditionalGetMixin, CachedReadMixin, ModelViewSet):
     """ViewSet for managing Auto Parts in the inventory."""
     serializer_class = serializers.AutoPartSerializer
+    read_serializer_class = serializers.AutoPartReadSerializer
     queryset = AutoPart.objects.all()
+    lookup_value_regex = r'\d+'
+    pagination_class = AutoPartPagination
+    filter_backends = [AutoPartFilterBackend]
+
+    def is_fast_read(self):
+        return (
+            self.action in ['list', 'retrieve']
+            and self.request.method in ('GET', 'HEAD')
+            and not getattr(self, 'swagger_fake_view', False)
+        )
+
+    def get_read_fields(self):
+        """Fields of the read response and the columns to SELECT for them."""
+        if not hasattr(self, '_read_fields'):
+            fields = self.read_serializer_class.get_requested_fields(self.request)
+            columns = set(fields or self.read_serializer_class.fields) | {'id'}
+            if self.action == 'list':
+                columns.add(self.paginator.get_ordering(self.request)[0])
+            self._read_fields = fields, sorted(columns)
+        return self._read_fields
+
+    def get_serializer_class(self):
+        if self.is_fast_read():
+            return self.read_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        if self.is_fast_read():
+            kwargs['fields'] = self.get_read_fields()[0]
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.is_fast_read():
+            queryset = queryset.values(*self.get_read_fields()[1])
+        return queryset
+
+    def perform_create(self, serializer):
+        with stock_reason(StockMovement.Reason.API):
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with stock_reason(StockMovement.Reason.API):
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with stock_reason(StockMovement.Reason.API):
+            super().perform_destroy(instance)
+
+    @action(detail=True, methods=['get'], serializer_class=serializers.StockMovementSerializer,
+            pagination_class=StockMovementPagination, filter_backends=[])
+    def movements(self, request, pk=None):
+        """Stock movement history of a part, newest first. Kept after the part is deleted."""
+        page = self.paginate_queryset(StockMovement.objects.filter(part_id=pk))
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @extend_schema(parameters=[
+        OpenApiParameter('output', str, enum=list(EXPORT_FORMATS), description='Formato: csv (padrão) ou ndjson.'),
+        OpenApiParameter('fields', str, description=(
+            'Campos exportados separados por vírgula, por exemplo `sku,name,price`. Também reduz as colunas '
+            'consultadas. No CSV só valem os campos com coluna no layout de importação (`sku`, `name`, '
+            '`description`, `price`, `stock_quantity`); os demais retornam 400.'
+        )),
+    ], responses={(200, 'text/csv'): str, (200, 'application/x-ndjson'): str})
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def export(self, request):
+        """Streams the (filtered) catalogue as CSV in the import layout or as NDJSON."""
+        output = request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            return Response({"error": "Formato inválido. Use 'csv' ou 'ndjson'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        lines, content_type = EXPORT_FORMATS[output]
+        fields = self.read_serializer_class.get_requested_fields(request)
+        if output == 'csv' and (unsupported := fields_without_csv_column(fields)):
+            return Response(
+                {"fields": f"Campos sem coluna no CSV: {', '.join(unsupported)}. Use output=ndjson."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.filter_queryset(self.get_queryset()).order_by('id')
+        response = StreamingHttpResponse(lines(queryset, fields), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="catalogo-pecas.{output}"'
+        return response
+
+    @extend_schema(parameters=[
+        OpenApiParameter('since', str, description='Cursor retornado pela chamada anterior; vazio na primeira.'),
+        OpenApiParameter('limit', int,
+                         description=f'Alterações por resposta (máximo {settings.CHANGE_FEED_MAX_PAGE_SIZE}).'),
+    ])
+    @action(detail=False, methods=['get'], pagination_class=None, filter_backends=[])
+    def changes(self, request):
+        """Parts created, updated or deleted since a cursor, with the cursor to resume from."""
+        try:
+            limit = int(request.query_params.get('limit', settings.CHANGE_FEED_PAGE_SIZE))
+        except ValueError:
+            limit = settings.CHANGE_FEED_PAGE_SIZE
+        limit = min(max(limit, 1), settings.CHANGE_FEED_MAX_PAGE_SIZE)
+
+        changes, cursor, has_more = changes_since(decode_cursor(request.query_params.get('since')), limit)
+        return Response({'changes': changes, 'cursor': encode_cursor(cursor), 'has_more': has_more})
+
+    @extend_schema(request=serializers.AutoPartBulkSerializer)
+    @action(detail=False, methods=['post'], serializer_class=serializers.AutoPartBulkSerializer)
+    def bulk(self, request):
+        """Creates, partially updates and deletes many parts in one transaction."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result, errors = apply_bulk_changes(**serializer.validated_data)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    @extend_schema(request=serializers.StockQuantitySerializer)
+    @action(detail=True, methods=['post'], serializer_class=serializers.StockQuantitySerializer)
+    def reserve(self, request, pk=None):
+        """Atomically takes units of a part from stock; 409 when there are not enough."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        remaining = reserve(int(pk), serializer.validated_data['quantity'])
+        return Response({'id': int(pk), 'stock_quantity': remaining})
+
+    @extend_schema(request=serializers.StockQuantitySerializer)
+    @action(detail=True, methods=['post'], serializer_class=serializers.StockQuantitySerializer)
+    def release(self, request, pk=None):
+        """Returns previously reserved units of a part to stock.
+
+        Admin only, unlike reserve: reservations are not recorded per user, so
+        any client allowed to release could add stock it never took.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        remaining = release(int(pk), serializer.validated_data['quantity'])
+        return Response({'id': int(pk), 'stock_quantity': remaining})
+
+    @extend_schema(request=serializers.StockReservationSerializer)
+    @action(detail=False, methods=['post'], url_path='reserve', url_name='reserve-cart',
+            serializer_class=serializers.StockReservationSerializer)
+    def reserve_cart(self, request):
+        """Reserves every item of a cart or none of them; 409 lists the short items."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        remaining = reserve_many((item['id'], item['quantity']) for item in serializer.validated_data['items'])
+        return Response({'items': [
+            {'id': part_id, 'stock_quantity': stock_quantity} for part_id, stock_quantity in remaining.items()
+        ]})
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'export', 'changes', 'reserve', 'reserve_cart']:
             permission_classes = [IsAuthenticated]
         else:
             permission_classes = [IsAdminUser]
@@ -23,8 +208,117 @@ class AutoPartView(ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class AutoPartCSVUploadView(APIView):
-    """View for uploading Auto Parts via CSV file."""
+class AutoPartCacheStatsView(APIView):
+    """View for the hit and miss counters of the auto-parts cache."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
+
+
+class TokenRevokeView(APIView):
+    """View for revoking the access token of the request and, optionally, a refresh token."""
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(request=serializers.TokenRevokeSerializer, responses={204: None})
+    def post(self, request):
+        serializer = serializers.TokenRevokeSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+
+        if request.auth is not None:
+            revoke_token(request.auth)
+        if 'refresh' in serializer.validated_data:
+            revoke_token(serializer.validated_data['refresh'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ImportRequestMixin:
+    """Reads the import options of a request and starts the ImportJob of a stored file."""
+
+    def import_options(self, data):
+        """Returns the ImportJob options chosen in the request and an error message, one of them None."""
+        mode = data.get('mode', 'create')
+        if mode not in ('create', 'upsert'):
+            return None, "Modo de importação inválido. Use 'create' ou 'upsert'."
+
+        engine = data.get('engine', 'orm')
+        if engine not in IMPORT_ENGINES:
+            return None, "Motor de importação inválido. Use 'orm' ou 'copy'."
+
+        parallel = str(data.get('parallel', '')).lower() in ('1', 'true')
+        force = str(data.get('force', '')).lower() in ('1', 'true')
+        return {'upsert': mode == 'upsert', 'engine': engine, 'parallel': parallel, 'force': force}, None
+
+    def start_import(self, file_name, options, content_hash, validation=None):
+        """Starts the import of a stored file, unless the same file was already imported with the same mode.
+
+        A resent file is acknowledged with the earlier job and deleted; `force` imports it again.
+        The validation summary made in the request, if any, is returned and kept on the job.
+        """
+        options = dict(options)
+        if not options.pop('force'):
+            previous = ImportJob.objects.filter(
+                content_hash=content_hash, upsert=options['upsert'], status__in=[
+                    ImportJob.Status.PENDING, ImportJob.Status.RUNNING, ImportJob.Status.SUCCEEDED,
+                ],
+            ).order_by('-id').first()
+            if previous:
+                default_storage.delete(file_name)
+                return Response(
+                    {"message": f"Arquivo idêntico ao da importação {previous.id}. Nenhuma importação foi iniciada.",
+                     "job_id": previous.id, "duplicate": True},
+                    status=status.HTTP_200_OK,
+                )
+
+        job = ImportJob.objects.create(file_name=file_name, content_hash=content_hash, validation=validation, **options)
+
+        if job.parallel:
+            import_auto_parts_from_csv_parallel.delay(job.id)
+        else:
+            import_auto_parts_from_csv.delay(job.id)
+
+        return Response(
+            {"message": "Arquivo recebido. A importação está sendo processada.", "job_id": job.id,
+             "validation": job.validation},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+def check_upload(stream, compression, size, upsert=False):
+    """Checks that the stream is UTF-8 text and can be decompressed and validates the rows of small files.
+
+    Only uncompressed files of up to CSV_SYNC_VALIDATION_MAX_SIZE bytes are
+    validated here: the size of a compressed file says nothing of the size of
+    its content, so those are left to the import task. Returns the validation
+    summary (None when not validated) and an error response, None if the file
+    can be imported.
+    """
+    try:
+        check_encoding(stream, compression)
+        if compression or size > settings.CSV_SYNC_VALIDATION_MAX_SIZE:
+            return None, None
+        with read_text(stream, compression) as csv_file:
+            validation = validate_csv(csv_file, upsert).as_dict()
+    except UnicodeDecodeError:
+        return None, Response(
+            {"error": "Erro ao decodificar o arquivo. Use codificação UTF-8."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except DECOMPRESSION_ERRORS:
+        return None, Response({"error": "Arquivo compactado inválido."}, status=status.HTTP_400_BAD_REQUEST)
+    except csv.Error as e:
+        return None, Response({"error": f"Arquivo CSV inválido: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if validation['missing_columns']:
+        return validation, Response(
+            {"error": header_error(validation['missing_columns']), "validation": validation},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return validation, None
+
+
+class AutoPartCSVUploadView(ImportRequestMixin, APIView):
+    """View for uploading Auto Parts via CSV file, plain or compressed with gzip or zstd."""
     permission_classes = [IsAdminUser]
     parser_classes = [MultiPartParser]
 
@@ -34,23 +328,176 @@ class AutoPartCSVUploadView(APIView):
         if not csv_file:
             return Response({"error": "Nenhum arquivo fornecido."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not csv_file.name.endswith('.csv'):
+        compression = compression_of(csv_file.name)
+        if compression is None:
             return Response({"error": "Arquivo não é do tipo CSV."}, status=status.HTTP_400_BAD_REQUEST)
 
+        options, error = self.import_options(request.data)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            csv_content = csv_file.read().decode('utf-8')
-        except UnicodeDecodeError:
-            return Response(
-                {"error": "Erro ao decodificar o arquivo. Use codificação UTF-8."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            validation, error_response = check_upload(csv_file, compression, csv_file.size, options['upsert'])
+            if error_response:
+                return error_response
+            content_hash = file_digest(csv_file)
+            file_name = save_upload(csv_file, compression)
         except Exception as e:
             return Response(
                 {"error": f"Erro ao ler o arquivo: {e}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        import_auto_parts_from_csv.delay(csv_content)
+        return self.start_import(file_name, options, content_hash, validation)
+
+
+class UploadSessionView(CreateAPIView):
+    """View for starting a resumable upload of a CSV file, sent afterwards in parts."""
+    permission_classes = [IsAdminUser]
+    serializer_class = serializers.UploadSessionSerializer
+
+    def perform_create(self, serializer):
+        compression = compression_of(serializer.validated_data['name'])
+        serializer.save(user_id=self.request.user.pk, compression=compression, file_name=create_upload(compression))
+
+
+class UploadSessionDetailView(RetrieveDestroyAPIView):
+    """View for following, appending parts to and aborting a resumable upload.
+
+    PATCH appends the raw request body at the `Upload-Offset` header, which must
+    be the offset already stored. After a dropped connection, GET tells the
+    offset to resume from; a part is received in full before being stored, so
+    one interrupted midway leaves no trace.
+    """
+    permission_classes = [IsAdminUser]
+    serializer_class = serializers.UploadSessionSerializer
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user_id=self.request.user.pk)
+
+    def patch(self, request, pk):
+        try:
+            offset = int(request.headers['Upload-Offset'])
+        except (KeyError, ValueError):
+            return Response({"error": "Informe o cabeçalho Upload-Offset."}, status=status.HTTP_400_BAD_REQUEST)
+
+        upload = get_object_or_404(self.get_queryset(), pk=pk)
+        if offset != upload.offset:
+            return self.offset_conflict(upload)
+
+        max_size = settings.UPLOAD_PART_MAX_SIZE
+        if upload.size is not None:
+            max_size = min(max_size, upload.size - upload.offset)
+        part = receive_part(request.stream or io.BytesIO(), max_size)
+        if part is None:
+            return Response(
+                {"error": f"Parte maior que o permitido ({max_size} bytes)."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        # The part is already on local disk: the lock is only held while it is copied.
+        with part, transaction.atomic():
+            upload = get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+            if offset != upload.offset:
+                return self.offset_conflict(upload)
+            upload.offset += append_upload(upload.file_name, upload.offset, part)
+            upload.save(update_fields=['offset', 'updated_at'])
+
+        return Response(self.get_serializer(upload).data, headers={'Upload-Offset': str(upload.offset)})
+
+    def offset_conflict(self, upload):
+        return Response(
+            {"error": f"Deslocamento inválido. Continue a partir do byte {upload.offset}.", "offset": upload.offset},
+            status=status.HTTP_409_CONFLICT, headers={'Upload-Offset': str(upload.offset)},
+        )
+
+    def perform_destroy(self, instance):
+        default_storage.delete(instance.file_name)
+        instance.delete()
+
+
+class UploadSessionFinalizeView(ImportRequestMixin, APIView):
+    """View for finishing a resumable upload and starting the import of the received file."""
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, pk):
+        upload = get_object_or_404(UploadSession.objects.filter(user_id=request.user.pk), pk=pk)
+
+        if upload.size is not None and upload.offset != upload.size:
+            return Response(
+                {"error": f"Envio incompleto: {upload.offset} de {upload.size} bytes recebidos.",
+                 "offset": upload.offset},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        options, error = self.import_options(request.data)
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        with default_storage.open(upload.file_name, 'rb') as stored:
+            validation, error_response = check_upload(stored, upload.compression, upload.offset, options['upsert'])
+            if error_response:
+                return error_response
+            content_hash = file_digest(stored)
+
+        # Deleting the session first makes a repeated finalize start no second import.
+        deleted, _ = UploadSession.objects.filter(pk=upload.pk).delete()
+        if not deleted:
+            raise Http404
+
+        return self.start_import(upload.file_name, options, content_hash, validation)
+
+
+class ImportJobView(RetrieveAPIView):
+    """View for following the progress of a CSV import job."""
+    permission_classes = [IsAdminUser]
+    serializer_class = serializers.ImportJobSerializer
+    queryset = ImportJob.objects.all()
+
+
+class ImportJobErrorReportView(APIView):
+    """View for downloading the rows rejected by a CSV import job as a CSV file."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, pk):
+        job = get_object_or_404(ImportJob, pk=pk)
+        writer = csv.writer(Echo())
+        errors = job.errors.order_by('line').values_list('line', 'code', 'message').iterator(chunk_size=2000)
+
+        def rows():
+            yield writer.writerow(['linha', 'tipo', 'erro'])
+            for line, code, message in errors:
+                yield writer.writerow([line, code, message])
+
+        response = StreamingHttpResponse(rows(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="importacao-{job.id}-erros.csv"'
+        return response
+
+
+class MetricsView(View):
+    """Prometheus scrape endpoint. Requires `Authorization: Bearer <METRICS_TOKEN>`.
+
+    Without a token it is only open with DEBUG on, for local development.
+    """
+    metrics = (
+        metrics.HTTP_REQUESTS,
+        metrics.HTTP_DURATION,
+        metrics.HTTP_DB_DURATION,
+        metrics.HTTP_RENDER_DURATION,
+        metrics.HTTP_QUERIES,
+        metrics.HTTP_QUERY_BUDGET_EXCEEDED,
+        metrics.TASK_RUNS,
+        metrics.TASK_DURATION,
+        metrics.TASK_QUEUE_DURATION,
+        metrics.TASK_PEAK_MEMORY,
+        metrics.TASK_ITEMS,
+    )
 
-        return Response({"message": "Arquivo recebido. A importação está sendo processada."},
-                        status=status.HTTP_202_ACCEPTED)
+    def get(self, request):
+        if settings.METRICS_TOKEN:
+            expected = f'Bearer {settings.METRICS_TOKEN}'.encode()
+            if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected):
+                return HttpResponseForbidden()
+        elif not settings.DEBUG:
+            return HttpResponseForbidden()
+        return HttpResponse(metrics.render(self.metrics), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,9 @@
+#!/bin/sh
+
+set -e
+
+python manage.py wait_for_db
+python manage.py collectstatic --noinput
+python manage.py migrate
+
+uvicorn app.asgi:application --host 0.0.0.0 --port 9000 --workers "${ASGI_WORKERS:-2}" --no-access-log